@@ -1,8 +1,19 @@
-from inspect import getmembers
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from app.logger import get_logger
-from app.diagrams.generate_diagrams import generate_c4_diagram as c4_diagram
+from typing import List, Optional
+from app import models, schemas
+from app.database import AsyncSessionLocal, write_transaction
+from app.repositories import diagrams_repository
+from app.diagrams.generate_diagrams import (
+    generate_c4_diagram as c4_diagram,
+    parse_c4_answer,
+    stream_c4_diagram,
+    stream_c4_batch,
+)
+from app.config.config import C4_BATCH_MAX_ITEMS
+from app.jobs import JobPriority
+from api.jobs import run_job, stream_job, submit_job, job_accepted
 
 
 
@@ -16,20 +27,40 @@ class SequenceToC4Request(BaseModel):
     c4_type: int  # 1 για System Context, 2 για Container
 
 
+class C4BatchItem(BaseModel):
+    content: str  # MermaidJS sequence diagram
+    title: Optional[str] = None  # τίτλος για την αποθήκευση (default: "C4 <level>")
 
 
-@router.post("/c4diagram", response_model=dict)
-async def generate_c4_diagram(request: SequenceToC4Request):
+class C4BatchRequest(BaseModel):
+    items: List[C4BatchItem]
+    c4_types: List[int] = [1, 2, 3]
+    persist: bool = False  # αποθήκευση στα diagrams του project_id, σε ένα transaction
+    project_id: Optional[str] = None
+
+
+def _validate_c4_type(c4_type: int):
+    if c4_type not in (1, 2, 3):
+        raise HTTPException(status_code=400, detail="Invalid c4_type. Use 1 (System Context), 2 (Container), or 3 (Component).")
+
+
+@router.post("/c4diagram", response_model=schemas.C4DiagramResult)
+async def generate_c4_diagram(request: SequenceToC4Request, http_request: Request, use_cache: bool = True):
     logger.info(f"request: {request}")
+    _validate_c4_type(request.c4_type)
+
+    async def run():
+        answer = await c4_diagram(request.content, request.c4_type, use_cache=use_cache)
+        if answer is None:
+            raise RuntimeError("LLM call failed")
+        yield "result", await parse_c4_answer(answer, request.c4_type, use_cache=use_cache)
+
     try:
-        response = c4_diagram(request.content, request.c4_type)
-        logger.info("============================")
+        response = await run_job("c4diagram", run, JobPriority.interactive, request=http_request)
         logger.debug(response)
-        logger.info("============================")
-        return {
-            "diagram": "diagram",
-            "explanation": "explanation"
-        }
+        return response
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(e)
         raise HTTPException(status_code=400, detail=str(e))
@@ -37,8 +68,132 @@ async def generate_c4_diagram(request: SequenceToC4Request):
         logger.error(e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
-   
 
+@router.post("/c4diagram/stream")
+async def generate_c4_diagram_stream(request: SequenceToC4Request, http_request: Request, use_cache: bool = True):
+    """
+    SSE εκδοχή του /c4diagram: events `status`, `progress`, `token`, `heartbeat`, `result`, `error`.
+    """
+    logger.info(f"request (stream): {request}")
+    _validate_c4_type(request.c4_type)
+    return await stream_job(
+        "c4diagram",
+        lambda: stream_c4_diagram(request.content, request.c4_type, use_cache=use_cache),
+        JobPriority.interactive,
+        request=http_request,
+    )
+
+
+@router.post("/c4diagram/jobs", response_model=dict, status_code=202)
+async def submit_c4_diagram_job(request: SequenceToC4Request, http_request: Request, use_cache: bool = True):
+    """
+    Βάζει το C4 generation στην ουρά και επιστρέφει αμέσως job id
+    (polling στο /jobs/{job_id} ή SSE στο /jobs/{job_id}/events).
+    """
+    logger.info(f"request (job): {request}")
+    _validate_c4_type(request.c4_type)
+    job = await submit_job(
+        "c4diagram",
+        lambda: stream_c4_diagram(request.content, request.c4_type, use_cache=use_cache),
+        JobPriority.interactive,
+        request=http_request,
+    )
+    return job_accepted(job)
+
+
+async def _validate_c4_batch(request: C4BatchRequest):
+    if not request.items or not request.c4_types:
+        raise HTTPException(status_code=400, detail="items and c4_types must not be empty.")
+    for c4_type in request.c4_types:
+        _validate_c4_type(c4_type)
+    total = len(request.items) * len(set(request.c4_types))
+    if total > C4_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch too large ({total} generations, max {C4_BATCH_MAX_ITEMS}).")
+    if request.persist:
+        if not request.project_id:
+            raise HTTPException(status_code=400, detail="project_id is required when persist is true.")
+        async with AsyncSessionLocal() as db:
+            if await db.get(models.Project, request.project_id) is None:
+                raise HTTPException(status_code=404, detail="Project not found")
+
+
+def _upsert_c4_results(request: C4BatchRequest, results: list, db) -> list:
+    diagrams = []
+    for item in results:
+        if item["error"] is not None:
+            continue
+        title = request.items[item["index"]].title or "C4"
+        diagrams.append((item, diagrams_repository.upsert_diagram(
+            request.project_id,
+            None,
+            schemas.DiagramCreate(title=f"{title} - {item['level']}", mermaid_code=item["diagram"],
+                                  type=f"C4 {item['level']}"),
+            db,
+            commit=False,
+        )))
+    # Τα ids υπάρχουν μόνο μετά το flush (autoflush=False)
+    db.flush()
+    for item, db_diagram in diagrams:
+        item["diagram_id"] = db_diagram.id
+    return results
+
+
+async def _persist_c4_batch(request: C4BatchRequest, results: list) -> list:
+    # Όλα τα diagrams σε ένα transaction· αν κάτι αποτύχει δεν αποθηκεύεται κανένα
+    async with AsyncSessionLocal() as db:
+        async with write_transaction(db):
+            return await db.run_sync(lambda session: _upsert_c4_results(request, results, session))
+
+
+def _c4_batch_runner(request: C4BatchRequest, use_cache: bool):
+    c4_types = list(dict.fromkeys(request.c4_types))
+
+    async def run():
+        async for event, data in stream_c4_batch([item.content for item in request.items], c4_types,
+                                                 use_cache=use_cache):
+            if event != "result":
+                yield event, data
+                continue
+            if request.persist:
+                yield "progress", {"stage": "persisting"}
+                data = await _persist_c4_batch(request, data)
+            yield "result", data
+
+    return run
+
+
+@router.post("/c4diagram/batch", response_model=list)
+async def generate_c4_diagram_batch(request: C4BatchRequest, http_request: Request, use_cache: bool = True):
+    """
+    Παράγει όλα τα ζητούμενα C4 levels για ένα ή περισσότερα sequence diagrams
+    ταυτόχρονα (έως C4_BATCH_CONCURRENCY) και επιστρέφει τα αποτελέσματα με τη
+    σειρά του request. Με `persist` αποθηκεύονται στο project σε ένα transaction.
+    """
+    logger.info(f"request (batch): {len(request.items)} diagrams, levels {request.c4_types}")
+    await _validate_c4_batch(request)
+    return await run_job(
+        "c4diagram-batch", _c4_batch_runner(request, use_cache), JobPriority.interactive, request=http_request
+    )
+
+
+@router.post("/c4diagram/batch/stream")
+async def generate_c4_diagram_batch_stream(request: C4BatchRequest, http_request: Request, use_cache: bool = True):
+    """
+    SSE εκδοχή του /c4diagram/batch: ένα `item` event μόλις ολοκληρωθεί κάθε
+    generation και στο τέλος `result` με όλα τα αποτελέσματα.
+    """
+    logger.info(f"request (batch stream): {len(request.items)} diagrams, levels {request.c4_types}")
+    await _validate_c4_batch(request)
+    return await stream_job(
+        "c4diagram-batch", _c4_batch_runner(request, use_cache), JobPriority.interactive, request=http_request
+    )
 
 
-    
\ No newline at end of file
+@router.post("/c4diagram/batch/jobs", response_model=dict, status_code=202)
+async def submit_c4_diagram_batch_job(request: C4BatchRequest, http_request: Request, use_cache: bool = True):
+    logger.info(f"request (batch job): {len(request.items)} diagrams, levels {request.c4_types}")
+    await _validate_c4_batch(request)
+    job = await submit_job(
+        "c4diagram-batch", _c4_batch_runner(request, use_cache), JobPriority.interactive, request=http_request
+    )
+    return job_accepted(job)
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, status
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from typing import Optional
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import schemas
-from app.database import get_db
+from app.database import get_async_db, write_transaction
 from app.repositories import diagrams_repository
+from app.utils.pagination import PageRequest, page_params, page_response, page_responses
 import logging
 
 logger = logging.getLogger("diagrams_api")
@@ -11,14 +12,17 @@ logger = logging.getLogger("diagrams_api")
 # Το prefix περιέχει ήδη το {project_id}
 router = APIRouter(prefix="/projects/{project_id}/diagrams", tags=["Diagrams"])
 
+# Τα repository functions είναι sync (Session)· τρέχουν μέσα στο AsyncSession με run_sync
+
 
 @router.post(
     "/add", response_model=schemas.DiagramResponse, status_code=status.HTTP_201_CREATED
 )
-def add_diagram(
-    project_id: str, diagram: schemas.DiagramCreate, db: Session = Depends(get_db)
+async def add_diagram(
+    project_id: str, diagram: schemas.DiagramCreate, db: AsyncSession = Depends(get_async_db)
 ):
-    return diagrams_repository.insert_diagram(project_id, diagram, db)
+    async with write_transaction(db):
+        return await db.run_sync(lambda session: diagrams_repository.insert_diagram(project_id, diagram, session))
 
 
 @router.put(
@@ -26,22 +30,33 @@ def add_diagram(
     response_model=schemas.DiagramResponse,
     status_code=status.HTTP_200_OK,
 )
-def update_diagram_endpoint(
+async def update_diagram_endpoint(
     project_id: str,
     diagram_id: int,
     diagram: schemas.DiagramCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return diagrams_repository.update_diagram(diagram_id, diagram, db)
+    async with write_transaction(db):
+        return await db.run_sync(lambda session: diagrams_repository.update_diagram(diagram_id, diagram, session))
 
 
 @router.get(
     "/list",
-    response_model=list[schemas.DiagramResponse],
+    response_model=None,
+    responses=page_responses(schemas.DiagramResponse),
     status_code=status.HTTP_200_OK,
 )
-def list_diagrams_endpoint(project_id: str, db: Session = Depends(get_db)):
-    return diagrams_repository.list_diagrams(project_id, db)
+async def list_diagrams_endpoint(
+    project_id: str,
+    request: Request,
+    type: Optional[str] = None,
+    page: PageRequest = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+):
+    items, next_cursor = await db.run_sync(
+        lambda session: diagrams_repository.list_diagrams(project_id, session, page, type=type)
+    )
+    return page_response(request, schemas.DiagramResponse, items, next_cursor)
 
 
 @router.get(
@@ -49,32 +64,36 @@ def list_diagrams_endpoint(project_id: str, db: Session = Depends(get_db)):
     response_model=schemas.DiagramResponse,
     status_code=status.HTTP_200_OK,
 )
-def get_diagram_endpoint(
-    project_id: str, diagram_id: int, db: Session = Depends(get_db)
+async def get_diagram_endpoint(
+    project_id: str, diagram_id: int, db: AsyncSession = Depends(get_async_db)
 ):
-    return diagrams_repository.get_diagram(project_id, diagram_id, db)
+    return await db.run_sync(lambda session: diagrams_repository.get_diagram(project_id, diagram_id, session))
 
 
 @router.delete("/{diagram_id}", status_code=204)
-def remove_diagram(
+async def remove_diagram(
     project_id: str,  # Get from path
     diagram_id: int,  # Changed to int
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return diagrams_repository.delete_diagram(db, project_id, diagram_id)
+    async with write_transaction(db):
+        await db.run_sync(lambda session: diagrams_repository.delete_diagram(project_id, diagram_id, session))
 
 
 @router.post("", response_model=schemas.DiagramResponse)  # Single POST endpoint
-def upsert_diagram(
+async def upsert_diagram(
     project_id: str,
     diagram_data: schemas.DiagramBase,  # Includes optional diagram_id
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Upsert a diagram:
     - If diagram_id is provided → UPDATE (if exists) or error (if not found).
     - If no diagram_id → CREATE new diagram.
     """
-    return diagrams_repository.upsert_diagram(
-        project_id, diagram_data.diagram_id, diagram_data, db
-    )
+    async with write_transaction(db):
+        return await db.run_sync(
+            lambda session: diagrams_repository.upsert_diagram(
+                project_id, diagram_data.diagram_id, diagram_data, session, commit=False
+            )
+        )
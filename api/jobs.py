@@ -0,0 +1,142 @@
+import asyncio
+import time
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException, Request
+from app.config.config import REQUEST_DEADLINE_HEADER, REQUEST_DEFAULT_BUDGET, REQUEST_MAX_BUDGET
+from app.exceptions.custom_exceptions import JobQueueFullError, JobCancelledError, JobDeadlineExceededError
+from app.jobs import job_manager, Job, JobPriority, JobRunner, CancelReason
+from app.logger import get_logger
+from app.utils.sse import sse_response
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+logger = get_logger()
+
+
+def request_deadline(request: Request | None) -> float | None:
+    """
+    Το deadline (unix timestamp) του request από το header X-Request-Deadline: budget
+    σε seconds ("30"), unix timestamp ή ISO 8601 ημερομηνία. Περιορίζεται στο REQUEST_MAX_BUDGET.
+    """
+    value = request.headers.get(REQUEST_DEADLINE_HEADER) if request is not None else None
+    now = time.time()
+    if not value:
+        return now + REQUEST_DEFAULT_BUDGET if REQUEST_DEFAULT_BUDGET > 0 else None
+    try:
+        number = float(value.strip().rstrip("s"))
+        deadline = number if number > 1_000_000_000 else now + number
+    except ValueError:
+        try:
+            deadline = datetime.fromisoformat(value.strip()).timestamp()
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid {REQUEST_DEADLINE_HEADER} header: {value}")
+    if deadline <= now:
+        raise HTTPException(status_code=504, detail="Request deadline already passed")
+    return min(deadline, now + REQUEST_MAX_BUDGET)
+
+
+async def _wait_for_disconnect(request: Request):
+    # Το body έχει ήδη διαβαστεί, οπότε το επόμενο ASGI message είναι το http.disconnect
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def submit_job(kind: str, runner: JobRunner, priority: JobPriority, cleanup=None,
+                     request: Request | None = None) -> Job:
+    try:
+        deadline = request_deadline(request)
+    except HTTPException:
+        if cleanup is not None:
+            cleanup()
+        raise
+    try:
+        return await job_manager.submit(kind, runner, priority, cleanup, deadline)
+    except JobQueueFullError as e:
+        if cleanup is not None:
+            cleanup()
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
+
+async def run_job(kind: str, runner: JobRunner, priority: JobPriority, cleanup=None, request: Request | None = None):
+    """
+    Για τα blocking endpoints: το request περιμένει το αποτέλεσμα, αλλά η εκτέλεση
+    περνά από την ουρά ώστε να τηρείται το όριο concurrency. Με `request` το job
+    ακυρώνεται αν ο client αποσυνδεθεί και τηρείται το deadline του header.
+    """
+    job = await submit_job(kind, runner, priority, cleanup, request)
+    waiter = asyncio.ensure_future(job_manager.wait(job))
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request)) if request is not None else None
+    try:
+        if watcher is not None:
+            await asyncio.wait({waiter, watcher}, return_when=asyncio.FIRST_COMPLETED)
+            if not waiter.done():
+                await job_manager.cancel(job, CancelReason.client_disconnected)
+                # Ο client δεν θα λάβει την απάντηση· 499 όπως στο nginx
+                raise HTTPException(status_code=499, detail="Client closed request")
+        return await waiter
+    except JobDeadlineExceededError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except JobCancelledError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except BaseException:
+        await job_manager.cancel(job, CancelReason.client_disconnected)
+        raise
+    finally:
+        for task in (waiter, watcher):
+            if task is not None and not task.done():
+                task.cancel()
+
+
+async def stream_job(kind: str, runner: JobRunner, priority: JobPriority, cleanup=None,
+                     request: Request | None = None):
+    # Το StreamingResponse ακυρώνει το follow όταν ο client αποσυνδεθεί, άρα και το job
+    job = await submit_job(kind, runner, priority, cleanup, request)
+    return sse_response(job_manager.follow(job))
+
+
+def job_accepted(job: Job) -> dict:
+    return {
+        **job.snapshot(),
+        "status_url": f"/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events",
+    }
+
+
+def _get_job(job_id: str) -> Job:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/stats", response_model=dict)
+def jobs_stats():
+    """
+    Queue depth, jobs σε εκτέλεση και κατανομές wait/run time.
+    """
+    return job_manager.stats()
+
+
+@router.get("/{job_id}", response_model=dict)
+def get_job(job_id: str):
+    return _get_job(job_id).snapshot()
+
+
+@router.get("/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    SSE subscription στα events ενός job (replay όσων έχουν ήδη γίνει + τα νέα).
+    Το κλείσιμο του connection δεν ακυρώνει το job.
+    """
+    job = _get_job(job_id)
+    return sse_response(job_manager.follow(job, cancel_on_exit=False))
+
+
+@router.delete("/{job_id}", response_model=dict)
+async def cancel_job(job_id: str):
+    job = _get_job(job_id)
+    await job_manager.cancel(job)
+    logger.info(f"🛑 Cancellation requested for job {job_id}")
+    return job.snapshot()
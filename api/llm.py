@@ -0,0 +1,104 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+from typing import Optional
+from app.llm_cache import llm_cache
+from app.semantic_cache import semantic_cache
+from app.singleflight import llm_flights
+from app.prompt_templates import prompt_registry
+from app.model_lifecycle import model_lifecycle
+from app.ollama_pool import ollama_pool
+from app.structured_output import parse_stats
+from app.logger import get_logger
+
+router = APIRouter(prefix="/llm", tags=["LLM"])
+logger = get_logger()
+
+
+@router.get("/cache/stats", response_model=dict)
+def cache_stats():
+    return llm_cache.stats()
+
+
+@router.delete("/cache", response_model=dict)
+def invalidate_cache(prompt_key: Optional[str] = None):
+    """
+    Invalidate όλο το cache ή μόνο τις εγγραφές ενός prompt_key.
+    """
+    deleted = llm_cache.clear(prompt_key)
+    logger.info(f"🧹 LLM cache invalidated ({deleted} entries, prompt_key={prompt_key})")
+    return {"deleted": deleted}
+
+
+@router.delete("/cache/{key}", response_model=dict)
+def invalidate_cache_entry(key: str):
+    if not llm_cache.delete(key):
+        raise HTTPException(status_code=404, detail="Cache entry not found")
+    return {"deleted": 1}
+
+
+@router.get("/semantic-cache/stats", response_model=dict)
+def semantic_cache_stats():
+    """
+    Entries, hits (και πόσα ήταν ίδιο κείμενο) και το similarity threshold του semantic cache.
+    """
+    return semantic_cache.stats()
+
+
+@router.delete("/semantic-cache", response_model=dict)
+def invalidate_semantic_cache(prompt_key: Optional[str] = None):
+    deleted = semantic_cache.clear(prompt_key)
+    logger.info(f"🧹 Semantic cache invalidated ({deleted} entries, prompt_key={prompt_key})")
+    return {"deleted": deleted}
+
+
+@router.get("/inflight/stats", response_model=dict)
+def inflight_stats():
+    """
+    Single-flight metrics: generations σε εξέλιξη, waiters ανά generation και coalescing ratio.
+    """
+    return llm_flights.stats()
+
+
+@router.get("/backends", response_model=list)
+def ollama_backends():
+    """
+    Ανά Ollama backend: health, in-flight requests, EWMA latency/TTFB και αποτυχίες.
+    """
+    return ollama_pool.stats()
+
+
+@router.get("/prompts", response_model=list)
+def prompt_templates():
+    """
+    Τα registered prompt templates με το hash του σταθερού prefix και τα static tokens του.
+    """
+    return prompt_registry.stats()
+
+
+@router.get("/parse/stats", response_model=dict)
+def structured_output_stats():
+    """
+    Ανά prompt_key: ποσοστό απαντήσεων που έγιναν validate με την πρώτη, πόσες
+    χρειάστηκαν repair (calls και χρόνος) και πόσες απέτυχαν.
+    """
+    return parse_stats.stats()
+
+
+@router.get("/ready", response_model=dict)
+async def model_ready():
+    """
+    Readiness probe: 200 όταν το μοντέλο είναι φορτωμένο στο Ollama, αλλιώς 503,
+    ώστε ο load balancer να στέλνει traffic μόνο σε ζεστά instances.
+    """
+    readiness = await model_lifecycle.readiness()
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+
+@router.post("/warmup", response_model=dict)
+async def model_warmup():
+    """
+    Φορτώνει (ή κρατά φορτωμένο) το μοντέλο με ένα κενό generate.
+    """
+    if not await model_lifecycle.warm_up():
+        raise HTTPException(status_code=503, detail=model_lifecycle.last_error)
+    return await model_lifecycle.readiness()
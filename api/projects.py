@@ -1,39 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Optional, Union
 from app.repositories import projects_repository
-from app import models, schemas
-from app.database import get_db
+from app import schemas
+from app.database import get_async_db, write_transaction
+from app.outline_cache import outline_cache, etag_matches
+from app.utils.pagination import PageRequest, page_params, page_response, page_responses
 import logging
-from app.decorators.safe_route import safe_route, safe_get_route
 from sqlalchemy.exc import SQLAlchemyError
-from fastapi.responses import JSONResponse
-from app.utils.json_utils import _is_json
-from app.exceptions.custom_exceptions import NotFoundError
-from sqlalchemy.orm import Session, joinedload
+from app.exceptions.custom_exceptions import NotFoundError, ProjectNotFoundError
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
+# Τα repository functions είναι sync (Session)· τρέχουν μέσα στο AsyncSession με run_sync
 
 @router.post("/create", response_model=schemas.ProjectResponse, status_code=201)
-def create_project(project: schemas.ProjectCreate, db: Session = Depends(get_db)):
-    projects_repository.create_project(
-        id=project.id, name=project.name, description=project.description
-    )
+async def create_project(project: schemas.ProjectCreate, db: AsyncSession = Depends(get_async_db)):
+    async with write_transaction(db):
+        return await db.run_sync(lambda session: projects_repository.create_project(project, session))
 
 
-@router.get("/list", response_model=List[schemas.ProjectResponse])
-def list_projects(db: Session = Depends(get_db)):
+@router.get("/list", response_model=None, responses=page_responses(schemas.ProjectResponse))
+async def list_projects(
+    request: Request,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    page: PageRequest = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Keyset pagination σε (created_at, id): η επόμενη σελίδα με ?cursor=<X-Next-Cursor>.
+    """
     try:
-        response = projects_repository.list_projects(db)
-        
-        if response is None:
-            raise HTTPException(404, detail="Resource not found")
-            
-        # Auto-convert to JSONResponse if serializable
-        return JSONResponse(response) if _is_json(response) else response
-        
+        items, next_cursor = await db.run_sync(
+            lambda session: projects_repository.list_projects(session, page, created_after, created_before)
+        )
+        return page_response(request, schemas.ProjectResponse, items, next_cursor)
     except HTTPException:
         raise
     except SQLAlchemyError as e:
@@ -41,17 +45,34 @@ def list_projects(db: Session = Depends(get_db)):
         raise HTTPException(503, detail="Service temporarily unavailable")
     except Exception as e:
         logger.error(f"Unexpected GET error: {e}")
-        raise HTTPException(500, detail="Internal server error")    
-    except NotFoundError as e:
-        logger.error(f"Unexpected GET error: {e}")
-        raise HTTPException(404, detail="Resource not found")      
+        raise HTTPException(500, detail="Internal server error")
 
-@router.get("/{project_id}/outline", response_model=schemas.ProjectOutlineResponse)
-def project_outline(project_id: str, db: Session = Depends(get_db)):
+@router.get(
+    "/{project_id}/outline",
+    response_model=Union[schemas.ProjectOutlineResponse, schemas.ProjectOutlineLightResponse],
+)
+async def project_outline(project_id: str, request: Request, light: bool = False,
+                          db: AsyncSession = Depends(get_async_db)):
+    """
+    light=true: τα diagrams χωρίς mermaid_code (id, title, type).
+    Σερβίρεται από το outline cache με strong ETag· If-None-Match → 304.
+    """
     try:
-        response =  projects_repository.get_project_outline(project_id, db)
-        return JSONResponse(response) if _is_json(response) else response
-    except NotFoundError as e:
+        version = await db.run_sync(lambda session: projects_repository.get_project_version(project_id, session))
+        entry = outline_cache.get(project_id, light, version)
+        if entry is None:
+            outline = await db.run_sync(
+                lambda session: projects_repository.get_project_outline(project_id, session, light=light)
+            )
+            schema = schemas.ProjectOutlineLightResponse if light else schemas.ProjectOutlineResponse
+            body = schema.model_validate(outline).model_dump_json().encode("utf-8")
+            entry = outline_cache.put(project_id, light, version, body)
+        # no-cache: ο client ξαναρωτά κάθε φορά, αλλά με If-None-Match
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(entry.body, media_type="application/json", headers=headers)
+    except (NotFoundError, ProjectNotFoundError) as e:
         logger.error(f"Unexpected GET error: {e}")
         raise HTTPException(404, detail="Resource not found")           
     except SQLAlchemyError as e:
@@ -64,5 +85,9 @@ def project_outline(project_id: str, db: Session = Depends(get_db)):
         raise HTTPException(500, detail="Internal server error")              
         
 @router.delete("/{project_id}/delete", response_model=dict)
-def delete_project(project_id: str, db: Session = Depends(get_db)):
-    projects_repository.delete(project_id, db)
+async def delete_project(project_id: str, db: AsyncSession = Depends(get_async_db)):
+    async with write_transaction(db):
+        deleted = await db.run_sync(lambda session: projects_repository.delete_project(project_id, session))
+    if not deleted:
+        raise HTTPException(404, detail="Resource not found")
+    return {"deleted": project_id}
@@ -1,16 +1,29 @@
-from sqlalchemy.orm import Session
-from app import models, schemas, database
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas
+from app.database import AsyncSessionLocal, get_async_db, write_transaction
+from app.schemas import ExtractedRequirement
+from app.repositories import requirements_repository
 
-from inspect import getmembers
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Path, Body
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Path, Body, Request, Response
 from pydantic import BaseModel
 from app.logger import get_logger
-from app.diagrams.generate_diagrams import generate_c4_diagram as c4_diagram
-from typing import List
-from app.requirements.analyze_requirements import analyze_requirements
-import tempfile
-import os
-from app.utils.pdf_processor import process_pdf
+from typing import List, Literal, Optional
+from app.requirements.analyze_requirements import (
+    analyze_requirements,
+    extract_requirements,
+    merge_requirements,
+    stream_requirements,
+    stream_requirements_chunked,
+)
+import asyncio
+from app.utils.pdf_processor import extract_pdf_text, aiter_pdf_chunks
+from app.config.config import REQUIREMENTS_CHUNK_TOKENS
+from app.jobs import JobPriority
+from app.utils.uploads import ingest_uploads
+from app.exceptions.custom_exceptions import UploadTooLargeError
+from api.jobs import run_job, stream_job, submit_job, job_accepted
+from app.utils.pagination import PageRequest, page_params, page_response, page_responses
+from app.utils.bulk import read_bulk_items, validate_items, bulk_result
 
 logger = get_logger()
 
@@ -19,77 +32,280 @@ router = APIRouter(prefix="/projects/{project_id}/requirements", tags=["Requirem
 class RequirementsRequest(BaseModel):
     content: str
 
-class RequirementItem(BaseModel):
-    title: str
-    description: str
-    functional: bool
+@router.post("/add", response_model=schemas.RequirementAddResponse, status_code=201,
+             responses={200: {"model": schemas.RequirementAddResponse, "description": "Υπάρχει ήδη το ίδιο requirement"}})
+async def add_requirement(
+    response: Response,
+    project_id: str = Path(..., description="ID του project"),
+    req: schemas.RequirementCreate = Body(...),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    201 με created=true για νέο requirement (με possible_duplicate_of αν μοιάζει με
+    υπάρχον)· 200 με created=false και duplicate_of αν το project έχει ήδη το ίδιο.
+    """
+    if await db.get(models.Project, project_id) is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    async with write_transaction(db):
+        db_req, match = await db.run_sync(
+            lambda session: requirements_repository.create_requirement(project_id, req, session, commit=False)
+        )
+    created = match is None or not match.merge
+    if not created:
+        response.status_code = 200
+    return {
+        **schemas.RequirementResponse.model_validate(db_req).model_dump(),
+        "created": created,
+        **requirements_repository.duplicate_fields(match),
+    }
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
-@router.post("/add", response_model=schemas.RequirementResponse)
-def add_requirement(
+@router.post("/bulk", response_model=schemas.BulkResult)
+async def bulk_add_requirements(
+    request: Request,
     project_id: str = Path(..., description="ID του project"),
-    req: schemas.RequirementCreate = Body(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
-    if not project:
+    """
+    Πολλά requirements σε ένα transaction: JSON array ή NDJSON (Content-Type: application/x-ndjson).
+    Items ίδια με υπάρχον requirement (ή με άλλο item του batch) επιστρέφουν το υπάρχον id
+    με created=false και duplicate_of· τα near-duplicates δημιουργούνται με possible_duplicate_of.
+    Τα άκυρα items επιστρέφονται στο `errors` με τη θέση τους.
+    """
+    items, errors = validate_items(await read_bulk_items(request), schemas.RequirementCreate)
+    if await db.get(models.Project, project_id) is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    db_req = models.Requirement(
-        project_id=project_id,
-        description=req.description,
-        category=req.category
+    async with write_transaction(db):
+        results = await db.run_sync(
+            lambda session: requirements_repository.bulk_create_requirements(project_id, items, session)
+        )
+    return bulk_result(results, errors)
+
+
+async def _ensure_project(project_id: str):
+    async with AsyncSessionLocal() as db:
+        if await db.get(models.Project, project_id) is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+
+def _requirement_create(item: dict) -> schemas.RequirementCreate:
+    # Το requirements table δεν έχει title· κρατιέται ως πρόθεμα της περιγραφής
+    title, description = item.get("title"), item.get("description") or ""
+    return schemas.RequirementCreate(
+        description=f"{title}: {description}" if title else description,
+        category=(schemas.RequirementCategory.functional if item.get("functional", True)
+                  else schemas.RequirementCategory.non_functional),
     )
-    db.add(db_req)
-    db.commit()
-    db.refresh(db_req)
-    return db_req 
 
 
+async def _persist_requirements(project_id: str, requirements: list[dict]) -> dict:
+    items = [
+        (index, _requirement_create(item))
+        for index, item in enumerate(requirements)
+        if item.get("description") or item.get("title")
+    ]
+    async with AsyncSessionLocal() as db:
+        async with write_transaction(db):
+            results = await db.run_sync(
+                lambda session: requirements_repository.bulk_create_requirements(project_id, items, session)
+            )
+    return bulk_result(results, [])
+
 
-@router.post("/", response_model=List[RequirementItem])
-async def analyze_requirements_from_content(request: RequirementsRequest):
-    # Η λογική σου για να δημιουργήσεις τη λίστα από requirements.
-    # Παράδειγμα:
-    requirements_response: List[RequirementItem] = []
-    response = analyze_requirements(request.content)
-    logger.info(f"Requirements: {response}")
+@router.post("/", response_model=List[ExtractedRequirement])
+async def analyze_requirements_from_content(request: RequirementsRequest, http_request: Request,
+                                            use_cache: bool = True):
+    async def run():
+        yield "result", await analyze_requirements(request.content, use_cache=use_cache)
+
+    requirements_response: List[ExtractedRequirement] = await run_job(
+        "requirements", run, JobPriority.normal, request=http_request
+    )
+    logger.info(f"Requirements: {requirements_response}")
 
     return requirements_response
     
-@router.get("/list", response_model=List[RequirementItem])
-async def get_requirements(project_id: str):
-    # Η λογική σου για να δημιουργήσεις τη λίστα από requirements.
-    # Παράδειγμα:
-    requirements_response: List[RequirementItem] = []
+@router.get("/list", response_model=None, responses=page_responses(schemas.RequirementResponse))
+async def get_requirements(
+    project_id: str,
+    request: Request,
+    status: Optional[schemas.RequirementStatus] = None,
+    category: Optional[schemas.RequirementCategory] = None,
+    page: PageRequest = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db),
+):
+    items, next_cursor = await db.run_sync(
+        lambda session: requirements_repository.list_requirements(
+            project_id, session, page, status=status, category=category
+        )
+    )
+    return page_response(request, schemas.RequirementResponse, items, next_cursor)
 
-    return requirements_response    
-    
-@router.post("/upload-and-process", response_model=List[RequirementItem])
-async def upload_and_process_requirements(project_id: str, files: List[UploadFile] = File(...)):
-    requirements_response: List[RequirementItem] = []
-
-    for upload_file in files:
-        # Αποθήκευση προσωρινά
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            content = await upload_file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-
-        # Επεξεργασία PDF (χωρίς chunks)
-        chunks = process_pdf(tmp_path, max_chunk_length=1000000)  # Μεγάλο όριο για να πάρεις όλο το κείμενο ως ένα chunk
-        if chunks:
-            full_text = chunks[0]  # Πάρε όλο το cleaned text
-            reqs = analyze_requirements(full_text)
+
+async def _ingest_uploads(files: List[UploadFile]):
+    # Τα uploads γίνονται ingest πριν μπει το job στην ουρά, γιατί κλείνουν μαζί με το request
+    try:
+        return await ingest_uploads(files)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+
+ExtractionMode = Literal["auto", "single", "map_reduce"]
+
+
+async def _process_uploads(uploads, use_cache: bool, mode: ExtractionMode = "auto", stream_tokens: bool = True,
+                           persist_project_id: str | None = None):
+    """
+    Pipeline του upload-and-process ως (event, data): progress ανά αρχείο, τα tokens
+    του LLM και ένα `item` ανά requirement (αν `stream_tokens`) ή progress ανά chunk
+    στο map-reduce, και στο τέλος `result` με όλα τα requirements. Αν απέτυχαν chunks,
+    πριν το `result` έρχεται ("partial", {"partial": true, "failed_chunks": [...]}).
+    persist_project_id: τα requirements αποθηκεύονται στο project με ένα bulk insert.
+    """
+    requirements_response: List[ExtractedRequirement] = []
+    failed_chunks = []
+    processed = set()
+    for index, upload in enumerate(uploads, start=1):
+        filename = upload.filename
+        progress = {"file": filename, "index": index, "total": len(uploads), "sha256": upload.sha256}
+        if upload.sha256 in processed:
+            # Ίδιο περιεχόμενο με προηγούμενο αρχείο του ίδιου request
+            yield "progress", {**progress, "stage": "duplicate"}
+            continue
+        processed.add(upload.sha256)
+        yield "progress", {**progress, "stage": "extracting"}
+        if mode == "single":
+            # Όλο το έγγραφο σε ένα prompt· εξαγωγή εκτός event loop
+            full_text = await asyncio.to_thread(extract_pdf_text, upload.source)
+            chunks = [full_text] if full_text else []
+        else:
+            # Η εξαγωγή γίνεται streaming: κοιτάμε τα δύο πρώτα chunks για να διαλέξουμε
+            # μονοπάτι και το map-reduce ξεκινά ενώ η εξαγωγή συνεχίζεται
+            pdf_chunks = aiter_pdf_chunks(upload.source, REQUIREMENTS_CHUNK_TOKENS)
+            chunks = []
+            async for chunk in pdf_chunks:
+                chunks.append(chunk)
+                if len(chunks) == 2:
+                    break
+        if not chunks:
+            yield "progress", {**progress, "stage": "empty"}
+            continue
+
+        if len(chunks) > 1:
+            async def remaining_chunks(head=chunks, rest=pdf_chunks):
+                for chunk in head:
+                    yield chunk
+                async for chunk in rest:
+                    yield chunk
+
+            yield "progress", {**progress, "stage": "analyzing", "chunks": None}
+            async for event, data in stream_requirements_chunked(remaining_chunks(), use_cache=use_cache):
+                if event == "result":
+                    requirements_response.extend(data)
+                    yield "progress", {**progress, "stage": "done", "requirements": len(data)}
+                elif event == "partial":
+                    failed_chunks.extend({**failure, "file": filename} for failure in data["failed_chunks"])
+                else:
+                    yield event, {**data, "file": filename}
+            continue
+
+        yield "progress", {**progress, "stage": "analyzing", "chunks": 1}
+        if not stream_tokens:
+            reqs, _ = await extract_requirements(chunks[0], use_cache=use_cache)
             logger.debug(reqs)
             requirements_response.extend(reqs)
+            yield "progress", {**progress, "stage": "done", "requirements": len(reqs)}
+            continue
+
+        async for event, data in stream_requirements(chunks[0], use_cache=use_cache):
+            if event == "result":
+                requirements_response.extend(data)
+                yield "progress", {**progress, "stage": "done", "requirements": len(data)}
+            else:
+                yield event, {**data, "file": filename}
+
+    # Τα ίδια requirements εμφανίζονται συχνά σε περισσότερα αρχεία (π.χ. εκδόσεις του ίδιου εγγράφου)
+    merged = merge_requirements([requirements_response])
+    possible = sum(1 for requirement in merged if requirement.get("possible_duplicate_of") is not None)
+    if len(merged) < len(requirements_response) or possible:
+        yield "progress", {"stage": "dedup", "removed": len(requirements_response) - len(merged),
+                           "possible_duplicates": possible}
+    if persist_project_id is not None:
+        persisted = await _persist_requirements(persist_project_id, merged)
+        possible = sum(1 for item in persisted["items"] if item.get("possible_duplicate_of") is not None)
+        yield "progress", {"stage": "persist", "created": persisted["created"], "merged": persisted["merged"],
+                           "possible_duplicates": possible}
+    if failed_chunks:
+        yield "partial", {"partial": True, "failed_chunks": failed_chunks}
+    yield "result", merged
 
-        os.remove(tmp_path)
 
+@router.post("/upload-and-process", response_model=List[ExtractedRequirement])
+async def upload_and_process_requirements(project_id: str, request: Request, response: Response,
+                                          files: List[UploadFile] = File(...), use_cache: bool = True,
+                                          mode: ExtractionMode = "auto", persist: bool = False):
+    """
+    mode: "single" στέλνει όλο το έγγραφο σε ένα prompt, "map_reduce" το σπάει σε chunks
+    που αναλύονται παράλληλα, "auto" κάνει map-reduce μόνο όταν δεν χωράει σε ένα chunk.
+    persist=true: τα requirements αποθηκεύονται και στο project (bulk· όσα υπάρχουν ήδη δεν ξαναμπαίνουν).
+    Αν απέτυχαν chunks το αποτέλεσμα είναι μερικό: X-Partial-Result: true και X-Failed-Chunks.
+    """
+    if persist:
+        await _ensure_project(project_id)
+    uploads, cleanup = await _ingest_uploads(files)
+    failed_chunks = []
+
+    async def run():
+        async for event, data in _process_uploads(uploads, use_cache, mode, stream_tokens=False,
+                                                  persist_project_id=project_id if persist else None):
+            if event == "partial":
+                failed_chunks.extend(data["failed_chunks"])
+            yield event, data
+
+    requirements_response = await run_job("upload-and-process", run, JobPriority.bulk, cleanup, request=request)
+    if failed_chunks:
+        # Το body μένει λίστα requirements· το μερικό αποτέλεσμα φαίνεται στα headers
+        response.headers["X-Partial-Result"] = "true"
+        response.headers["X-Failed-Chunks"] = str(len(failed_chunks))
     return requirements_response
-    
\ No newline at end of file
+
+
+@router.post("/upload-and-process/stream")
+async def upload_and_process_requirements_stream(project_id: str, request: Request, files: List[UploadFile] = File(...),
+                                                 use_cache: bool = True, mode: ExtractionMode = "auto",
+                                                 persist: bool = False):
+    """
+    SSE εκδοχή του upload-and-process: progress ανά αρχείο, τα tokens του LLM
+    όπως παράγονται, ένα `item` event για κάθε requirement μόλις ολοκληρωθεί και
+    στο τέλος ένα `result` event με όλα τα requirements.
+    """
+    if persist:
+        await _ensure_project(project_id)
+    uploads, cleanup = await _ingest_uploads(files)
+    return await stream_job(
+        "upload-and-process",
+        lambda: _process_uploads(uploads, use_cache, mode, persist_project_id=project_id if persist else None),
+        JobPriority.bulk,
+        cleanup,
+        request=request,
+    )
+
+
+@router.post("/upload-and-process/jobs", response_model=dict, status_code=202)
+async def submit_upload_and_process_job(project_id: str, request: Request, files: List[UploadFile] = File(...),
+                                        use_cache: bool = True, mode: ExtractionMode = "auto",
+                                        persist: bool = False):
+    """
+    Βάζει την ανάλυση των PDF στην ουρά (bulk priority) και επιστρέφει αμέσως job id.
+    """
+    if persist:
+        await _ensure_project(project_id)
+    uploads, cleanup = await _ingest_uploads(files)
+    job = await submit_job(
+        "upload-and-process",
+        lambda: _process_uploads(uploads, use_cache, mode, persist_project_id=project_id if persist else None),
+        JobPriority.bulk,
+        cleanup,
+        request=request,
+    )
+    return job_accepted(job)
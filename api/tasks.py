@@ -1,31 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, Path, Body
-from sqlalchemy.orm import Session
-from app import models, schemas, database
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, Body, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas
+from app.database import get_async_db, write_transaction
+from app.repositories import tasks_repository
+from app.utils.pagination import PageRequest, page_params, page_response, page_responses
+from app.utils.bulk import read_bulk_items, validate_items, bulk_result
 
 router = APIRouter(prefix="/projects/{project_id}/tasks", tags=["Tasks"])
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/create", response_model=schemas.TaskResponse)
-def create_task(
+async def create_task(
     project_id: str = Path(..., description="ID του project"),
     task: schemas.TaskCreate = Body(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
-    if not project:
+    if await db.get(models.Project, project_id) is None:
         raise HTTPException(status_code=404, detail="Project not found")
     db_task = models.Task(
         project_id=project_id,
         description=task.description,
         assigned_to_team_id=task.assigned_to_team_id
     )
-    db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
-    return db_task 
\ No newline at end of file
+    async with write_transaction(db):
+        db.add(db_task)
+    return db_task
+
+@router.get("/list", response_model=None, responses=page_responses(schemas.TaskResponse))
+async def list_tasks(
+    request: Request,
+    project_id: str = Path(..., description="ID του project"),
+    status: Optional[schemas.TaskStatus] = None,
+    team_id: Optional[int] = None,
+    page: PageRequest = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db)
+):
+    items, next_cursor = await db.run_sync(
+        lambda session: tasks_repository.list_tasks(project_id, session, page, status=status, team_id=team_id)
+    )
+    return page_response(request, schemas.TaskResponse, items, next_cursor)
+
+@router.post("/bulk", response_model=schemas.BulkResult)
+async def bulk_create_tasks(
+    request: Request,
+    project_id: str = Path(..., description="ID του project"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Πολλά tasks σε ένα transaction: JSON array ή NDJSON (Content-Type: application/x-ndjson).
+    Τα άκυρα items (και tasks με team άλλου project) επιστρέφονται στο `errors`.
+    """
+    items, errors = validate_items(await read_bulk_items(request), schemas.TaskCreate)
+    if await db.get(models.Project, project_id) is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    async with write_transaction(db):
+        results, item_errors = await db.run_sync(
+            lambda session: tasks_repository.bulk_create_tasks(project_id, items, session)
+        )
+    return bulk_result(results, errors + item_errors)
@@ -1,31 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, Path, Body
-from sqlalchemy.orm import Session
-from app import models, schemas, database
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, Body, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models, schemas
+from app.database import get_async_db, write_transaction
+from app.repositories import teams_repository
+from app.utils.pagination import PageRequest, page_params, page_response, page_responses
+from app.utils.bulk import read_bulk_items, validate_items, bulk_result
 
 router = APIRouter(prefix="/projects/{project_id}/teams", tags=["Teams"])
 
-def get_db():
-    db = database.SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/assign", response_model=schemas.TeamResponse)
-def assign_team(
+async def assign_team(
     project_id: str = Path(..., description="ID του project"),
     team: schemas.TeamCreate = Body(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    project = db.query(models.Project).filter(models.Project.id == project_id).first()
-    if not project:
+    if await db.get(models.Project, project_id) is None:
         raise HTTPException(status_code=404, detail="Project not found")
     db_team = models.Team(
         project_id=project_id,
         name=team.name,
         members=team.members
     )
-    db.add(db_team)
-    db.commit()
-    db.refresh(db_team)
-    return db_team 
\ No newline at end of file
+    async with write_transaction(db):
+        db.add(db_team)
+    return db_team
+
+@router.get("/list", response_model=None, responses=page_responses(schemas.TeamResponse))
+async def list_teams(
+    request: Request,
+    project_id: str = Path(..., description="ID του project"),
+    name: Optional[str] = None,
+    page: PageRequest = Depends(page_params),
+    db: AsyncSession = Depends(get_async_db)
+):
+    items, next_cursor = await db.run_sync(
+        lambda session: teams_repository.list_teams(project_id, session, page, name=name)
+    )
+    return page_response(request, schemas.TeamResponse, items, next_cursor)
+
+@router.post("/bulk", response_model=schemas.BulkResult)
+async def bulk_assign_teams(
+    request: Request,
+    project_id: str = Path(..., description="ID του project"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Πολλά teams σε ένα transaction: JSON array ή NDJSON (Content-Type: application/x-ndjson).
+    Τα άκυρα items επιστρέφονται στο `errors` με τη θέση τους· τα υπόλοιπα αποθηκεύονται.
+    """
+    items, errors = validate_items(await read_bulk_items(request), schemas.TeamCreate)
+    if await db.get(models.Project, project_id) is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    async with write_transaction(db):
+        results = await db.run_sync(lambda session: teams_repository.bulk_create_teams(project_id, items, session))
+    return bulk_result(results, errors)
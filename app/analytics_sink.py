@@ -0,0 +1,211 @@
+import atexit
+import csv
+import datetime
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from app.config.config import (
+    ANALYTICS_BACKEND,
+    ANALYTICS_CSV_PATH,
+    ANALYTICS_DB_PATH,
+    ANALYTICS_BATCH_SIZE,
+    ANALYTICS_FLUSH_INTERVAL,
+    ANALYTICS_QUEUE_SIZE,
+    ANALYTICS_MAX_BYTES,
+    ANALYTICS_BACKUP_COUNT,
+)
+from app.logger import get_logger
+
+logger = get_logger()
+
+CSV_HEADER = [
+    "timestamp", "prompt_key", "model", "prompt_tokens",
+    "response_tokens", "total_tokens", "cost_estimate",
+    "measured", "total_duration_ms", "eval_duration_ms", "tokens_per_second",
+]
+
+_STOP = object()
+
+
+def _format_optional(value):
+    return "" if value is None else f"{value:.2f}"
+
+
+def _csv_row(row: dict) -> list:
+    return [
+        row["timestamp"],
+        row["prompt_key"],
+        row["model"],
+        row["prompt_tokens"],
+        row["response_tokens"],
+        row["total_tokens"],
+        f"${row['cost_estimate']:.4f}",
+        row["measured"],
+        _format_optional(row["total_duration_ms"]),
+        _format_optional(row["eval_duration_ms"]),
+        _format_optional(row["tokens_per_second"]),
+    ]
+
+
+class AnalyticsSink:
+    """
+    Background writer για τα prompt analytics. Το request path κάνει μόνο `submit`
+    (put_nowait σε bounded queue). Ένα daemon thread μαζεύει τις γραμμές και τις
+    γράφει σε batches (ανά `batch_size` ή `flush_interval`) σε CSV και/ή SQLite.
+    """
+
+    def __init__(self, backend=ANALYTICS_BACKEND, csv_path=ANALYTICS_CSV_PATH, db_path=ANALYTICS_DB_PATH,
+                 batch_size=ANALYTICS_BATCH_SIZE, flush_interval=ANALYTICS_FLUSH_INTERVAL,
+                 queue_size=ANALYTICS_QUEUE_SIZE, max_bytes=ANALYTICS_MAX_BYTES,
+                 backup_count=ANALYTICS_BACKUP_COUNT):
+        self.backends = {b.strip() for b in backend.split(",") if b.strip()}
+        self.csv_path = csv_path
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.dropped = 0
+        self.written = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._csv_checked = False
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._start_lock:
+            if self.running:
+                return
+            self._thread = threading.Thread(target=self._run, name="analytics-sink", daemon=True)
+            self._thread.start()
+            logger.info(f"📊 Analytics sink started ({', '.join(sorted(self.backends))})")
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Flush ό,τι έχει μείνει στην ουρά και σταμάτημα του writer thread.
+        """
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        logger.info(f"📊 Analytics sink stopped ({self.written} rows written, {self.dropped} dropped)")
+
+    def submit(self, row: dict):
+        if not self.running:
+            self.start()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            # Ποτέ δεν μπλοκάρουμε το request path για analytics
+            self.dropped += 1
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush(batch)
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+                return
+            if item is not None:
+                batch.append(item)
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, rows: list):
+        if not rows:
+            return
+        try:
+            if "csv" in self.backends:
+                self._write_csv(rows)
+            if "sqlite" in self.backends:
+                self._write_sqlite(rows)
+            self.written += len(rows)
+            logger.debug(f"📊 Flushed {len(rows)} analytics rows")
+        except Exception as e:
+            logger.error(f"❌ Analytics flush failed ({len(rows)} rows lost): {e}")
+
+    def _rotate_csv(self):
+        if not os.path.exists(self.csv_path):
+            return
+        base, ext = os.path.splitext(self.csv_path)
+        if not self._csv_checked:
+            # Παλιά αρχεία με διαφορετικό header μετονομάζονται ώστε το CSV να μένει συνεπές
+            self._csv_checked = True
+            if os.path.getsize(self.csv_path) > 0:
+                with open(self.csv_path, mode="r", encoding="utf-8") as csvfile:
+                    header = next(csv.reader(csvfile), [])
+                if header != CSV_HEADER:
+                    stamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+                    os.replace(self.csv_path, f"{base}.{stamp}{ext}")
+                    return
+        if os.path.getsize(self.csv_path) < self.max_bytes:
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{base}.{index}{ext}"
+            if os.path.exists(source):
+                os.replace(source, f"{base}.{index + 1}{ext}")
+        os.replace(self.csv_path, f"{base}.1{ext}")
+
+    def _write_csv(self, rows: list):
+        if os.path.dirname(self.csv_path):
+            os.makedirs(os.path.dirname(self.csv_path), exist_ok=True)
+        self._rotate_csv()
+        with open(self.csv_path, mode="a", newline="", encoding="utf-8") as csvfile:
+            writer = csv.writer(csvfile)
+            if csvfile.tell() == 0:
+                writer.writerow(CSV_HEADER)
+            writer.writerows(_csv_row(row) for row in rows)
+
+    def _write_sqlite(self, rows: list):
+        if self._conn is None:
+            if os.path.dirname(self.db_path):
+                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS prompt_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    prompt_key TEXT,
+                    model TEXT,
+                    prompt_tokens INTEGER,
+                    response_tokens INTEGER,
+                    total_tokens INTEGER,
+                    cost_estimate REAL,
+                    measured INTEGER,
+                    total_duration_ms REAL,
+                    eval_duration_ms REAL,
+                    tokens_per_second REAL
+                )
+            """)
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO prompt_runs ({', '.join(CSV_HEADER)}) "
+                f"VALUES ({', '.join('?' for _ in CSV_HEADER)})",
+                [tuple(row[column] for column in CSV_HEADER) for row in rows],
+            )
+
+
+analytics_sink = AnalyticsSink()
+atexit.register(analytics_sink.stop)
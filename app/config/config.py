@@ -4,4 +4,131 @@ LLM_MODEL = "deepseek-coder-v2:latest"
 CALC_MODEL = "deepseek-coder"
 MODEL_CONTEXT_LIMIT = 160_000  # max token window for deepseek-coder
 
+# Database (ένα engine factory για SQLite και Postgres)
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./so_assistant.db")
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "")  # κενό = παράγεται από το DATABASE_URL (aiosqlite / asyncpg)
+DATABASE_ECHO = os.getenv("DATABASE_ECHO", "false").lower() == "true"  # SQL logging, μόνο για debugging
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # ms
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # αρνητικό = KiB (64 MB)
+# Opt-in: υπάρχουσες βάσεις μπορεί να έχουν orphan rows (π.χ. tasks διαγραμμένων teams)· το init_db τα αναφέρει
+SQLITE_FOREIGN_KEYS = os.getenv("SQLITE_FOREIGN_KEYS", "false").lower() == "true"
+
+# Project outline cache (σειριοποιημένο outline ανά project, με ETag)
+OUTLINE_CACHE_ENABLED = os.getenv("OUTLINE_CACHE_ENABLED", "true").lower() == "true"
+OUTLINE_CACHE_MAX_ENTRIES = int(os.getenv("OUTLINE_CACHE_MAX_ENTRIES", "512"))  # στη μνήμη (LRU)
+OUTLINE_CACHE_PATH = os.getenv("OUTLINE_CACHE_PATH", "")  # κενό = χωρίς disk tier, π.χ. "output/outline_cache.db"
+
+# List endpoints (keyset pagination)
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "500"))
+
+# Ollama HTTP client (ένα κοινό connection pool για όλη την εφαρμογή)
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "2000"))  # seconds, για μεγάλα generations
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "10"))
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "32"))
+OLLAMA_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OLLAMA_MAX_KEEPALIVE_CONNECTIONS", "16"))
+OLLAMA_KEEPALIVE_EXPIRY = float(os.getenv("OLLAMA_KEEPALIVE_EXPIRY", "300"))
+
+# Ollama backends pool (JSON λίστα [{"url": ..., "weight": 2, "models": [...]}] ή comma-separated URLs)
+OLLAMA_BACKENDS = os.getenv("OLLAMA_BACKENDS", "")  # κενό = μόνο το OLLAMA_HOST
+OLLAMA_HEALTH_INTERVAL = float(os.getenv("OLLAMA_HEALTH_INTERVAL", "10"))  # seconds, 0 = χωρίς active checks
+OLLAMA_EJECT_COOLDOWN = float(os.getenv("OLLAMA_EJECT_COOLDOWN", "30"))  # seconds· χωρίς active checks, μετά ξαναδοκιμάζεται
+OLLAMA_HEALTH_TIMEOUT = float(os.getenv("OLLAMA_HEALTH_TIMEOUT", "2"))
+OLLAMA_EJECT_AFTER = int(os.getenv("OLLAMA_EJECT_AFTER", "2"))  # διαδοχικά αποτυχημένα checks
+OLLAMA_READMIT_AFTER = int(os.getenv("OLLAMA_READMIT_AFTER", "2"))  # διαδοχικά επιτυχημένα checks
+# GPU budget: ταυτόχρονα generations σε όλο το process (jobs, fan-out των batches, repairs)
+OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "2"))  # όσο το OLLAMA_NUM_PARALLEL κάθε backend
+LLM_MAX_INFLIGHT = int(os.getenv("LLM_MAX_INFLIGHT", "0"))  # 0 = OLLAMA_NUM_PARALLEL × backends
+
+# Model lifecycle (warm-up, keep_alive, keep-warm pings)
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # π.χ. "30m", "24h" ή seconds (-1 = πάντα φορτωμένο)
+if OLLAMA_KEEP_ALIVE.lstrip("-").isdigit():
+    OLLAMA_KEEP_ALIVE = int(OLLAMA_KEEP_ALIVE)
+LLM_WARMUP_ENABLED = os.getenv("LLM_WARMUP_ENABLED", "true").lower() == "true"
+LLM_WARMUP_RETRY_INTERVAL = float(os.getenv("LLM_WARMUP_RETRY_INTERVAL", "30"))  # seconds, αν το Ollama δεν είναι ακόμα διαθέσιμο
+LLM_KEEP_WARM_INTERVAL = float(os.getenv("LLM_KEEP_WARM_INTERVAL", "0"))  # seconds ανάμεσα στα pings, 0 = απενεργοποιημένο
+LLM_KEEP_WARM_HOURS = os.getenv("LLM_KEEP_WARM_HOURS", "08:00-20:00")  # local time
+LLM_KEEP_WARM_WEEKDAYS = os.getenv("LLM_KEEP_WARM_WEEKDAYS", "0,1,2,3,4")  # 0 = Δευτέρα
+LLM_READY_TIMEOUT = float(os.getenv("LLM_READY_TIMEOUT", "2"))  # seconds για το /api/ps του readiness check
+
+# LLM response cache (content-addressed, SQLite)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "output/llm_cache.db")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))  # seconds, 0 = χωρίς λήξη
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Semantic cache (embeddings ανά chunk, ώστε έγγραφα με μικρές αλλαγές να μην ξαναπερνούν από το LLM)
+EMBED_MODEL = os.getenv("EMBED_MODEL", "bge-m3")  # multilingual, για ελληνικά κείμενα
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_PATH = os.getenv("SEMANTIC_CACHE_PATH", "output/semantic_cache.db")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.97"))  # cosine similarity
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "20000"))
+
+# Prompt analytics (background sink)
+ANALYTICS_BACKEND = os.getenv("ANALYTICS_BACKEND", "csv")  # "csv", "sqlite" ή "csv,sqlite"
+ANALYTICS_CSV_PATH = os.getenv("ANALYTICS_CSV_PATH", "output/prompt_analytics_log.csv")
+ANALYTICS_DB_PATH = os.getenv("ANALYTICS_DB_PATH", "output/prompt_analytics.db")
+ANALYTICS_BATCH_SIZE = int(os.getenv("ANALYTICS_BATCH_SIZE", "50"))
+ANALYTICS_FLUSH_INTERVAL = float(os.getenv("ANALYTICS_FLUSH_INTERVAL", "5"))  # seconds
+ANALYTICS_QUEUE_SIZE = int(os.getenv("ANALYTICS_QUEUE_SIZE", "10000"))
+ANALYTICS_MAX_BYTES = int(os.getenv("ANALYTICS_MAX_BYTES", str(10 * 1024 * 1024)))
+ANALYTICS_BACKUP_COUNT = int(os.getenv("ANALYTICS_BACKUP_COUNT", "5"))
+
+# LLM job queue
+LLM_JOB_CONCURRENCY = int(os.getenv("LLM_JOB_CONCURRENCY", "2"))  # ταυτόχρονα jobs· τα LLM calls τα περιορίζει το LLM_MAX_INFLIGHT
+LLM_JOB_MAX_QUEUE = int(os.getenv("LLM_JOB_MAX_QUEUE", "100"))
+LLM_JOB_RETENTION = float(os.getenv("LLM_JOB_RETENTION", "3600"))  # seconds που κρατάμε ολοκληρωμένα jobs για polling
+
+# Map-reduce εξαγωγή requirements για μεγάλα έγγραφα
+REQUIREMENTS_CHUNK_TOKENS = int(os.getenv("REQUIREMENTS_CHUNK_TOKENS", "3000"))  # μέγεθος chunk (χωρά άνετα σε context 8192)
+REQUIREMENTS_MAP_CONCURRENCY = int(os.getenv("REQUIREMENTS_MAP_CONCURRENCY", "4"))
+
+# Near-duplicate requirements (MinHash/LSH)
+# Αυτόματο merge μόνο για ίδιο κείμενο μετά το normalization· πάνω από το DEDUP_THRESHOLD (Jaccard
+# των shingles) ένα requirement απλώς σημειώνεται ως "possible duplicate", δεν αφαιρείται ποτέ
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.7"))
+DEDUP_FUZZY_MERGE = os.getenv("DEDUP_FUZZY_MERGE", "false").lower() == "true"  # opt-in fuzzy auto-merge
+DEDUP_FUZZY_MERGE_THRESHOLD = float(os.getenv("DEDUP_FUZZY_MERGE_THRESHOLD", "0.99"))
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "64"))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))
+DEDUP_SHINGLE_SIZE = int(os.getenv("DEDUP_SHINGLE_SIZE", "3"))
+
+# Structured output (JSON schema στο `format` του Ollama)
+LLM_STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "true").lower() == "true"
+LLM_REPAIR_RETRIES = int(os.getenv("LLM_REPAIR_RETRIES", "2"))  # repair calls ανά απάντηση, για όλα τα άκυρα fragments
+
+# Batch C4 generation
+C4_BATCH_CONCURRENCY = int(os.getenv("C4_BATCH_CONCURRENCY", "3"))  # ταυτόχρονα generations ανά batch
+C4_BATCH_MAX_ITEMS = int(os.getenv("C4_BATCH_MAX_ITEMS", "30"))  # όριο sequence diagrams × levels ανά request
+
+# Εξαγωγή κειμένου PDF
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))  # processes του pool
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "32"))  # μικρότερα PDF εξάγονται σειριακά
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+
+# Uploads
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))  # όριο ανά αρχείο, μεγαλύτερα απορρίπτονται με 413
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(8 * 1024 * 1024)))  # πάνω από αυτό το upload γράφεται σε temp αρχείο
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+# Όριο όλου του multipart body, ελέγχεται καθώς φτάνει (πριν το parsing)· default: 4 αρχεία στο όριο
+UPLOAD_REQUEST_MAX_BYTES = int(os.getenv("UPLOAD_REQUEST_MAX_BYTES", str(4 * UPLOAD_MAX_BYTES)))
+
+# Bulk persistence (JSON array ή NDJSON σε ένα transaction)
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "5000"))
+BULK_MAX_BYTES = int(os.getenv("BULK_MAX_BYTES", str(10 * 1024 * 1024)))  # όριο του body, ελέγχεται καθώς διαβάζεται
+
+# Ακύρωση και deadlines των LLM requests
+REQUEST_DEADLINE_HEADER = os.getenv("REQUEST_DEADLINE_HEADER", "X-Request-Deadline")  # seconds, unix timestamp ή ISO 8601
+REQUEST_DEFAULT_BUDGET = float(os.getenv("REQUEST_DEFAULT_BUDGET", "0"))  # seconds, 0 = χωρίς deadline αν δεν σταλεί header
+REQUEST_MAX_BUDGET = float(os.getenv("REQUEST_MAX_BUDGET", str(OLLAMA_TIMEOUT)))
+
+# Server-Sent Events
+SSE_HEARTBEAT_INTERVAL = float(os.getenv("SSE_HEARTBEAT_INTERVAL", "15"))  # seconds, κρατάει ζωντανά τα idle connections στους proxies
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "256"))
+
 LOGGING_LEVEL = "DEBUG"  # Options: DEBUG, INFO, WARNING, ERROR, CRITICAL
@@ -1,27 +1,130 @@
-import os
+import asyncio
 import logging
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from contextlib import asynccontextmanager, nullcontext
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
 from .models import Base
-from contextlib import contextmanager
+from . import outline_cache  # noqa: F401  (listeners που αλλάζουν την έκδοση του outline σε κάθε write)
+from app.config.config import (
+    DATABASE_URL,
+    ASYNC_DATABASE_URL,
+    DATABASE_ECHO,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    SQLITE_BUSY_TIMEOUT,
+    SQLITE_CACHE_SIZE,
+    SQLITE_FOREIGN_KEYS,
+)
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./so_assistant.db")
+# Sync → async driver για κάθε backend
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def to_async_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()}; set ASYNC_DATABASE_URL")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL: οι readers δεν μπλοκάρουν από τον (έναν) writer
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    if SQLITE_FOREIGN_KEYS:
+        cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+    cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def _engine_options(url: str) -> dict:
+    if is_sqlite(url):
+        return {"connect_args": {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT / 1000}}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+
+def create_db_engine(url: str = DATABASE_URL, echo: bool = DATABASE_ECHO) -> Engine:
+    """
+    Sync engine για το DATABASE_URL: SQLite με WAL και tuned pragmas, Postgres με
+    sized connection pool και pre-ping.
+    """
+    db_engine = create_engine(url, echo=echo, **_engine_options(url))
+    if is_sqlite(url):
+        event.listen(db_engine, "connect", _sqlite_pragmas)
+    return db_engine
 
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}, echo=True
-)
+
+def create_async_db_engine(url: str = DATABASE_URL, echo: bool = DATABASE_ECHO) -> AsyncEngine:
+    async_url = ASYNC_DATABASE_URL or to_async_url(url)
+    db_engine = create_async_engine(async_url, echo=echo, **_engine_options(url))
+    if is_sqlite(url):
+        event.listen(db_engine.sync_engine, "connect", _sqlite_pragmas)
+    return db_engine
+
+
+engine = create_db_engine()
+async_engine = create_async_db_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: τα objects σερβίρονται μετά το commit χωρίς lazy load (που στο async δεν επιτρέπεται)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Το SQLite δέχεται έναν writer τη φορά· σειριοποιούμε τα async writes αντί να περιμένουν στο busy_timeout
+_sqlite_writer = asyncio.Lock() if is_sqlite(DATABASE_URL) else None
+
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    # Το create_all δεν προσθέτει νέα indexes σε πίνακες που υπάρχουν ήδη
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
     logging.info("Database tables created.")
+    if SQLITE_FOREIGN_KEYS and is_sqlite(DATABASE_URL):
+        check_foreign_keys()
+
+
+def check_foreign_keys() -> list[tuple]:
+    """
+    Rows που παραβιάζουν foreign keys (PRAGMA foreign_key_check): με foreign_keys=ON
+    οι αναγνώσεις δουλεύουν, αλλά writes που τα αφορούν μπορεί να αποτύχουν.
+    Επιστρέφει (table, rowid, parent) ανά παράβαση.
+    """
+    with engine.connect() as connection:
+        violations = [tuple(row[:3]) for row in connection.execute(text("PRAGMA foreign_key_check"))]
+    if violations:
+        counts = {}
+        for table, _, parent in violations:
+            counts[f"{table} -> {parent}"] = counts.get(f"{table} -> {parent}", 0) + 1
+        logging.warning(f"Foreign key violations in existing rows: {counts}")
+    return violations
 
-# FastAPI dependency
-from sqlalchemy.orm import Session
-from fastapi import Depends
 
+async def close_db():
+    await async_engine.dispose()
+    engine.dispose()
 
+
+# FastAPI dependencies
 def get_db():
     db = SessionLocal()
     try:
@@ -31,3 +134,30 @@ def get_db():
         raise
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+
+
+@asynccontextmanager
+async def write_transaction(db: AsyncSession):
+    """
+    Write σε async session: single-writer lock στο SQLite, commit στο τέλος και
+    rollback σε σφάλμα.
+
+        async with write_transaction(db):
+            db.add(...)
+    """
+    async with _sqlite_writer or nullcontext():
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
@@ -5,4 +5,16 @@ class DiagramNotFoundError(Exception):
     pass
 
 class NotFoundError(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class JobQueueFullError(Exception):
+    pass
+
+class JobCancelledError(Exception):
+    pass
+
+class JobDeadlineExceededError(JobCancelledError):
+    pass
+
+class UploadTooLargeError(Exception):
+    pass
@@ -0,0 +1,390 @@
+import asyncio
+import itertools
+import time
+import uuid
+from collections import deque
+from enum import IntEnum
+from typing import Any, AsyncIterator, Callable, Dict, Tuple
+
+from app.config.config import LLM_JOB_CONCURRENCY, LLM_JOB_MAX_QUEUE, LLM_JOB_RETENTION
+from app.exceptions.custom_exceptions import JobQueueFullError, JobCancelledError, JobDeadlineExceededError
+from app.logger import get_logger
+
+logger = get_logger()
+
+JobRunner = Callable[[], AsyncIterator[Tuple[str, Any]]]
+
+# Events που πάνε μόνο στους τρέχοντες subscribers και δεν κρατιούνται για replay:
+# τα tokens ενός generation θα κρατούσαν όλο το output στη μνήμη για όσο ζει το job
+LIVE_ONLY_EVENTS = {"token"}
+PURGE_INTERVAL = 60.0  # seconds μεταξύ των καθαρισμών των ολοκληρωμένων jobs
+
+
+class JobPriority(IntEnum):
+    interactive = 0  # π.χ. C4 generation από το UI
+    normal = 5
+    bulk = 10  # π.χ. ανάλυση PDF
+
+
+class JobStatus:
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+    cancelled = "cancelled"
+
+
+FINISHED = {JobStatus.succeeded, JobStatus.failed, JobStatus.cancelled}
+
+
+class CancelReason:
+    requested = "requested"  # DELETE /jobs/{id}
+    client_disconnected = "client_disconnected"
+    deadline = "deadline"
+    shutdown = "shutdown"
+
+
+class Job:
+    def __init__(self, kind: str, runner: JobRunner, priority: JobPriority,
+                 cleanup: Callable[[], None] | None = None, deadline: float | None = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.priority = priority
+        self.status = JobStatus.queued
+        self.created_at = time.time()
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.result: Any = None
+        self.partial: Any = None  # το event `partial`: το result λείπει εν μέρει (π.χ. chunks που απέτυχαν)
+        self.error: str | None = None
+        self.deadline = deadline  # unix timestamp, μετά το οποίο το job ακυρώνεται
+        self.cancel_reason: str | None = None
+        self.deadline_timer: asyncio.TimerHandle | None = None
+        self.events: list[Tuple[str, Any]] = []  # για replay, χωρίς τα LIVE_ONLY_EVENTS
+        self._subscribers: set[asyncio.Queue] = set()
+        self.runner = runner
+        self.task: asyncio.Task | None = None
+        self.cleanup = cleanup
+        self.changed = asyncio.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    async def publish(self, event: str, data: Any):
+        self._deliver(event, data)
+
+    def _deliver(self, event: str, data: Any):
+        if event not in LIVE_ONLY_EVENTS:
+            self.events.append((event, data))
+        for queue in self._subscribers:
+            queue.put_nowait((event, data))
+
+    def subscribe(self) -> tuple[list[Tuple[str, Any]], asyncio.Queue | None]:
+        """
+        Τα events για replay και μια ουρά για όσα ακολουθήσουν (None αν το job έχει
+        ήδη τελειώσει). Η ουρά κλείνει με None· ο subscriber καλεί το `unsubscribe`.
+        """
+        if self.finished:
+            return list(self.events), None
+        queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        return list(self.events), queue
+
+    def unsubscribe(self, queue: asyncio.Queue | None):
+        self._subscribers.discard(queue)
+
+    async def finish(self, status: str, error: str | None = None):
+        self.status = status
+        self.error = error
+        self.finished_at = time.time()
+        if self.deadline_timer is not None:
+            self.deadline_timer.cancel()
+            self.deadline_timer = None
+        if self.cleanup is not None:
+            # π.χ. διαγραφή temp αρχείων, ακόμα κι αν το job ακυρώθηκε πριν ξεκινήσει
+            try:
+                self.cleanup()
+            except Exception as e:
+                logger.error(f"❌ Cleanup of job {self.id} failed: {e}")
+            self.cleanup = None
+        if error is not None:
+            self._deliver("error", {"detail": error})
+        self._deliver("status", self.snapshot())
+        for queue in self._subscribers:
+            queue.put_nowait(None)
+        async with self.changed:
+            self.changed.notify_all()
+
+    def snapshot(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "priority": self.priority.name,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "deadline": self.deadline,
+            "cancel_reason": self.cancel_reason,
+            "result": self.result if self.status == JobStatus.succeeded else None,
+            "partial": self.partial,
+        }
+
+
+def _percentile(samples, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 3)
+
+
+class JobManager:
+    """
+    Ουρά για LLM jobs με priorities και περιορισμένο concurrency (`concurrency` workers),
+    ώστε πολλά ταυτόχρονα uploads να μην στοιβάζονται στο ίδιο GPU.
+    Ο runner ενός job είναι async generator από (event, data)· το event `result`
+    ορίζει το αποτέλεσμα του job (και το `partial` ότι αυτό είναι μερικό) και όλα τα
+    events είναι διαθέσιμα σε subscribers.
+    """
+
+    def __init__(self, concurrency=LLM_JOB_CONCURRENCY, max_queue=LLM_JOB_MAX_QUEUE,
+                 retention=LLM_JOB_RETENTION):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.retention = retention
+        self._jobs: Dict[str, Job] = {}
+        self._queue: asyncio.PriorityQueue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._janitor: asyncio.Task | None = None
+        self._seq = itertools.count()
+        self.completed = {status: 0 for status in FINISHED}
+        self.cancelled_by_reason = {reason: 0 for reason in vars(CancelReason) if not reason.startswith("_")}
+        self.cancelled_run_seconds = 0.0  # χρόνος εκτέλεσης που διακόπηκε από ακύρωση
+        self._wait_times = deque(maxlen=1000)
+        self._run_times = deque(maxlen=1000)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [
+            asyncio.create_task(self._worker(index), name=f"llm-job-worker-{index}")
+            for index in range(self.concurrency)
+        ]
+        self._janitor = asyncio.create_task(self._purge_periodically(), name="llm-job-janitor")
+        logger.info(f"🧵 LLM job queue started ({self.concurrency} workers)")
+
+    async def stop(self):
+        for job in list(self._jobs.values()):
+            if not job.finished:
+                await self.cancel(job, CancelReason.shutdown)
+        tasks = [*self._workers, self._janitor] if self._janitor is not None else self._workers
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._janitor = None
+        logger.info("🧵 LLM job queue stopped")
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, kind: str, runner: JobRunner, priority: JobPriority = JobPriority.normal,
+                     cleanup: Callable[[], None] | None = None, deadline: float | None = None) -> Job:
+        if not self.running:
+            await self.start()
+        if self.queue_depth() >= self.max_queue:
+            raise JobQueueFullError(f"LLM job queue is full ({self.max_queue} jobs)")
+        self._purge()
+        job = Job(kind, runner, priority, cleanup, deadline)
+        self._jobs[job.id] = job
+        if deadline is not None:
+            # Ισχύει είτε το job περιμένει στην ουρά είτε τρέχει
+            job.deadline_timer = asyncio.get_running_loop().call_later(
+                max(deadline - time.time(), 0), self._expire, job
+            )
+        await self._queue.put((priority, next(self._seq), job))
+        await job.publish("status", job.snapshot())
+        logger.info(f"📥 Job {job.id} ({kind}, {priority.name}) queued, depth {self.queue_depth()}")
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    async def cancel(self, job: Job, reason: str = CancelReason.requested):
+        if job.finished:
+            return
+        job.cancel_reason = job.cancel_reason or reason
+        if job.task is not None:
+            job.task.cancel()
+        else:
+            # Δεν έχει ξεκινήσει ακόμα· ο worker θα το προσπεράσει
+            await job.finish(JobStatus.cancelled, error=self._cancel_error(job))
+            self._record_cancel(job)
+
+    def _expire(self, job: Job):
+        if not job.finished:
+            logger.warning(f"⏰ Job {job.id} ({job.kind}) reached its deadline")
+            asyncio.ensure_future(self.cancel(job, CancelReason.deadline))
+
+    @staticmethod
+    def _cancel_error(job: Job) -> str | None:
+        return "Deadline exceeded" if job.cancel_reason == CancelReason.deadline else None
+
+    def _record_cancel(self, job: Job):
+        self.completed[JobStatus.cancelled] += 1
+        self.cancelled_by_reason[job.cancel_reason or CancelReason.requested] += 1
+        run_seconds = job.finished_at - job.started_at if job.started_at else 0.0
+        self.cancelled_run_seconds += run_seconds
+        when = f"after {run_seconds:.1f}s running" if job.started_at else "while queued"
+        logger.info(f"🛑 Job {job.id} ({job.kind}) cancelled ({job.cancel_reason}) {when}")
+
+    async def wait(self, job: Job) -> Any:
+        async with job.changed:
+            await job.changed.wait_for(lambda: job.finished)
+        if job.status == JobStatus.failed:
+            raise RuntimeError(job.error)
+        if job.status == JobStatus.cancelled:
+            if job.cancel_reason == CancelReason.deadline:
+                raise JobDeadlineExceededError(f"Job {job.id} exceeded its deadline")
+            raise JobCancelledError(f"Job {job.id} was cancelled")
+        return job.result
+
+    async def events(self, job: Job) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Replay των events που έχουν ήδη γίνει publish (χωρίς τα tokens) και στη
+        συνέχεια τα νέα, μέχρι να τελειώσει το job.
+        """
+        replay, queue = job.subscribe()
+        try:
+            for event in replay:
+                yield event
+            while queue is not None:
+                event = await queue.get()
+                if event is None:
+                    return
+                yield event
+        finally:
+            job.unsubscribe(queue)
+
+    async def run(self, kind: str, runner: JobRunner, priority: JobPriority = JobPriority.normal,
+                  cleanup: Callable[[], None] | None = None) -> Any:
+        """
+        Submit και αναμονή του αποτελέσματος (για τα blocking endpoints).
+        """
+        job = await self.submit(kind, runner, priority, cleanup)
+        try:
+            return await self.wait(job)
+        except asyncio.CancelledError:
+            await self.cancel(job, CancelReason.client_disconnected)
+            raise
+
+    async def follow(self, job: Job, cancel_on_exit: bool = True):
+        """
+        Relay των events ενός job (για τα SSE endpoints). Με `cancel_on_exit` το job
+        ακυρώνεται αν ο subscriber φύγει πριν τελειώσει (π.χ. έκλεισε ο client).
+        """
+        try:
+            async for event, data in self.events(job):
+                yield event, data
+        finally:
+            if cancel_on_exit:
+                await self.cancel(job, CancelReason.client_disconnected)
+
+    async def _worker(self, index: int):
+        while True:
+            _, _, job = await self._queue.get()
+            try:
+                if job.finished:
+                    continue
+                await self._execute(job)
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, job: Job):
+        job.status = JobStatus.running
+        job.started_at = time.time()
+        self._wait_times.append(job.started_at - job.created_at)
+        await job.publish("status", job.snapshot())
+
+        async def consume():
+            async for event, data in job.runner():
+                if event == "result":
+                    job.result = data
+                elif event == "partial":
+                    job.partial = data
+                await job.publish(event, data)
+
+        job.task = asyncio.create_task(consume())
+        try:
+            await job.task
+            await job.finish(JobStatus.succeeded)
+        except asyncio.CancelledError:
+            if job.task.cancelled():
+                await job.finish(JobStatus.cancelled, error=self._cancel_error(job))
+            if not job.task.cancelled() or asyncio.current_task().cancelling():
+                # Ακύρωση του ίδιου του worker (shutdown), ακόμα κι αν ακυρώθηκε μαζί και το job
+                raise
+        except Exception as e:
+            logger.error(f"❌ Job {job.id} ({job.kind}) failed: {e}")
+            await job.finish(JobStatus.failed, error=str(e))
+        finally:
+            self._run_times.append(time.time() - job.started_at)
+            if job.status == JobStatus.cancelled:
+                self._record_cancel(job)
+            elif job.finished:
+                self.completed[job.status] += 1
+
+    async def _purge_periodically(self):
+        # Και χωρίς νέα submits, τα ολοκληρωμένα jobs (και τα results τους) δεν μένουν για πάντα
+        while True:
+            await asyncio.sleep(max(min(PURGE_INTERVAL, self.retention), 1.0))
+            self._purge()
+
+    def _purge(self):
+        cutoff = time.time() - self.retention
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> dict:
+        by_priority = {priority.name: 0 for priority in JobPriority}
+        running = 0
+        for job in self._jobs.values():
+            if job.status == JobStatus.queued:
+                by_priority[job.priority.name] += 1
+            elif job.status == JobStatus.running:
+                running += 1
+        return {
+            "concurrency": self.concurrency,
+            "queue_depth": self.queue_depth(),
+            "queued_by_priority": by_priority,
+            "running": running,
+            "completed": self.completed,
+            "cancelled": {
+                "by_reason": self.cancelled_by_reason,
+                "run_seconds": round(self.cancelled_run_seconds, 3),
+            },
+            "wait_time_seconds": {
+                "p50": _percentile(self._wait_times, 0.50),
+                "p95": _percentile(self._wait_times, 0.95),
+                "max": round(max(self._wait_times), 3) if self._wait_times else 0.0,
+            },
+            "run_time_seconds": {
+                "p50": _percentile(self._run_times, 0.50),
+                "p95": _percentile(self._run_times, 0.95),
+                "max": round(max(self._run_times), 3) if self._run_times else 0.0,
+            },
+        }
+
+
+job_manager = JobManager()
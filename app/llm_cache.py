@@ -0,0 +1,198 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from app.config.config import (
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_PATH,
+    LLM_CACHE_TTL,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_MAX_BYTES,
+)
+from app.logger import get_logger
+
+logger = get_logger()
+
+
+def make_cache_key(model: str, prompt: str, options: dict | None = None, format: dict | str | None = None) -> str:
+    """
+    Content-addressed key: sha256 του (model, prompt, generation options, output format).
+    """
+    material = {"model": model, "prompt": prompt, "options": options or {}}
+    if format is not None:
+        material["format"] = format
+    material = json.dumps(material, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    SQLite cache για απαντήσεις του LLM με TTL, όρια πλήθους/μεγέθους και LRU eviction.
+    Οι μέθοδοι είναι blocking· από async κώδικα χρησιμοποίησε τις `aget` / `aset`.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl=LLM_CACHE_TTL,
+                 max_entries=LLM_CACHE_MAX_ENTRIES, max_bytes=LLM_CACHE_MAX_BYTES,
+                 enabled=LLM_CACHE_ENABLED):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    prompt_key TEXT,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> str | None:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            response, created_at = row
+            if self.ttl and now - created_at > self.ttl:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                conn.commit()
+                self.misses += 1
+                return None
+            conn.execute(
+                "UPDATE llm_cache SET last_access = ?, hit_count = hit_count + 1 WHERE key = ?",
+                (now, key),
+            )
+            conn.commit()
+            self.hits += 1
+            return response
+
+    def set(self, key: str, response: str, model: str, prompt_key: str = ""):
+        if not self.enabled or not response:
+            return
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                """
+                INSERT INTO llm_cache (key, model, prompt_key, response, size, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    response = excluded.response, size = excluded.size,
+                    created_at = excluded.created_at, last_access = excluded.last_access
+                """,
+                (key, model, prompt_key, response, size, now, now),
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        if self.ttl:
+            expired = conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,)
+            ).rowcount
+            self.evictions += expired
+
+        count, total_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        # LRU: διαγράφουμε τα λιγότερο πρόσφατα χρησιμοποιημένα μέχρι να χωρέσουμε
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access ASC"):
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            victims.append((key,))
+            count -= 1
+            total_bytes -= size
+        conn.executemany("DELETE FROM llm_cache WHERE key = ?", victims)
+        self.evictions += len(victims)
+        logger.info(f"🧹 LLM cache evicted {len(victims)} entries")
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            conn = self._connection()
+            deleted = conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,)).rowcount
+            conn.commit()
+        return deleted > 0
+
+    def clear(self, prompt_key: str | None = None) -> int:
+        with self._lock:
+            conn = self._connection()
+            if prompt_key is None:
+                deleted = conn.execute("DELETE FROM llm_cache").rowcount
+            else:
+                deleted = conn.execute(
+                    "DELETE FROM llm_cache WHERE prompt_key = ?", (prompt_key,)
+                ).rowcount
+            conn.commit()
+        return deleted
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, total_bytes = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": count,
+            "bytes": total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def aget(self, key: str) -> str | None:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, response: str, model: str, prompt_key: str = ""):
+        await asyncio.to_thread(self.set, key, response, model, prompt_key)
+
+
+llm_cache = LLMResponseCache()
@@ -1,16 +1,42 @@
+import asyncio
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from app.database import init_db
-from api import projects, requirements, diagrams, teams, tasks, assistant
+from app.database import init_db, close_db
+from app.ollama_client import init_ollama_client, close_ollama_client
+from app.llm_cache import llm_cache
+from app.semantic_cache import semantic_cache
+from app.outline_cache import outline_cache
+from app.analytics_sink import analytics_sink
+from app.jobs import job_manager
+from app.utils.pdf_processor import shutdown_pdf_pool
+from app.prompt_templates import prompt_registry
+from app.model_lifecycle import model_lifecycle
+from app.utils.uploads import UploadLimitMiddleware
+from api import projects, requirements, diagrams, teams, tasks, assistant, llm, jobs
 from fastapi.middleware.cors import CORSMiddleware
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     init_db()
+    analytics_sink.start()
+    # Static token counts των prompt templates (τα templates γίνονται register στο import των routers)
+    await asyncio.to_thread(prompt_registry.warm)
+    await init_ollama_client()
+    await job_manager.start()
+    await model_lifecycle.start()
     yield
-    # Shutdown (αν χρειαστεί, π.χ. cleanup)
-    # pass
+    # Shutdown
+    await model_lifecycle.stop()
+    await job_manager.stop()
+    await close_ollama_client()
+    llm_cache.close()
+    semantic_cache.close()
+    outline_cache.close()
+    shutdown_pdf_pool()
+    await close_db()
+    # Flush των analytics που είναι ακόμα στην ουρά
+    await asyncio.to_thread(analytics_sink.stop)
 
 # Δημιουργία της FastAPI εφαρμογής
 app = FastAPI(
@@ -20,6 +46,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Όριο μεγέθους των uploads πριν το parsing του multipart body (μέσα στο CORS, ώστε και το 413 να έχει CORS headers)
+app.add_middleware(UploadLimitMiddleware)
+
 # Επέτρεψε όλα τα origins (για development)
 app.add_middleware(
     CORSMiddleware,
@@ -27,6 +56,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Link", "ETag", "X-Partial-Result", "X-Failed-Chunks"],  # pagination, conditional GET, μερικά αποτελέσματα
 )
 
 # Ένα απλό, αρχικό endpoint για έλεγχο
@@ -44,4 +74,6 @@ app.include_router(diagrams.router)
 app.include_router(teams.router)
 app.include_router(tasks.router)
 app.include_router(assistant.router)
+app.include_router(llm.router)
+app.include_router(jobs.router)
 
@@ -0,0 +1,168 @@
+import asyncio
+import time
+from datetime import datetime
+
+from app.logger import get_logger
+from app.ollama_pool import ollama_pool
+from app.config.config import (
+    LLM_MODEL,
+    OLLAMA_KEEP_ALIVE,
+    LLM_WARMUP_ENABLED,
+    LLM_WARMUP_RETRY_INTERVAL,
+    LLM_KEEP_WARM_INTERVAL,
+    LLM_KEEP_WARM_HOURS,
+    LLM_KEEP_WARM_WEEKDAYS,
+    LLM_READY_TIMEOUT,
+)
+
+logger = get_logger()
+
+
+def _parse_hours(value: str) -> tuple[int, int]:
+    # "08:00-20:00" → (480, 1200) λεπτά από τα μεσάνυχτα
+    start, end = value.split("-")
+    to_minutes = lambda part: int(part.split(":")[0]) * 60 + int(part.split(":")[1] if ":" in part else 0)
+    return to_minutes(start.strip()), to_minutes(end.strip())
+
+
+class ModelLifecycle:
+    """
+    Κρατά το LLM_MODEL φορτωμένο στο Ollama: warm-up request στο startup,
+    προαιρετικά keep-warm pings σε ώρες γραφείου και readiness check μέσω /api/ps.
+    """
+
+    def __init__(self, model=LLM_MODEL, keep_alive=OLLAMA_KEEP_ALIVE, keep_warm_interval=LLM_KEEP_WARM_INTERVAL,
+                 keep_warm_hours=LLM_KEEP_WARM_HOURS, keep_warm_weekdays=LLM_KEEP_WARM_WEEKDAYS):
+        self.model = model
+        self.keep_alive = keep_alive
+        self.keep_warm_interval = keep_warm_interval
+        self.keep_warm_hours = _parse_hours(keep_warm_hours)
+        self.keep_warm_weekdays = {int(day) for day in keep_warm_weekdays.split(",") if day.strip()}
+        self.state = "cold"  # cold → loading → ready | failed
+        self.last_warmup: float | None = None
+        self.last_load_seconds: float | None = None
+        self.last_error: str | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self, warm_up: bool = LLM_WARMUP_ENABLED):
+        # Στο background, ώστε το startup να μην περιμένει το φόρτωμα του μοντέλου
+        if warm_up:
+            self._tasks.append(asyncio.create_task(self._warm_up_until_loaded(), name="llm-warmup"))
+        if self.keep_warm_interval > 0:
+            self._tasks.append(asyncio.create_task(self._keep_warm_loop(), name="llm-keep-warm"))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def warm_up(self) -> bool:
+        """
+        Generate με κενό prompt σε κάθε backend που σερβίρει το μοντέλο: το Ollama το
+        φορτώνει και ανανεώνει το keep_alive χωρίς να παράγει tokens. True αν φορτώθηκε
+        σε τουλάχιστον ένα backend.
+        """
+        if self.state != "ready":
+            self.state = "loading"
+        backends = [backend for backend in ollama_pool.backends if backend.serves(self.model)]
+        results = await asyncio.gather(*(self._warm_up_backend(backend) for backend in backends))
+        loaded = [seconds for seconds in results if seconds is not None]
+        if not loaded:
+            self.state = "failed"
+            return False
+        self.last_load_seconds = max(loaded)
+        self.last_warmup = time.time()
+        self.last_error = None
+        self.state = "ready"
+        logger.info(
+            f"🔥 Model {self.model} warm on {len(loaded)}/{len(backends)} backends "
+            f"(load {self.last_load_seconds:.1f}s, keep_alive {self.keep_alive})"
+        )
+        return True
+
+    async def _warm_up_backend(self, backend) -> float | None:
+        started = time.perf_counter()
+        try:
+            if backend.client is None:
+                backend.client = backend.build_client()
+            response = await backend.client.post(
+                "/api/generate",
+                json={"model": self.model, "prompt": "", "stream": False, "keep_alive": self.keep_alive},
+            )
+            response.raise_for_status()
+        except Exception as e:
+            self.last_error = str(e) or type(e).__name__
+            logger.warning(f"⚠️ Warm-up of {self.model} on {backend.url} failed: {self.last_error}")
+            return None
+        load_ns = response.json().get("load_duration")
+        return load_ns / 1_000_000_000 if load_ns else time.perf_counter() - started
+
+    async def _warm_up_until_loaded(self):
+        # Το Ollama μπορεί να ξεκινά ακόμα (π.χ. docker compose)· ξαναδοκιμάζουμε μέχρι να πετύχει
+        while not await self.warm_up():
+            await asyncio.sleep(LLM_WARMUP_RETRY_INTERVAL)
+
+    def in_business_hours(self, now: datetime | None = None) -> bool:
+        now = now or datetime.now()
+        start, end = self.keep_warm_hours
+        minutes = now.hour * 60 + now.minute
+        return now.weekday() in self.keep_warm_weekdays and start <= minutes < end
+
+    async def _keep_warm_loop(self):
+        while True:
+            await asyncio.sleep(self.keep_warm_interval)
+            if self.in_business_hours():
+                await self.warm_up()
+
+    async def resident(self, backend) -> dict | None:
+        """
+        Η εγγραφή του μοντέλου στο /api/ps (φορτωμένα μοντέλα) του backend, ή None αν δεν είναι φορτωμένο.
+        """
+        if backend.client is None:
+            backend.client = backend.build_client()
+        response = await backend.client.get("/api/ps", timeout=LLM_READY_TIMEOUT)
+        response.raise_for_status()
+        for model in response.json().get("models", []):
+            if self.model in (model.get("name"), model.get("model")):
+                return model
+        return None
+
+    async def _backend_readiness(self, backend) -> dict:
+        try:
+            model, error = await self.resident(backend), None
+        except Exception as e:
+            model, error = None, str(e) or type(e).__name__
+        return {
+            "url": backend.url,
+            "ready": model is not None,
+            "expires_at": model.get("expires_at") if model else None,
+            "size_vram": model.get("size_vram") if model else None,
+            "error": error,
+        }
+
+    async def readiness(self) -> dict:
+        # Ready όταν το μοντέλο είναι φορτωμένο σε τουλάχιστον ένα υγιές backend
+        backends = [backend for backend in ollama_pool.backends if backend.serves(self.model)]
+        results = await asyncio.gather(*(self._backend_readiness(backend) for backend in backends))
+        ready = [
+            result for backend, result in zip(backends, results) if result["ready"] and backend.healthy
+        ]
+        if not ready and self.state == "ready":
+            # Το Ollama το ξεφόρτωσε (keep_alive έληξε ή restart)
+            self.state = "cold"
+        errors = [result["error"] for result in results if result["error"]]
+        return {
+            "ready": bool(ready),
+            "model": self.model,
+            "state": self.state,
+            "expires_at": ready[0]["expires_at"] if ready else None,
+            "size_vram": ready[0]["size_vram"] if ready else None,
+            "keep_alive": self.keep_alive,
+            "last_warmup": self.last_warmup,
+            "last_load_seconds": self.last_load_seconds,
+            "error": None if ready else (errors[0] if errors else self.last_error),
+            "backends": results,
+        }
+
+model_lifecycle = ModelLifecycle()
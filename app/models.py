@@ -51,7 +51,7 @@ class Project(Base):
 class Requirement(Base):
     __tablename__ = "requirements"
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(String(255), ForeignKey("projects.id"), nullable=False)
+    project_id = Column(String(255), ForeignKey("projects.id"), nullable=False, index=True)
     description = Column(Text, nullable=False)
     category = Column(Enum(RequirementCategory), nullable=False)
     status = Column(Enum(RequirementStatus), default=RequirementStatus.pending)
@@ -66,7 +66,7 @@ class Diagram(Base):
     # mermaid_code = Column(Text, nullable=False)
     # type = Column(Enum(DiagramType), nullable=False)
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), nullable=False)
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), nullable=False, index=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     mermaid_code: Mapped[str] = mapped_column(Text, nullable=False)
     type: Mapped[str] = mapped_column(String(50), nullable=False)
@@ -76,7 +76,7 @@ class Diagram(Base):
 class Team(Base):
     __tablename__ = "teams"
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(String(255), ForeignKey("projects.id"), nullable=False)
+    project_id = Column(String(255), ForeignKey("projects.id"), nullable=False, index=True)
     name = Column(String(255), nullable=False)
     members = Column(Text)  # comma-separated names
 
@@ -86,7 +86,7 @@ class Team(Base):
 class Task(Base):
     __tablename__ = "tasks"
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(String(255), ForeignKey("projects.id"), nullable=False)
+    project_id = Column(String(255), ForeignKey("projects.id"), nullable=False, index=True)
     description = Column(Text, nullable=False)
     assigned_to_team_id = Column(Integer, ForeignKey("teams.id"))
     status = Column(Enum(TaskStatus), default=TaskStatus.todo)
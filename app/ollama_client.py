@@ -1,54 +1,181 @@
+import json
+import time
 import httpx
 from app.logger import get_logger
-from app.prompt_analytics import (
-    check_prompt_fits,
-    log_prompt_run
+from app.ollama_pool import ollama_pool, FAILOVER_ERRORS
+from app.prompt_analytics import log_prompt_stats
+from app.token_accounting import measure_prompt_async
+from app.llm_cache import llm_cache, make_cache_key
+from app.singleflight import llm_flights
+from app.config.config import (
+    LLM_MODEL,
+    EMBED_MODEL,
+    CALC_MODEL,
+    MODEL_CONTEXT_LIMIT,
+    OLLAMA_KEEP_ALIVE,
 )
-from app.config.config import OLLAMA_HOST, LLM_MODEL, CALC_MODEL, MODEL_CONTEXT_LIMIT
 
 
 logger = get_logger()
 
 
+async def init_ollama_client():
+    # Ένας AsyncClient ανά backend, δημιουργούνται/κλείνουν στο lifespan της εφαρμογής
+    await ollama_pool.start()
 
-def call_ollama(prompt, prompt_key="unknown"):
-    # Check token size and cost estimate before sending
-    stats = check_prompt_fits(prompt, model_context_limit=MODEL_CONTEXT_LIMIT)
-    prompt_tokens = stats["prompt_tokens"]
 
-    if stats["total_tokens"] > MODEL_CONTEXT_LIMIT:
+async def close_ollama_client():
+    await ollama_pool.close()
+
+
+def get_ollama_client(model: str | None = LLM_MODEL) -> httpx.AsyncClient:
+    """
+    Ο client του backend που θα εξυπηρετούσε τώρα ένα request για το `model`.
+    """
+    return ollama_pool.pick(model).client
+
+
+async def _generate(prompt, prompt_key, cache_key, options=None, template=None, format=None):
+    """
+    Το πραγματικό upstream generation (πάντα "stream": True, ώστε το ίδιο generation
+    να εξυπηρετεί και blocking και streaming callers μέσω του single-flight).
+    """
+    # Check token size and cost estimate before sending (το prompt γίνεται encode μία φορά)
+    static = {}
+    if template is not None and prompt.startswith(template.prefix):
+        static = {"static_tokens": template.static_tokens, "static_chars": len(template.prefix)}
+    stats = await measure_prompt_async(
+        prompt, prompt_key=prompt_key, model_name=CALC_MODEL, context_limit=MODEL_CONTEXT_LIMIT, **static
+    )
+    if not stats.fits:
         logger.warning(
-            f"⚠️ Estimated total tokens {stats['total_tokens']} exceed context window ({MODEL_CONTEXT_LIMIT})."
+            f"⚠️ Estimated total tokens {stats.total_tokens} exceed context window ({MODEL_CONTEXT_LIMIT})."
         )
 
-    url = f"{OLLAMA_HOST}/api/generate"
     payload = {
         "model": LLM_MODEL,
         "prompt": prompt,
-        "stream": False
+        "stream": True,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
     }
+    if options:
+        payload["options"] = options
+    if format is not None:
+        # "json" ή JSON schema: το Ollama περιορίζει το output ώστε να ταιριάζει
+        payload["format"] = format
 
-    try:
-        with httpx.Client(timeout=2000.0) as client:
-            response = client.post(url, json=payload)
+    fragments = []
+    logger.debug(f"Prompt to LLM: {prompt}")
+    # Κοινό όριο generations του process (GPU budget), όποιος κι αν είναι ο caller
+    async with ollama_pool.generation_slot():
+        for backend in ollama_pool.candidates(LLM_MODEL):
+            try:
+                async for fragment in _generate_on(backend, payload, stats):
+                    fragments.append(fragment)
+                    yield fragment
+                break
+            except (*FAILOVER_ERRORS, httpx.RemoteProtocolError) as e:
+                if fragments:
+                    # Έχουν ήδη σταλεί tokens στον caller· δεν γίνεται ασφαλές failover
+                    raise
+                logger.warning(f"⚠️ Ollama backend {backend.url} unavailable ({type(e).__name__}), failing over")
+        else:
+            raise RuntimeError(f"All Ollama backends failed for model {LLM_MODEL}")
+
+    result = "".join(fragments).strip()
+    # Log prompt run to analytics
+    log_prompt_stats(stats)
+    logger.debug(f"LLM Response: {result}")
+    await llm_cache.aset(cache_key, result, model=LLM_MODEL, prompt_key=prompt_key)
+
+
+async def _generate_on(backend, payload, stats):
+    # Ένα generation σε συγκεκριμένο backend, με in-flight/latency/TTFB μετρήσεις
+    started = time.perf_counter()
+    first = True
+    async with ollama_pool.track(backend):
+        async with backend.client.stream("POST", "/api/generate", json=payload) as response:
             response.raise_for_status()
-            data = response.json()
-            result = data.get("response", "").strip()
-
-            # Optionally, you could measure actual response tokens here:
-            measured_response_tokens = None
-            # Example: measured_response_tokens = len(result.split())
-            logger.debug(f"Prompt to LLM: {prompt}")
-            # Log prompt run to CSV analytics
-            log_prompt_run(
-                prompt_key=prompt_key,
-                model_name=CALC_MODEL,
-                prompt_text=prompt,
-                measured_response_tokens=measured_response_tokens
-            )
-            logger.debug(f"LLM Response: {result}")
-            return result
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                if first:
+                    backend.observe("ttfb_ms", (time.perf_counter() - started) * 1000)
+                    first = False
+                data = json.loads(line)
+                if data.get("error"):
+                    raise RuntimeError(data["error"])
+                fragment = data.get("response", "")
+                if fragment:
+                    yield fragment
+                if data.get("done"):
+                    # Το τελευταίο chunk περιέχει τα prompt_eval_count / eval_count / durations
+                    stats.apply_ollama_metrics(data)
+                    break
+
+
+async def call_ollama(prompt, prompt_key="unknown", use_cache=True, options=None, template=None, format=None):
+    """
+    use_cache=False παρακάμπτει το lookup στο cache (το νέο αποτέλεσμα αποθηκεύεται κανονικά).
+    Ίδια requests που τρέχουν ταυτόχρονα μοιράζονται ένα generation (single-flight).
+    Με `template` (PromptTemplate) το prompt_key είναι το key του template και το
+    token count του prefix δεν ξαναϋπολογίζεται. Το `format` ("json" ή JSON schema)
+    περνά στο Ollama για structured output.
+    """
+    if template is not None:
+        prompt_key = template.key
+    cache_key = make_cache_key(LLM_MODEL, prompt, options, format)
+    if use_cache:
+        cached = await llm_cache.aget(cache_key)
+        if cached is not None:
+            logger.info(f"⚡ LLM cache hit ({prompt_key or 'unknown'}, {cache_key[:12]})")
+            return cached
+
+    try:
+        result = await llm_flights.do(
+            cache_key, lambda: _generate(prompt, prompt_key, cache_key, options, template, format)
+        )
+        return result.strip()
 
     except Exception as e:
         logger.error(f"❌ Error calling Ollama: {e}")
         return None
+
+
+async def stream_ollama(prompt, prompt_key="unknown", use_cache=True, options=None, template=None, format=None):
+    """
+    Async generator που κάνει relay τα tokens του Ollama καθώς παράγονται ("stream": True).
+    Σε αντίθεση με το call_ollama, τα σφάλματα γίνονται raise ώστε ο caller (π.χ. SSE) να τα αναφέρει.
+    Σε cache hit η αποθηκευμένη απάντηση επιστρέφεται ως ένα fragment.
+    """
+    if template is not None:
+        prompt_key = template.key
+    cache_key = make_cache_key(LLM_MODEL, prompt, options, format)
+    if use_cache:
+        cached = await llm_cache.aget(cache_key)
+        if cached is not None:
+            logger.info(f"⚡ LLM cache hit ({prompt_key or 'unknown'}, {cache_key[:12]})")
+            yield cached
+            return
+
+    async for fragment in llm_flights.stream(
+        cache_key, lambda: _generate(prompt, prompt_key, cache_key, options, template, format)
+    ):
+        yield fragment
+
+
+async def embed_texts(texts: list[str], model: str = EMBED_MODEL) -> list[list[float]]:
+    """
+    Embeddings μέσω του /api/embed (ένα request για όλα τα κείμενα). Σε connection
+    errors γίνεται failover σε άλλο backend· τα υπόλοιπα σφάλματα γίνονται raise.
+    """
+    payload = {"model": model, "input": texts, "keep_alive": OLLAMA_KEEP_ALIVE}
+    for backend in ollama_pool.candidates(model):
+        try:
+            async with ollama_pool.track(backend):
+                response = await backend.client.post("/api/embed", json=payload)
+                response.raise_for_status()
+                return response.json()["embeddings"]
+        except FAILOVER_ERRORS as e:
+            logger.warning(f"⚠️ Ollama backend {backend.url} unavailable ({type(e).__name__}), failing over")
+    raise RuntimeError(f"All Ollama backends failed for model {model}")
@@ -0,0 +1,267 @@
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+
+from app.logger import get_logger
+from app.config.config import (
+    OLLAMA_HOST,
+    OLLAMA_BACKENDS,
+    OLLAMA_TIMEOUT,
+    OLLAMA_CONNECT_TIMEOUT,
+    OLLAMA_MAX_CONNECTIONS,
+    OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+    OLLAMA_KEEPALIVE_EXPIRY,
+    OLLAMA_HEALTH_INTERVAL,
+    OLLAMA_HEALTH_TIMEOUT,
+    OLLAMA_EJECT_AFTER,
+    OLLAMA_READMIT_AFTER,
+    OLLAMA_EJECT_COOLDOWN,
+    OLLAMA_NUM_PARALLEL,
+    LLM_MAX_INFLIGHT,
+)
+
+logger = get_logger()
+
+# Σφάλματα όπου το request δεν έφτασε στο backend, οπότε το failover είναι ασφαλές
+FAILOVER_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+# Σφάλματα του ίδιου του backend (δίκτυο, timeouts)· τα 5xx ελέγχονται στο is_backend_error
+BACKEND_ERRORS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+
+
+def is_backend_error(error: Exception) -> bool:
+    """
+    Μετράει για eject μόνο ό,τι δείχνει πρόβλημα του node: connection/timeout ή 5xx.
+    Σφάλματα του μοντέλου (RuntimeError από το stream) και τα 4xx είναι του request.
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, BACKEND_ERRORS)
+
+_EWMA_ALPHA = 0.2
+
+
+def parse_backends(value: str) -> list[dict]:
+    """
+    OLLAMA_BACKENDS: JSON λίστα ([{"url": ..., "weight": 2, "models": [...]}]) ή
+    comma-separated URLs. Κενό → ένα backend στο OLLAMA_HOST.
+    """
+    value = (value or "").strip()
+    if not value:
+        return [{"url": OLLAMA_HOST}]
+    if value.startswith("["):
+        return [entry if isinstance(entry, dict) else {"url": entry} for entry in json.loads(value)]
+    return [{"url": url.strip()} for url in value.split(",") if url.strip()]
+
+
+class Backend:
+    def __init__(self, url: str, weight: float = 1.0, models: list[str] | None = None):
+        self.url = url.rstrip("/")
+        self.weight = max(float(weight), 0.01)
+        self.models = set(models) if models else None  # None = όλα τα μοντέλα
+        self.client: httpx.AsyncClient | None = None
+        self.healthy = True
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.consecutive_successes = 0
+        self.latency_ms: float | None = None  # EWMA συνολικής διάρκειας request
+        self.ttfb_ms: float | None = None  # EWMA χρόνου μέχρι το πρώτο byte
+        self.ejected_at: float | None = None
+        self.last_error: str | None = None
+
+    def build_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self.url,
+            timeout=httpx.Timeout(OLLAMA_TIMEOUT, connect=OLLAMA_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=OLLAMA_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    def serves(self, model: str | None) -> bool:
+        return model is None or self.models is None or model in self.models
+
+    @property
+    def load(self) -> float:
+        # Least outstanding requests, ζυγισμένο με το weight του backend
+        return (self.in_flight + 1) / self.weight
+
+    def observe(self, field: str, value_ms: float):
+        current = getattr(self, field)
+        setattr(self, field, value_ms if current is None else current + _EWMA_ALPHA * (value_ms - current))
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "weight": self.weight,
+            "models": sorted(self.models) if self.models else None,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "latency_ms": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            "ttfb_ms": round(self.ttfb_ms, 1) if self.ttfb_ms is not None else None,
+            "ejected_at": self.ejected_at,
+            "last_error": self.last_error,
+        }
+
+
+class OllamaPool:
+    """
+    Pool από Ollama backends: κάθε request πηγαίνει στο υγιές backend (που σερβίρει
+    το μοντέλο) με τα λιγότερα outstanding requests ανά weight. Active health checks
+    κάνουν eject όσα αποτυγχάνουν και readmit όταν ανακάμψουν. Όλα τα generations
+    του process περνούν από ένα κοινό όριο (`max_inflight`, το GPU budget).
+    """
+
+    def __init__(self, backends: list[dict] | None = None, health_interval: float = OLLAMA_HEALTH_INTERVAL,
+                 max_inflight: int = LLM_MAX_INFLIGHT):
+        self.backends = [Backend(**entry) for entry in (backends or parse_backends(OLLAMA_BACKENDS))]
+        self.health_interval = health_interval
+        self.max_inflight = max_inflight or OLLAMA_NUM_PARALLEL * len(self.backends)
+        self._slots: asyncio.Semaphore | None = None
+        self._health_task: asyncio.Task | None = None
+
+    def __len__(self):
+        return len(self.backends)
+
+    async def start(self):
+        for backend in self.backends:
+            if backend.client is None:
+                backend.client = backend.build_client()
+        # Και με ένα backend: αλλιώς ένα ejected node δεν γίνεται ποτέ readmit
+        if self.health_interval > 0 and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop(), name="ollama-health")
+        urls = ", ".join(backend.url for backend in self.backends)
+        logger.info(f"🔌 Ollama pool ready ({urls}, max {OLLAMA_MAX_CONNECTIONS} connections each, "
+                    f"{self.max_inflight} concurrent generations)")
+
+    async def close(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        for backend in self.backends:
+            if backend.client is not None:
+                await backend.client.aclose()
+                backend.client = None
+        # Το semaphore δένεται στο event loop όπου χρησιμοποιήθηκε
+        self._slots = None
+        logger.info("🔌 Ollama pool closed")
+
+    @asynccontextmanager
+    async def generation_slot(self):
+        """
+        Ένα από τα `max_inflight` slots για generation. Το όριο είναι ανά process και
+        καλύπτει κάθε LLM call (jobs, παράλληλα chunks/diagrams, repairs), όχι μόνο τα jobs.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_inflight)
+        async with self._slots:
+            yield
+
+    def pick(self, model: str | None = None, exclude=()) -> Backend:
+        candidates = [backend for backend in self.backends if backend.serves(model) and backend not in exclude]
+        if not candidates:
+            raise RuntimeError(f"No Ollama backend available for model {model}")
+        if self._health_task is None:
+            # Χωρίς active checks ένα ejected backend ξαναδοκιμάζεται μετά το cooldown
+            for backend in candidates:
+                self.readmit_after_cooldown(backend)
+        healthy = [backend for backend in candidates if backend.healthy]
+        # Αν όλα είναι ejected δοκιμάζουμε κάποιο ούτως ή άλλως αντί να αποτύχουμε αμέσως
+        backend = min(healthy or candidates, key=lambda b: (b.load, b.latency_ms or 0.0))
+        if backend.client is None:
+            # Εκτός lifespan (π.χ. scripts) ο client δημιουργείται on demand
+            backend.client = backend.build_client()
+        return backend
+
+    def candidates(self, model: str | None = None):
+        """
+        Τα backends με τη σειρά που θα δοκιμαστούν (failover), ξεκινώντας από το pick.
+        """
+        tried = []
+        while len(tried) < len(self.backends):
+            try:
+                backend = self.pick(model, exclude=tried)
+            except RuntimeError:
+                return
+            tried.append(backend)
+            yield backend
+
+    @asynccontextmanager
+    async def track(self, backend: Backend):
+        backend.in_flight += 1
+        backend.requests += 1
+        started = time.perf_counter()
+        try:
+            yield
+        except FAILOVER_ERRORS as e:
+            self.mark_failure(backend, e, eject=True)
+            raise
+        except Exception as e:
+            if is_backend_error(e):
+                self.mark_failure(backend, e)
+            else:
+                backend.last_error = str(e) or type(e).__name__
+            raise
+        else:
+            backend.observe("latency_ms", (time.perf_counter() - started) * 1000)
+            backend.consecutive_failures = 0
+        finally:
+            backend.in_flight -= 1
+
+    def mark_failure(self, backend: Backend, error: Exception, eject: bool = False):
+        backend.failures += 1
+        backend.consecutive_failures += 1
+        backend.consecutive_successes = 0
+        backend.last_error = str(error) or type(error).__name__
+        if backend.healthy and (eject or backend.consecutive_failures >= OLLAMA_EJECT_AFTER):
+            backend.healthy = False
+            backend.ejected_at = time.time()
+            logger.warning(f"⚠️ Ollama backend {backend.url} ejected: {backend.last_error}")
+
+    def readmit_after_cooldown(self, backend: Backend):
+        if backend.healthy or backend.ejected_at is None or time.time() - backend.ejected_at < OLLAMA_EJECT_COOLDOWN:
+            return
+        # Half-open: ένα αποτυχημένο request το κάνει πάλι eject
+        backend.healthy = True
+        backend.ejected_at = None
+        backend.consecutive_failures = max(OLLAMA_EJECT_AFTER - 1, 0)
+        logger.info(f"🔁 Ollama backend {backend.url} readmitted after {OLLAMA_EJECT_COOLDOWN:.0f}s cooldown")
+
+    def mark_success(self, backend: Backend):
+        backend.consecutive_failures = 0
+        backend.consecutive_successes += 1
+        if not backend.healthy and backend.consecutive_successes >= OLLAMA_READMIT_AFTER:
+            backend.healthy = True
+            backend.ejected_at = None
+            logger.info(f"✅ Ollama backend {backend.url} readmitted")
+
+    async def check(self, backend: Backend):
+        try:
+            if backend.client is None:
+                backend.client = backend.build_client()
+            response = await backend.client.get("/api/version", timeout=OLLAMA_HEALTH_TIMEOUT)
+            response.raise_for_status()
+        except Exception as e:
+            self.mark_failure(backend, e)
+        else:
+            self.mark_success(backend)
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.gather(*(self.check(backend) for backend in self.backends))
+            await asyncio.sleep(self.health_interval)
+
+    def stats(self) -> list[dict]:
+        return [backend.stats() for backend in self.backends]
+
+
+ollama_pool = OllamaPool()
@@ -0,0 +1,210 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config.config import OUTLINE_CACHE_ENABLED, OUTLINE_CACHE_MAX_ENTRIES, OUTLINE_CACHE_PATH
+from app.logger import get_logger
+
+logger = get_logger()
+
+# Collections του outline· κάθε write σε αυτά αλλάζει το Project.updated_at (και άρα την έκδοση του outline)
+OUTLINE_MODELS = (models.Requirement, models.Diagram, models.Team, models.Task)
+
+
+@dataclass
+class OutlineEntry:
+    version: str
+    etag: str
+    body: bytes
+
+
+def make_etag(body: bytes) -> str:
+    # Strong ETag: hash των bytes του response
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Το If-None-Match συγκρίνει weak: το W/ prefix αγνοείται
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class OutlineCache:
+    """
+    Materialized project outlines (τα JSON bytes του response) ανά (project, light),
+    με έκδοση το Project.updated_at. LRU στη μνήμη και προαιρετικό SQLite disk tier
+    (κοινό μεταξύ workers), ώστε ένα αμετάβλητο outline να μην ξαναχτίζεται.
+    """
+
+    def __init__(self, max_entries=OUTLINE_CACHE_MAX_ENTRIES, path=OUTLINE_CACHE_PATH,
+                 enabled=OUTLINE_CACHE_ENABLED):
+        self.max_entries = max_entries
+        self.path = path
+        self.enabled = enabled
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[tuple[str, bool], OutlineEntry] = OrderedDict()
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS outline_cache (
+                    project_id TEXT NOT NULL,
+                    light INTEGER NOT NULL,
+                    version TEXT NOT NULL,
+                    etag TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    PRIMARY KEY (project_id, light)
+                )
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, project_id: str, light: bool, version: str) -> OutlineEntry | None:
+        if not self.enabled:
+            return None
+        key = (project_id, light)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            if self.path:
+                row = self._connection().execute(
+                    "SELECT etag, body FROM outline_cache WHERE project_id = ? AND light = ? AND version = ?",
+                    (project_id, int(light), version),
+                ).fetchone()
+                if row is not None:
+                    entry = OutlineEntry(version, row[0], row[1])
+                    self._remember(key, entry)
+                    self.disk_hits += 1
+                    return entry
+            self.misses += 1
+            return None
+
+    def put(self, project_id: str, light: bool, version: str, body: bytes) -> OutlineEntry:
+        entry = OutlineEntry(version, make_etag(body), body)
+        if not self.enabled:
+            return entry
+        with self._lock:
+            self._remember((project_id, light), entry)
+            if self.path:
+                conn = self._connection()
+                conn.execute(
+                    """
+                    INSERT INTO outline_cache (project_id, light, version, etag, body) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(project_id, light) DO UPDATE SET
+                        version = excluded.version, etag = excluded.etag, body = excluded.body
+                    """,
+                    (project_id, int(light), version, entry.etag, body),
+                )
+                conn.commit()
+        return entry
+
+    def _remember(self, key: tuple[str, bool], entry: OutlineEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, project_ids):
+        # Η έκδοση (updated_at) αρκεί για την ορθότητα· εδώ απλώς ελευθερώνουμε τα παλιά entries
+        with self._lock:
+            for project_id in project_ids:
+                for light in (False, True):
+                    if self._entries.pop((project_id, light), None) is not None:
+                        self.invalidations += 1
+                if self.path:
+                    self._connection().execute("DELETE FROM outline_cache WHERE project_id = ?", (project_id,))
+            if self.path:
+                self._connection().commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "disk_tier": bool(self.path),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+outline_cache = OutlineCache()
+
+
+def touch_projects(connection, project_ids, now: datetime | None = None):
+    """
+    Νέα έκδοση outline για τα projects: ενημερώνει το Project.updated_at. Για writes
+    που δεν περνούν από το ORM flush (π.χ. bulk inserts) βλ. mark_projects_changed.
+    """
+    project_ids = {project_id for project_id in project_ids if project_id is not None}
+    if project_ids:
+        connection.execute(
+            update(models.Project)
+            .where(models.Project.id.in_(project_ids))
+            .values(updated_at=now or datetime.utcnow())
+        )
+    return project_ids
+
+
+def mark_projects_changed(session: Session, project_ids):
+    # Νέα έκδοση στο ίδιο transaction· τα entries της μνήμης φεύγουν μετά το commit
+    touched = touch_projects(session.connection(), project_ids)
+    session.info.setdefault("outline_projects", set()).update(touched)
+
+
+# ORM writes: κάθε flush που αγγίζει collections του outline αλλάζει την έκδοση του project
+@event.listens_for(Session, "after_flush")
+def _touch_outline_projects(session: Session, flush_context):
+    changed = [
+        obj for obj in (*session.new, *session.dirty, *session.deleted)
+        if isinstance(obj, OUTLINE_MODELS) and (obj not in session.dirty or session.is_modified(obj))
+    ]
+    if not changed:
+        return
+    mark_projects_changed(session, (obj.project_id for obj in changed))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_outlines(session: Session):
+    touched = session.info.pop("outline_projects", None)
+    if touched:
+        outline_cache.invalidate(touched)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_outlines(session: Session):
+    session.info.pop("outline_projects", None)
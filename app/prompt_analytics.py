@@ -1,81 +1,59 @@
 import os
 import csv
 import datetime
-import tiktoken
 from app.logger import get_logger
+from app.analytics_sink import analytics_sink
+from app.token_accounting import (
+    DEFAULT_MODEL,
+    PromptStats,
+    count_tokens,
+    measure_prompt,
+)
 
 logger = get_logger()
-ANALYTICS_LOG = "output/prompt_analytics_log.csv"
+ANALYTICS_LOG = analytics_sink.csv_path
 
 MODEL_CONTEXT_LIMIT = 4_096  # e.g., deepseek-coder
-DEFAULT_MODEL = "deepseek-coder"
-
-MODEL_COSTS = {
-    "gpt-3.5-turbo": 0.0015,
-    "gpt-4": 0.03,
-    "gpt-4-turbo": 0.01,
-    "deepseek-coder": 0.002,  # hypothetical — adjust as needed
-}
 
 def estimate_size(text):
-    enc = tiktoken.encoding_for_model("gpt-4")  # fallback
-    tokens = enc.encode(text)
-    prompt_token_count = len(tokens)
-    return prompt_token_count
-
-def estimate_token_cost(text, model_name=DEFAULT_MODEL):
-    enc = tiktoken.encoding_for_model("gpt-4")  # fallback
-    tokens = enc.encode(text)
-    prompt_token_count = len(tokens)
-    expected_response_tokens = int(prompt_token_count * 0.5)
-    total_estimated_tokens = prompt_token_count + expected_response_tokens
-    cost_per_k = MODEL_COSTS.get(model_name, 0.002)
-    cost_estimate = (prompt_token_count / 1000) * cost_per_k
-
-    # logger.info(f"🧮 Prompt tokens: {prompt_token_count}")
-    # logger.info(f"📤 Expected response tokens (~50% extra): {expected_response_tokens}")
-    # logger.info(f"📦 Total estimated tokens: {total_estimated_tokens}")
-    # logger.info(f"💲 Estimated input cost: ${cost_estimate:.4f} (response cost not included)")
+    return count_tokens(text)
 
+def estimate_token_cost(text, model_name=DEFAULT_MODEL, model_context_limit=MODEL_CONTEXT_LIMIT):
+    stats = measure_prompt(text, model_name=model_name, context_limit=model_context_limit)
     return {
-        "prompt_tokens": prompt_token_count,
-        "expected_response_tokens": expected_response_tokens,
-        "total_tokens": total_estimated_tokens,
-        "cost_estimate": cost_estimate,
+        "prompt_tokens": stats.prompt_tokens,
+        "expected_response_tokens": stats.expected_response_tokens,
+        "total_tokens": stats.total_tokens,
+        "cost_estimate": stats.cost_estimate,
     }
 
 def check_prompt_fits(text, model_context_limit=MODEL_CONTEXT_LIMIT):
-    stats = estimate_token_cost(text)
-    margin = model_context_limit - stats["total_tokens"]
-    if stats["total_tokens"] > model_context_limit:
-        logger.warning(f"⚠️ WARNING: Total tokens exceed context window by {abs(margin)} tokens!")
-    else:
-        logger.info(f"✅ OK: Fits within context window (margin: {margin} tokens)")
-    return stats
+    return estimate_token_cost(text, model_context_limit=model_context_limit)
 
-def log_prompt_run(prompt_key, model_name, prompt_text, measured_response_tokens=None):
-    os.makedirs(os.path.dirname(ANALYTICS_LOG), exist_ok=True)
-    stats = estimate_token_cost(prompt_text, model_name=model_name)
-    if measured_response_tokens is not None:
-        stats["total_tokens"] = stats["prompt_tokens"] + measured_response_tokens
+def log_prompt_stats(stats: PromptStats):
+    """
+    Στέλνει τη γραμμή στο background analytics sink· δεν γίνεται I/O στο request path.
+    """
+    response_tokens = stats.response_tokens if stats.response_tokens is not None else stats.expected_response_tokens
+    analytics_sink.submit({
+        "timestamp": datetime.datetime.now().isoformat(),
+        "prompt_key": stats.prompt_key,
+        "model": stats.model,
+        "prompt_tokens": stats.prompt_tokens,
+        "response_tokens": response_tokens,
+        "total_tokens": stats.total_tokens,
+        "cost_estimate": stats.cost_estimate,
+        "measured": stats.measured,
+        "total_duration_ms": stats.total_duration_ms,
+        "eval_duration_ms": stats.eval_duration_ms,
+        "tokens_per_second": stats.tokens_per_second,
+    })
 
-    with open(ANALYTICS_LOG, mode="a", newline="", encoding="utf-8") as csvfile:
-        writer = csv.writer(csvfile)
-        if csvfile.tell() == 0:
-            writer.writerow([
-                "timestamp", "prompt_key", "model", "prompt_tokens",
-                "response_tokens", "total_tokens", "cost_estimate"
-            ])
-        writer.writerow([
-            datetime.datetime.now().isoformat(),
-            prompt_key,
-            model_name,
-            stats["prompt_tokens"],
-            measured_response_tokens if measured_response_tokens is not None else stats["expected_response_tokens"],
-            stats["total_tokens"],
-            f"${stats['cost_estimate']:.4f}"
-        ])
-    logger.info(f"📊 Prompt analytics logged to {ANALYTICS_LOG}")
+def log_prompt_run(prompt_key, model_name, prompt_text, measured_response_tokens=None):
+    stats = measure_prompt(prompt_text, prompt_key=prompt_key, model_name=model_name,
+                           context_limit=MODEL_CONTEXT_LIMIT)
+    stats.response_tokens = measured_response_tokens
+    log_prompt_stats(stats)
 
 def summarize_prompt_runs():
     if not os.path.exists(ANALYTICS_LOG):
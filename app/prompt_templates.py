@@ -0,0 +1,80 @@
+import hashlib
+from dataclasses import dataclass, field
+from functools import cached_property
+
+from app.logger import get_logger
+from app.token_accounting import count_tokens
+
+logger = get_logger()
+
+
+@dataclass
+class PromptTemplate:
+    """
+    Prompt με σταθερό (byte-identical) prefix: οδηγίες και παραδείγματα πρώτα,
+    το περιεχόμενο του χρήστη στο τέλος, ώστε το Ollama να ξαναχρησιμοποιεί
+    το prompt cache του για όλο το prefix.
+    """
+    key: str
+    prefix: str
+    description: str = ""
+    _hash: str = field(init=False, repr=False, default="")
+
+    def __post_init__(self):
+        self._hash = hashlib.sha256(self.prefix.encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def version(self) -> str:
+        # Αλλάζει μαζί με το prefix· για caches που εξαρτώνται από το ακριβές prompt
+        return self._hash
+
+    @cached_property
+    def static_tokens(self) -> int:
+        # Υπολογίζεται μία φορά ανά process (warm στο startup)
+        return count_tokens(self.prefix)
+
+    def render(self, content: str) -> str:
+        return f"{self.prefix}{content.strip()}\n"
+
+    def info(self) -> dict:
+        return {
+            "key": self.key,
+            "description": self.description,
+            "prefix_sha256": self._hash,
+            "prefix_chars": len(self.prefix),
+            "static_tokens": self.static_tokens,
+        }
+
+
+class PromptRegistry:
+    def __init__(self):
+        self._templates: dict[str, PromptTemplate] = {}
+
+    def register(self, key: str, prefix: str, description: str = "") -> PromptTemplate:
+        if key in self._templates:
+            raise ValueError(f"Prompt template '{key}' is already registered")
+        template = PromptTemplate(key, prefix, description)
+        self._templates[key] = template
+        return template
+
+    def get(self, key: str) -> PromptTemplate:
+        return self._templates[key]
+
+    def warm(self):
+        """
+        Υπολογίζει τα static token counts όλων των templates (στο startup, ώστε
+        κανένα request να μην πληρώνει το encode του prefix).
+        """
+        try:
+            total = sum(template.static_tokens for template in self._templates.values())
+        except Exception as e:
+            # Δεν σταματά το startup· τα counts υπολογίζονται lazily στο πρώτο request
+            logger.warning(f"⚠️ Could not warm prompt token counts: {e}")
+            return
+        logger.info(f"🧩 {len(self._templates)} prompt templates ready ({total} static tokens)")
+
+    def stats(self) -> list[dict]:
+        return [template.info() for template in self._templates.values()]
+
+
+prompt_registry = PromptRegistry()
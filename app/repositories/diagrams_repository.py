@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from app import models, schemas
 from fastapi import HTTPException
+from app.utils.pagination import ListSpec, PageRequest, fetch_page
 
 
 
@@ -30,8 +31,14 @@ def update_diagram(diagram_id: int, diagram: schemas.DiagramCreate, db: Session)
     db.refresh(db_diagram)
     return db_diagram
 
-def list_diagrams(project_id: str, db: Session):
-    return db.query(models.Diagram).filter(models.Diagram.project_id == project_id).all()
+DIAGRAM_LIST = ListSpec(models.Diagram, ("id", "title", "type", "mermaid_code"))
+
+def list_diagrams(project_id: str, db: Session, page: PageRequest, type: str | None = None):
+    # fields=id,title,type: χωρίς mermaid_code, που δεν διαβάζεται καν από τη βάση
+    filters = [models.Diagram.project_id == project_id]
+    if type is not None:
+        filters.append(models.Diagram.type == type)
+    return fetch_page(db, DIAGRAM_LIST, page, filters)
 
 def get_diagram(project_id: str, diagram_id: int, db: Session):
     diagram = db.query(models.Diagram).filter(
@@ -53,7 +60,8 @@ def delete_diagram(project_id: str, diagram_id: int, db: Session):
     db.commit()
     return {"detail": "Diagram deleted"}
 
-def upsert_diagram(project_id: str, diagram_id: int, diagram: schemas.DiagramCreate, db: Session):
+def upsert_diagram(project_id: str, diagram_id: int, diagram: schemas.DiagramCreate, db: Session, commit: bool = True):
+    # commit=False: ο caller κάνει commit (π.χ. πολλά diagrams σε ένα transaction)
     # 1. Try to UPDATE if diagram_id exists
     if diagram_id is not None:
         db_diagram = db.query(models.Diagram).filter(
@@ -64,8 +72,9 @@ def upsert_diagram(project_id: str, diagram_id: int, diagram: schemas.DiagramCre
             db_diagram.title = diagram.title
             db_diagram.mermaid_code = diagram.mermaid_code
             db_diagram.type = diagram.type
-            db.commit()
-            db.refresh(db_diagram)
+            if commit:
+                db.commit()
+                db.refresh(db_diagram)
             return db_diagram
 
     # 2. If not found → INSERT new diagram
@@ -76,6 +85,9 @@ def upsert_diagram(project_id: str, diagram_id: int, diagram: schemas.DiagramCre
         type=diagram.type
     )
     db.add(db_diagram)
-    db.commit()
-    db.refresh(db_diagram)
-    return db_diagram    
\ No newline at end of file
+    if commit:
+        db.commit()
+        db.refresh(db_diagram)
+    else:
+        db.flush()
+    return db_diagram
@@ -1,8 +1,13 @@
 # app/repositories/projects_repository.py
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy.exc import SQLAlchemyError
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 from app import models, schemas
 from app.exceptions import custom_exceptions
+from app.repositories.requirements_repository import invalidate_requirement_index
+from app.outline_cache import outline_cache
+from app.utils.pagination import ListSpec, PageRequest, fetch_page
 
 
 def create_project(project: schemas.ProjectCreate, db: Session) -> models.Project:
@@ -16,23 +21,72 @@ def create_project(project: schemas.ProjectCreate, db: Session) -> models.Projec
     db.refresh(db_project)
     return db_project
 
-def list_projects(db: Session) -> list[models.Project]:
-    projects = db.query(models.Project).all()
-    if not projects:
-        # αν θέλεις να είναι 204 No Content αντί για 404, μπορείς να το χειριστείς στον decorator
-        raise custom_exceptions.ProjectNotFoundError("No projects found")
-    return projects
-
-def get_project_outline(project_id: str, db: Session) -> models.Project:
-    project = db.query(models.Project).options(
-        joinedload(models.Project.requirements),
-        joinedload(models.Project.diagrams),
-        joinedload(models.Project.teams),
-        joinedload(models.Project.tasks),
-    ).filter(models.Project.id == project_id).first()
-    if not project:
+PROJECT_LIST = ListSpec(
+    models.Project, ("id", "name", "description", "created_at", "updated_at"), order=("created_at", "id")
+)
+
+
+def list_projects(db: Session, page: PageRequest, created_after: datetime | None = None,
+                  created_before: datetime | None = None) -> tuple[list[dict], str | None]:
+    filters = []
+    if created_after is not None:
+        filters.append(models.Project.created_at >= created_after)
+    if created_before is not None:
+        filters.append(models.Project.created_at < created_before)
+    return fetch_page(db, PROJECT_LIST, page, filters)
+
+def get_project_version(project_id: str, db: Session) -> str:
+    """
+    Η έκδοση του outline: το Project.updated_at, που αλλάζει σε κάθε write στα
+    collections του (βλ. app.outline_cache).
+    """
+    updated_at = db.execute(
+        select(models.Project.updated_at).where(models.Project.id == project_id)
+    ).scalar_one_or_none()
+    if updated_at is None:
+        raise custom_exceptions.ProjectNotFoundError(f"Project {project_id} not found")
+    return updated_at.isoformat()
+
+
+# Στήλες ανά collection του outline (ό,τι χρειάζονται τα response schemas)
+OUTLINE_COLLECTIONS = {
+    "requirements": (models.Requirement, ("id", "description", "category", "status")),
+    "diagrams": (models.Diagram, ("id", "title", "type", "mermaid_code")),
+    "teams": (models.Team, ("id", "name", "members")),
+    "tasks": (models.Task, ("id", "description", "assigned_to_team_id", "status")),
+}
+# Το light outline παραλείπει τα μεγάλα κείμενα (τα diagram bodies)
+OUTLINE_LIGHT_EXCLUDE = {"diagrams": {"mermaid_code"}}
+
+
+def get_project_outline(project_id: str, db: Session, light: bool = False) -> dict:
+    """
+    Το project με τα requirements, diagrams, teams και tasks του, με ένα query ανά
+    collection (όχι joinedload: το cartesian product των τεσσάρων collections
+    μεγαλώνει πολλαπλασιαστικά) και μόνο τις στήλες που χρειάζονται.
+    light=True: τα diagrams χωρίς mermaid_code.
+    """
+    project = db.execute(
+        select(
+            models.Project.id,
+            models.Project.name,
+            models.Project.description,
+            models.Project.created_at,
+            models.Project.updated_at,
+        ).where(models.Project.id == project_id)
+    ).mappings().first()
+    if project is None:
         raise custom_exceptions.ProjectNotFoundError(f"Project {project_id} not found")
-    return project
+    outline = dict(project)
+    for name, (model, columns) in OUTLINE_COLLECTIONS.items():
+        excluded = OUTLINE_LIGHT_EXCLUDE.get(name, set()) if light else set()
+        rows = db.execute(
+            select(*(getattr(model, column) for column in columns if column not in excluded))
+            .where(model.project_id == project_id)
+            .order_by(model.id)
+        ).mappings()
+        outline[name] = [dict(row) for row in rows]
+    return outline
 
 def delete_project(project_id: str, db: Session) -> bool:
     project = db.query(models.Project).filter(models.Project.id == project_id).first()
@@ -40,4 +94,6 @@ def delete_project(project_id: str, db: Session) -> bool:
         return False
     db.delete(project)
     db.commit()
+    invalidate_requirement_index(project_id)
+    outline_cache.invalidate([project_id])
     return True
@@ -0,0 +1,176 @@
+import threading
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app import models, schemas
+from app.logger import get_logger
+from app.outline_cache import mark_projects_changed
+from app.utils.dedup import DuplicateMatch, NearDuplicateIndex
+from app.utils.pagination import ListSpec, PageRequest, fetch_page
+
+logger = get_logger()
+
+# Near-duplicate index ανά project: (index, μεγαλύτερο id που έχει διαβαστεί). Είναι ανά
+# process, οπότε δεν βλέπει μόνο του τα writes άλλων workers· κάθε lookup διαβάζει πρώτα τα
+# requirements με id πάνω από το watermark, και όσα διαγράφηκαν αλλού ανιχνεύονται όταν το
+# match δεν υπάρχει πια στη βάση. Rows που γίνονται commit με μικρότερο id από ήδη ορατά
+# (ταυτόχρονα transactions στο Postgres) μπορεί να λείψουν μέχρι το επόμενο rebuild· το
+# index είναι βοήθημα dedup, όχι constraint.
+_indexes: dict[str, tuple[NearDuplicateIndex, int]] = {}
+_indexes_lock = threading.Lock()
+
+
+def _project_index(project_id: str, db: Session) -> NearDuplicateIndex:
+    with _indexes_lock:
+        index, last_id = _indexes.get(project_id) or (NearDuplicateIndex(), 0)
+    # Το query γίνεται χωρίς το lock: στα async endpoints τρέχει μέσα σε run_sync
+    rows = db.query(models.Requirement.id, models.Requirement.description).filter(
+        models.Requirement.project_id == project_id, models.Requirement.id > last_id
+    ).order_by(models.Requirement.id).all()
+    for requirement_id, description in rows:
+        index.add(requirement_id, description)
+    with _indexes_lock:
+        current = _indexes.get(project_id)
+        if current is not None and current[0] is not index:
+            # Άλλο thread έχτισε (ή το invalidate άδειασε) ταυτόχρονα· κρατάμε το δικό του
+            return current[0]
+        seen = rows[-1][0] if rows else last_id
+        _indexes[project_id] = (index, max(seen, current[1] if current is not None else 0))
+        return index
+
+
+def invalidate_requirement_index(project_id: str | None = None):
+    with _indexes_lock:
+        if project_id is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(project_id, None)
+
+
+def _verified_match(index: NearDuplicateIndex, project_id: str, description: str,
+                    db: Session) -> DuplicateMatch | None:
+    match = index.match(description)
+    if match is None:
+        return None
+    existing = db.get(models.Requirement, match.key)
+    if existing is None or existing.project_id != project_id:
+        # Διαγράφηκε από άλλο process· το index ξαναχτίζεται στο επόμενο lookup
+        invalidate_requirement_index(project_id)
+        return None
+    return match
+
+
+def find_duplicate_requirement(project_id: str, description: str, db: Session) -> DuplicateMatch | None:
+    """
+    Το πιο όμοιο requirement του project (match.key είναι το id του), ή None.
+    match.merge: ίδιο requirement· αλλιώς μόνο possible duplicate.
+    """
+    return _verified_match(_project_index(project_id, db), project_id, description, db)
+
+
+def create_requirement(project_id: str, req: schemas.RequirementCreate, db: Session,
+                       commit: bool = True) -> tuple[models.Requirement, DuplicateMatch | None]:
+    """
+    Αποθηκεύει το requirement, εκτός αν το project έχει ήδη το ίδιο (match.merge)·
+    τότε επιστρέφεται το υπάρχον. Επιστρέφει (requirement, match): created όταν το
+    match είναι None ή possible duplicate.
+    commit=False: ο caller κάνει commit (π.χ. πολλά requirements σε ένα transaction).
+    """
+    match = find_duplicate_requirement(project_id, req.description, db)
+    if match is not None and match.merge:
+        logger.info(f"♻️ Requirement merged with existing #{match.key} of project {project_id}")
+        return db.get(models.Requirement, match.key), match
+    db_req = models.Requirement(
+        project_id=project_id,
+        description=req.description,
+        # Το schema enum έχει τα values ("Functional"), το column τα members του models enum
+        category=models.RequirementCategory(req.category.value)
+    )
+    db.add(db_req)
+    if commit:
+        db.commit()
+        db.refresh(db_req)
+    else:
+        db.flush()
+    _project_index(project_id, db).add(db_req.id, db_req.description)
+    return db_req, match
+
+
+def duplicate_fields(match: DuplicateMatch | None, key_to_id=lambda key: key) -> dict:
+    # Τα πεδία duplicate_of / possible_duplicate_of / similarity ενός response
+    if match is None:
+        return {}
+    if match.merge:
+        return {"duplicate_of": key_to_id(match.key)}
+    return {"possible_duplicate_of": key_to_id(match.key), "similarity": round(match.similarity, 4)}
+
+
+REQUIREMENT_LIST = ListSpec(models.Requirement, ("id", "description", "category", "status"))
+
+
+def list_requirements(project_id: str, db: Session, page: PageRequest,
+                      status: schemas.RequirementStatus | None = None,
+                      category: schemas.RequirementCategory | None = None) -> tuple[list[dict], str | None]:
+    filters = [models.Requirement.project_id == project_id]
+    if status is not None:
+        filters.append(models.Requirement.status == models.RequirementStatus(status.value))
+    if category is not None:
+        filters.append(models.Requirement.category == models.RequirementCategory(category.value))
+    return fetch_page(db, REQUIREMENT_LIST, page, filters)
+
+
+def bulk_create_requirements(project_id: str, items: list[tuple[int, schemas.RequirementCreate]],
+                             db: Session) -> list[dict]:
+    """
+    Πολλά requirements με ένα executemany INSERT ... RETURNING id (ο caller κάνει commit).
+    Items ίδια με υπάρχον requirement ή με άλλο item του batch δεν εισάγονται· επιστρέφουν
+    το id του υπάρχοντος με created=False και duplicate_of. Τα near-duplicates εισάγονται
+    κανονικά, με possible_duplicate_of και similarity.
+    """
+    index = _project_index(project_id, db)
+    batch = NearDuplicateIndex()
+    results: dict[int, dict] = {}
+    pending, batch_duplicates = [], []
+    for position, req in items:
+        existing = _verified_match(index, project_id, req.description, db)
+        if existing is not None and existing.merge:
+            results[position] = {"index": position, "id": existing.key, "created": False,
+                                 **duplicate_fields(existing)}
+            continue
+        in_batch = batch.add_if_new(position, req.description)
+        if in_batch is not None and in_batch.merge:
+            batch_duplicates.append((position, in_batch))
+            continue
+        # Possible duplicate: το πιο όμοιο, είτε υπάρχον requirement είτε item του batch
+        if in_batch is not None and (existing is None or in_batch.similarity > existing.similarity):
+            pending.append((position, req, in_batch, True))
+        else:
+            pending.append((position, req, existing, False))
+
+    if pending:
+        ids = db.scalars(
+            insert(models.Requirement).returning(models.Requirement.id, sort_by_parameter_order=True),
+            [
+                {
+                    "project_id": project_id,
+                    "description": req.description,
+                    "category": models.RequirementCategory(req.category.value),
+                    "status": models.RequirementStatus.pending,
+                }
+                for _, req, _, _ in pending
+            ],
+        ).all()
+        for (position, req, _, _), requirement_id in zip(pending, ids):
+            index.add(requirement_id, req.description)
+            results[position] = {"index": position, "id": requirement_id, "created": True}
+        mark_projects_changed(db, [project_id])
+        logger.info(f"📥 Bulk insert of {len(ids)} requirements into project {project_id}")
+
+    # Τα keys του batch index είναι θέσεις του request· στο response γίνονται ids
+    batch_id = lambda key: results[key]["id"]  # noqa: E731
+    for position, _, match, from_batch in pending:
+        results[position].update(duplicate_fields(match, batch_id) if from_batch else duplicate_fields(match))
+    for position, match in batch_duplicates:
+        results[position] = {"index": position, "id": batch_id(match.key), "created": False,
+                             **duplicate_fields(match, batch_id)}
+    return [results[position] for position, _ in items]
@@ -0,0 +1,49 @@
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app import models, schemas
+from app.outline_cache import mark_projects_changed
+from app.utils.pagination import ListSpec, PageRequest, fetch_page
+
+TASK_LIST = ListSpec(models.Task, ("id", "description", "assigned_to_team_id", "status"))
+
+
+def list_tasks(project_id: str, db: Session, page: PageRequest, status: schemas.TaskStatus | None = None,
+               team_id: int | None = None) -> tuple[list[dict], str | None]:
+    filters = [models.Task.project_id == project_id]
+    if status is not None:
+        filters.append(models.Task.status == models.TaskStatus(status.value))
+    if team_id is not None:
+        filters.append(models.Task.assigned_to_team_id == team_id)
+    return fetch_page(db, TASK_LIST, page, filters)
+
+
+def bulk_create_tasks(project_id: str, items: list[tuple[int, schemas.TaskCreate]],
+                      db: Session) -> tuple[list[dict], list[dict]]:
+    """
+    Ένα executemany INSERT ... RETURNING id για όλο το batch (ο caller κάνει commit).
+    Οι ομάδες του project διαβάζονται μία φορά· task με assigned_to_team_id άλλου
+    project γίνεται σφάλμα του item. Επιστρέφει (results, errors).
+    """
+    team_ids = set(db.scalars(select(models.Team.id).where(models.Team.project_id == project_id)))
+    valid, errors = [], []
+    for position, task in items:
+        if task.assigned_to_team_id is not None and task.assigned_to_team_id not in team_ids:
+            errors.append({"index": position, "error": f"Team {task.assigned_to_team_id} not found in project"})
+        else:
+            valid.append((position, task))
+    if not valid:
+        return [], errors
+    ids = db.scalars(
+        insert(models.Task).returning(models.Task.id, sort_by_parameter_order=True),
+        [
+            {
+                "project_id": project_id,
+                "description": task.description,
+                "assigned_to_team_id": task.assigned_to_team_id,
+                "status": models.TaskStatus.todo,
+            }
+            for _, task in valid
+        ],
+    ).all()
+    mark_projects_changed(db, [project_id])
+    return [{"index": position, "id": task_id, "created": True} for (position, _), task_id in zip(valid, ids)], errors
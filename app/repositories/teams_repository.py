@@ -0,0 +1,27 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app import models, schemas
+from app.outline_cache import mark_projects_changed
+from app.utils.pagination import ListSpec, PageRequest, fetch_page
+
+TEAM_LIST = ListSpec(models.Team, ("id", "name", "members"))
+
+
+def list_teams(project_id: str, db: Session, page: PageRequest,
+               name: str | None = None) -> tuple[list[dict], str | None]:
+    filters = [models.Team.project_id == project_id]
+    if name is not None:
+        filters.append(models.Team.name == name)
+    return fetch_page(db, TEAM_LIST, page, filters)
+
+
+def bulk_create_teams(project_id: str, items: list[tuple[int, schemas.TeamCreate]], db: Session) -> list[dict]:
+    # Ένα executemany INSERT ... RETURNING id για όλο το batch (ο caller κάνει commit)
+    if not items:
+        return []
+    ids = db.scalars(
+        insert(models.Team).returning(models.Team.id, sort_by_parameter_order=True),
+        [{"project_id": project_id, "name": team.name, "members": team.members} for _, team in items],
+    ).all()
+    mark_projects_changed(db, [project_id])
+    return [{"index": position, "id": team_id, "created": True} for (position, _), team_id in zip(items, ids)]
@@ -1,12 +1,23 @@
-from app.ollama_client import call_ollama
+import asyncio
+from app.ollama_client import call_ollama, stream_ollama, embed_texts
 from app.logger import get_logger
-from app.utils.llm_response_utils import extract_json_array_or_object_from_text
+from app.prompt_templates import prompt_registry
+from typing import List
+from pydantic import ValidationError
+from app.schemas import RequirementItem
+from app.structured_output import json_schema, parse_structured
+from app.semantic_cache import semantic_cache, SemanticHit, cache_namespace
+from app.utils.json_stream import JsonStreamParser
+from app.utils.dedup import NearDuplicateIndex, requirement_text
+from app.utils.pdf_processor import split_into_token_chunks
+from app.config.config import REQUIREMENTS_CHUNK_TOKENS, REQUIREMENTS_MAP_CONCURRENCY
 
 logger = get_logger()
 
-def analyze_requirements(content: str):
-    prompt = f"""
-You are an experienced business analyst.
+EXTRACTION_MODES = ("auto", "single", "map_reduce")
+
+# Σταθερό prefix (οδηγίες + παράδειγμα) και το έγγραφο στο τέλος, για prompt cache reuse στο Ollama
+REQUIREMENTS_TEMPLATE = prompt_registry.register("requirements.extract", """You are an experienced business analyst.
 
 Analyze the following document written in Greek, describing the current (as-is) and desired (to-be) business processes.
 
@@ -19,21 +30,269 @@ Return ONLY a JSON array, where each requirement has:
 
 ### Example format:
 [
-    {{
+    {
         "title": "Cardless ανάληψη με QR",
         "description": "Ο πελάτης μπορεί να κάνει ανάληψη μετρητών στο ATM χρησιμοποιώντας QR code χωρίς κάρτα.",
         "functional": true
-    }}
+    }
 ]
 
 DO NOT include any explanation or commentary, only the JSON array.
+Return only the json nothing else.
 
-    {content}
-    ```
-    return only the json nothing else
-    """
+### Document:
+""", "Έγγραφο (as-is / to-be) → JSON array με requirements")
+
+def build_requirements_prompt(content: str) -> str:
+    return REQUIREMENTS_TEMPLATE.render(content)
+
+REQUIREMENTS_SCHEMA = List[RequirementItem]
+# Entries του semantic cache: ανά έκδοση του template και LLM
+SEMANTIC_NAMESPACE = cache_namespace(REQUIREMENTS_TEMPLATE)
+
+def is_valid_requirement(value) -> bool:
+    try:
+        RequirementItem.model_validate(value)
+        return True
+    except ValidationError:
+        return False
 
-    answer = call_ollama(prompt, prompt_key="")
+async def analyze_requirements(content: str, use_cache: bool = True):
+    prompt = build_requirements_prompt(content)
+    answer = await call_ollama(prompt, template=REQUIREMENTS_TEMPLATE, use_cache=use_cache,
+                               format=json_schema(REQUIREMENTS_SCHEMA))
     logger.debug(f"Raw Answer:{answer}")
-    json_response = extract_json_array_or_object_from_text(answer)
-    return json_response
\ No newline at end of file
+    if answer is None:
+        raise RuntimeError("LLM call failed")
+    requirements = await parse_structured(answer, REQUIREMENTS_SCHEMA, REQUIREMENTS_TEMPLATE.key, use_cache=use_cache)
+    return requirements or []
+
+async def embed_chunks(chunks: list[str]) -> list:
+    """
+    Τα embeddings πολλών chunks με ένα request στο /api/embed. Αν το semantic cache
+    είναι απενεργοποιημένο ή το embedding αποτύχει επιστρέφει None ανά chunk.
+    """
+    if not semantic_cache.enabled or not chunks:
+        return [None] * len(chunks)
+    try:
+        return await embed_texts(chunks)
+    except Exception as e:
+        logger.warning(f"⚠️ Batch embedding of {len(chunks)} chunks failed: {e}")
+        return [None] * len(chunks)
+
+async def _semantic_lookup(content: str, use_cache: bool, embedding=None) -> tuple[SemanticHit | None, list | None]:
+    """
+    Embedding του κειμένου (αν δεν δοθεί ήδη υπολογισμένο) και αναζήτηση στο semantic
+    cache. Μόνο ίδιο κείμενο (exact hit) ξαναχρησιμοποιείται. Επιστρέφει (hit, embedding)· με use_cache=False γίνεται μόνο το embedding
+    (για να αποθηκευτεί το νέο αποτέλεσμα). Σφάλμα στα embeddings δεν σταματά την
+    εξαγωγή, απλώς παρακάμπτει το cache.
+    """
+    if not semantic_cache.enabled:
+        return None, None
+    if embedding is None:
+        try:
+            [embedding] = await embed_texts([content])
+        except Exception as e:
+            logger.warning(f"⚠️ Embedding failed, semantic cache skipped: {e}")
+            return None, None
+    hit = await semantic_cache.asearch(embedding, SEMANTIC_NAMESPACE, content) if use_cache else None
+    if hit is not None and not hit.exact:
+        # Παρόμοιο δεν σημαίνει ίδιο: ένα "δεν" ή άλλος αριθμός αλλάζει τα requirements
+        logger.info(f"🧭 Semantic near match ignored (similarity {hit.similarity:.3f}), extracting again")
+        hit = None
+    if hit is not None:
+        logger.info(f"🧭 Semantic cache hit (similarity {hit.similarity:.3f}, {len(hit.result)} requirements)")
+    return hit, embedding
+
+async def _semantic_store(content: str, embedding, requirements):
+    if embedding is not None:
+        await semantic_cache.aadd(embedding, SEMANTIC_NAMESPACE, content, requirements)
+
+async def extract_requirements(content: str, use_cache: bool = True, embedding=None) -> tuple[list, SemanticHit | None]:
+    """
+    analyze_requirements με semantic cache: κείμενο ίδιο με ήδη αναλυμένο (π.χ.
+    chunk που δεν άλλαξε σε νέο upload) παίρνει τα requirements εκείνου χωρίς κλήση στο LLM.
+    Το `embedding` μπορεί να έχει υπολογιστεί ήδη (embed_chunks). Επιστρέφει (requirements, hit).
+    """
+    hit, embedding = await _semantic_lookup(content, use_cache, embedding)
+    if hit is not None:
+        return hit.result, hit
+    requirements = await analyze_requirements(content, use_cache=use_cache)
+    await _semantic_store(content, embedding, requirements)
+    return requirements, None
+
+async def stream_requirements(content: str, use_cache: bool = True):
+    """
+    Streaming εκδοχή του analyze_requirements: κάνει yield ("token", ...) όσο
+    παράγεται η απάντηση, ("item", ...) για κάθε requirement μόλις κλείσει το JSON
+    object του και στο τέλος ("result", [requirements]). Σε semantic cache hit
+    τα items στέλνονται αμέσως χωρίς κλήση στο LLM.
+    """
+    hit, embedding = await _semantic_lookup(content, use_cache)
+    if hit is not None:
+        yield "progress", {"stage": "semantic_cache_hit", "similarity": round(hit.similarity, 4)}
+        for index, requirement in enumerate(hit.result):
+            yield "item", {"index": index, "requirement": requirement}
+        yield "result", hit.result
+        return
+
+    prompt = build_requirements_prompt(content)
+    parser = JsonStreamParser()
+    async for fragment in stream_ollama(prompt, template=REQUIREMENTS_TEMPLATE, use_cache=use_cache,
+                                        format=json_schema(REQUIREMENTS_SCHEMA)):
+        yield "token", {"text": fragment}
+        first = len(parser.items)
+        for index, requirement in enumerate(parser.feed(fragment), start=first):
+            # Τα άκυρα στοιχεία διορθώνονται στο τέλος (parse_structured)
+            if is_valid_requirement(requirement):
+                yield "item", {"index": index, "requirement": requirement}
+
+    logger.debug(f"Raw Answer:{parser.text}")
+    try:
+        parsed = parser.result()
+    except ValueError:
+        parsed = None
+    requirements = await parse_structured(parser.text, REQUIREMENTS_SCHEMA, REQUIREMENTS_TEMPLATE.key,
+                                          use_cache=use_cache, parsed=parsed) or []
+    await _semantic_store(content, embedding, requirements)
+    yield "result", requirements
+
+
+def merge_requirements(requirement_lists):
+    """
+    Reduce βήμα: ενώνει τις λίστες (chunks ή αρχεία) με τη σειρά τους. Αφαιρούνται
+    μόνο τα duplicates με ίδιο title + description μετά το normalization (και στα
+    ελληνικά), κρατώντας την πρώτη εμφάνιση. Τα near-duplicates μένουν στη λίστα με
+    `possible_duplicate_of` (θέση του όμοιου requirement στο αποτέλεσμα) και `similarity`:
+    "δεν μπορεί" ή άλλος αριθμός είναι άλλο requirement, όσο όμοιο κι αν είναι το κείμενο.
+    """
+    merged, index = [], NearDuplicateIndex()
+    for requirements in requirement_lists:
+        for requirement in requirements or []:
+            if not isinstance(requirement, dict):
+                continue
+            match = index.add_if_new(len(merged), requirement_text(requirement))
+            if match is not None and match.merge:
+                continue
+            # Οι θέσεις από προηγούμενο merge (π.χ. ανά αρχείο) δεν ισχύουν στη νέα λίστα
+            requirement = {key: value for key, value in requirement.items()
+                           if key not in ("possible_duplicate_of", "similarity")}
+            if match is not None:
+                requirement = {**requirement, "possible_duplicate_of": match.key,
+                               "similarity": round(match.similarity, 4)}
+            merged.append(requirement)
+    return merged
+
+async def split_for_extraction(content: str, mode: str = "auto", chunk_tokens: int = REQUIREMENTS_CHUNK_TOKENS):
+    """
+    Επιστρέφει τα chunks που θα αναλυθούν. Στο "auto" γίνεται map-reduce μόνο αν
+    το έγγραφο δεν χωράει σε ένα chunk.
+    """
+    if mode == "single":
+        return [content]
+    return await asyncio.to_thread(split_into_token_chunks, content, chunk_tokens)
+
+async def stream_requirements_chunked(chunks, use_cache: bool = True,
+                                      concurrency: int = REQUIREMENTS_MAP_CONCURRENCY):
+    """
+    Map-reduce εξαγωγή: κάθε chunk αναλύεται ξεχωριστά (έως `concurrency` ταυτόχρονα),
+    με progress event ανά chunk, και στο τέλος τα αποτελέσματα γίνονται merge.
+    Chunks που δεν άλλαξαν από προηγούμενο upload έρχονται από το semantic cache.
+    Τα `chunks` μπορεί να είναι και async iterator (π.χ. από το streaming PDF extraction),
+    οπότε η ανάλυση ξεκινά πριν ολοκληρωθεί η εξαγωγή και το `total` είναι None μέχρι τότε.
+    Αν αποτύχουν όλα τα chunks γίνεται raise· αν αποτύχουν μερικά, πριν το `result`
+    έρχεται ("partial", {"failed_chunks": [...]}).
+    """
+    total = len(chunks) if isinstance(chunks, (list, tuple)) else None
+    yield "progress", {"stage": "map", "chunks": total}
+    semaphore = asyncio.Semaphore(concurrency)
+    done: asyncio.Queue = asyncio.Queue()
+    tasks = []
+
+    async def extract(index, chunk, embedding):
+        try:
+            async with semaphore:
+                await done.put((index, *await extract_requirements(chunk, use_cache=use_cache, embedding=embedding),
+                                None))
+        except Exception as e:
+            await done.put((index, None, None, e))
+
+    async def start(batch):
+        # Ένα embedding request ανά `concurrency` chunks, αντί για ένα ανά chunk
+        for chunk, embedding in zip(batch, await embed_chunks(batch)):
+            tasks.append(asyncio.create_task(extract(len(tasks), chunk, embedding)))
+
+    async def feed():
+        if isinstance(chunks, (list, tuple)):
+            for offset in range(0, len(chunks), concurrency):
+                await start(list(chunks[offset:offset + concurrency]))
+        else:
+            batch = []
+            async for chunk in chunks:
+                batch.append(chunk)
+                if len(batch) == concurrency:
+                    await start(batch)
+                    batch = []
+            await start(batch)
+        return len(tasks)
+
+    feeder = asyncio.create_task(feed())
+    getter = None
+    results = {}
+    failed = []
+    completed = 0
+    try:
+        while True:
+            if feeder.done() and total is None:
+                # Αν το feeder απέτυχε (π.χ. χαλασμένο PDF) το σφάλμα ανεβαίνει εδώ
+                total = feeder.result()
+                yield "progress", {"stage": "map", "chunks": total}
+            if feeder.done() and completed == len(tasks):
+                break
+            getter = asyncio.create_task(done.get())
+            await asyncio.wait({getter} if feeder.done() else {getter, feeder},
+                               return_when=asyncio.FIRST_COMPLETED)
+            if not getter.done():
+                getter.cancel()
+                continue
+            index, requirements, hit, error = getter.result()
+            completed += 1
+            if error is not None:
+                logger.error(f"❌ Requirements extraction failed for chunk {index}: {error}")
+                failed.append({"chunk": index, "detail": str(error)})
+                yield "progress", {"stage": "chunk_failed", "chunk": index, "completed": completed, "total": total,
+                                   "detail": str(error)}
+                continue
+            results[index] = requirements
+            yield "progress", {
+                "stage": "chunk_done",
+                "chunk": index,
+                "completed": completed,
+                "total": total,
+                "requirements": len(requirements or []),
+                "cached": hit is not None,
+                "similarity": round(hit.similarity, 4) if hit is not None else None,
+            }
+    finally:
+        if getter is not None:
+            getter.cancel()
+        feeder.cancel()
+        for task in tasks:
+            task.cancel()
+
+    if failed and not results:
+        raise RuntimeError(f"Requirements extraction failed for all {len(failed)} chunks: {failed[0]['detail']}")
+    merged = merge_requirements(results[index] for index in sorted(results))
+    yield "progress", {"stage": "reduce", "requirements": len(merged), "failed_chunks": len(failed)}
+    if failed:
+        # Λείπουν τα requirements των chunks που απέτυχαν
+        yield "partial", {"partial": True, "failed_chunks": failed}
+    yield "result", merged
+
+async def analyze_requirements_chunked(content: str, use_cache: bool = True, chunk_tokens: int = REQUIREMENTS_CHUNK_TOKENS,
+                                       concurrency: int = REQUIREMENTS_MAP_CONCURRENCY):
+    chunks = await split_for_extraction(content, "map_reduce", chunk_tokens)
+    async for event, data in stream_requirements_chunked(chunks, use_cache=use_cache, concurrency=concurrency):
+        if event == "result":
+            return data
+    return []
@@ -49,6 +49,12 @@ class RequirementResponse(RequirementBase):
     class Config:
         from_attributes = True
 
+class RequirementAddResponse(RequirementResponse):
+    created: bool  # False: ίδιο requirement υπήρχε ήδη και επιστρέφεται αυτό
+    duplicate_of: Optional[int] = None
+    possible_duplicate_of: Optional[int] = None  # όμοιο (όχι ίδιο) requirement του project
+    similarity: Optional[float] = None
+
 # Diagram Schemas
 class DiagramBase(BaseModel):
     title: str
@@ -63,6 +69,14 @@ class DiagramResponse(DiagramBase):
     class Config:
         from_attributes = True
 
+class DiagramSummary(BaseModel):
+    # Diagram χωρίς το mermaid_code (light outline)
+    id: int
+    title: str
+    type: str
+    class Config:
+        from_attributes = True
+
 # Team Schemas
 class TeamBase(BaseModel):
     name: str
@@ -113,3 +127,42 @@ class ProjectOutlineResponse(ProjectResponse):
 
     class Config:
         from_attributes = True
+
+class ProjectOutlineLightResponse(ProjectOutlineResponse):
+    diagrams: List[DiagramSummary] = Field(default_factory=list)
+
+
+# Bulk persistence
+class BulkItemResult(BaseModel):
+    index: int  # θέση στο request
+    id: int
+    created: bool  # False: υπήρχε ήδη (ίδιο requirement)
+    duplicate_of: Optional[int] = None
+    possible_duplicate_of: Optional[int] = None
+    similarity: Optional[float] = None
+
+class BulkItemError(BaseModel):
+    index: int
+    error: str
+
+class BulkResult(BaseModel):
+    created: int
+    merged: int = 0
+    items: List[BulkItemResult] = Field(default_factory=list)
+    errors: List[BulkItemError] = Field(default_factory=list)
+
+
+# LLM structured outputs (τα JSON schemas τους περνούν στο `format` του Ollama)
+class RequirementItem(BaseModel):
+    title: str
+    description: str
+    functional: bool
+
+class ExtractedRequirement(RequirementItem):
+    # Near-duplicate άλλου requirement του αποτελέσματος (θέση στη λίστα)· δεν αφαιρείται
+    possible_duplicate_of: Optional[int] = None
+    similarity: Optional[float] = None
+
+class C4DiagramResult(BaseModel):
+    diagram: str  # MermaidJS C4 diagram
+    explanation: str
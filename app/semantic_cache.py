@@ -0,0 +1,271 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.config.config import (
+    LLM_MODEL,
+    EMBED_MODEL,
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_PATH,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+)
+from app.logger import get_logger
+
+logger = get_logger()
+
+
+@dataclass
+class SemanticHit:
+    id: int
+    similarity: float
+    result: object
+    exact: bool  # ίδιο κείμενο (sha256), όχι απλώς παρόμοιο
+
+
+class _Index:
+    # Κανονικοποιημένα vectors ενός (prompt_key, model) σε ένα matrix, για brute-force cosine
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.size = 0
+        # Χωρητικότητα που διπλασιάζεται, ώστε το add να μην αντιγράφει όλο το matrix κάθε φορά
+        self._ids = np.empty(64, dtype=np.int64)
+        self._vectors = np.empty((64, dim), dtype=np.float32)
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[:self.size]
+
+    def add(self, entry_id: int, vector: np.ndarray):
+        if self.size == len(self._ids):
+            self._ids = np.resize(self._ids, self.size * 2)
+            self._vectors = np.concatenate([self._vectors, np.empty_like(self._vectors)])
+        self._ids[self.size] = entry_id
+        self._vectors[self.size] = vector
+        self.size += 1
+
+    def remove(self, entry_ids):
+        keep = ~np.isin(self.ids, list(entry_ids))
+        kept = int(keep.sum())
+        self._ids[:kept] = self.ids[keep]
+        self._vectors[:kept] = self._vectors[:self.size][keep]
+        self.size = kept
+
+    def best(self, vector: np.ndarray) -> tuple[int, float] | None:
+        if not self.size:
+            return None
+        scores = self._vectors[:self.size] @ vector
+        position = int(np.argmax(scores))
+        return int(self._ids[position]), float(scores[position])
+
+
+def _normalize(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cache_namespace(template, llm_model: str = LLM_MODEL) -> str:
+    """
+    Το prompt_key των entries: key και έκδοση (hash του prefix) του template και το
+    LLM που παρήγαγε το αποτέλεσμα. Αλλαγή prompt ή μοντέλου δεν σερβίρει παλιά αποτελέσματα.
+    """
+    return f"{template.key}@{template.version}:{llm_model}"
+
+
+class SemanticCache:
+    """
+    Vector index (SQLite + NumPy brute force) με τα embeddings κειμένων και το
+    αποτέλεσμα του LLM για καθένα. Το `search` επιστρέφει το ίδιο κείμενο (exact) ή το
+    πιο κοντινό με cosine similarity πάνω από το `threshold` (ίδιο prompt_key)· ο caller
+    αποφασίζει αν ένα μη exact hit αρκεί για reuse.
+    Οι μέθοδοι είναι blocking· από async κώδικα χρησιμοποίησε τις `asearch` / `aadd`.
+    """
+
+    def __init__(self, path=SEMANTIC_CACHE_PATH, threshold=SEMANTIC_CACHE_THRESHOLD,
+                 max_entries=SEMANTIC_CACHE_MAX_ENTRIES, model=EMBED_MODEL, enabled=SEMANTIC_CACHE_ENABLED):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.model = model
+        self.enabled = enabled
+        self.hits = 0
+        self.exact_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn: sqlite3.Connection | None = None
+        self._indexes: dict[str, _Index] | None = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS semantic_cache (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    prompt_key TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    embedding BLOB NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hit_count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_semantic_cache_last_access ON semantic_cache (last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_semantic_cache_hash ON semantic_cache (prompt_key, text_hash)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _load(self) -> dict[str, _Index]:
+        # Το index φορτώνεται μία φορά από το SQLite και μετά ενημερώνεται incremental
+        if self._indexes is None:
+            indexes = {}
+            rows = self._connection().execute(
+                "SELECT id, prompt_key, model, dim, embedding FROM semantic_cache ORDER BY id"
+            )
+            for entry_id, prompt_key, model, dim, blob in rows:
+                index = indexes.setdefault(f"{prompt_key}:{model}", _Index(dim))
+                if index.dim == dim:
+                    index.add(entry_id, np.frombuffer(blob, dtype=np.float32))
+            self._indexes = indexes
+            if indexes:
+                logger.info(f"🧭 Semantic cache loaded ({sum(len(i.ids) for i in indexes.values())} entries)")
+        return self._indexes
+
+    def search(self, vector, prompt_key: str, text: str | None = None) -> SemanticHit | None:
+        if not self.enabled:
+            return None
+        vector = _normalize(vector)
+        with self._lock:
+            conn = self._connection()
+            # Το ίδιο κείμενο προηγείται του πιο κοντινού vector (που μπορεί να είναι άλλο entry)
+            row = conn.execute(
+                "SELECT id, result, text_hash FROM semantic_cache WHERE prompt_key = ? AND model = ? AND text_hash = ?"
+                " ORDER BY id DESC LIMIT 1",
+                (prompt_key, self.model, text_hash(text)),
+            ).fetchone() if text is not None else None
+            if row is not None:
+                entry_id, similarity = row[0], 1.0
+            else:
+                index = self._load().get(f"{prompt_key}:{self.model}")
+                match = index.best(vector) if index is not None and index.dim == len(vector) else None
+                if match is None or match[1] < self.threshold:
+                    self.misses += 1
+                    return None
+                entry_id, similarity = match
+                row = conn.execute("SELECT id, result, text_hash FROM semantic_cache WHERE id = ?", (entry_id,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+            conn.execute(
+                "UPDATE semantic_cache SET last_access = ?, hit_count = hit_count + 1 WHERE id = ?",
+                (time.time(), entry_id),
+            )
+            conn.commit()
+        exact = text is not None and row[2] == text_hash(text)
+        self.hits += 1
+        self.exact_hits += exact
+        return SemanticHit(entry_id, similarity, json.loads(row[1]), exact)
+
+    def add(self, vector, prompt_key: str, text: str, result):
+        if not self.enabled:
+            return
+        vector = _normalize(vector)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            indexes = self._load()
+            entry_id = conn.execute(
+                """
+                INSERT INTO semantic_cache (prompt_key, model, text_hash, dim, embedding, result, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (prompt_key, self.model, text_hash(text), len(vector), vector.tobytes(),
+                 json.dumps(result, ensure_ascii=False), now, now),
+            ).lastrowid
+            index = indexes.setdefault(f"{prompt_key}:{self.model}", _Index(len(vector)))
+            if index.dim == len(vector):
+                index.add(entry_id, vector)
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        count = conn.execute("SELECT COUNT(*) FROM semantic_cache").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        # LRU: διαγράφουμε τα λιγότερο πρόσφατα χρησιμοποιημένα
+        victims = [row[0] for row in conn.execute(
+            "SELECT id FROM semantic_cache ORDER BY last_access ASC LIMIT ?", (count - self.max_entries,)
+        )]
+        conn.executemany("DELETE FROM semantic_cache WHERE id = ?", [(entry_id,) for entry_id in victims])
+        for index in self._indexes.values():
+            index.remove(victims)
+        self.evictions += len(victims)
+        logger.info(f"🧹 Semantic cache evicted {len(victims)} entries")
+
+    def clear(self, prompt_key: str | None = None) -> int:
+        with self._lock:
+            conn = self._connection()
+            if prompt_key is None:
+                deleted = conn.execute("DELETE FROM semantic_cache").rowcount
+            else:
+                # Και όλες οι εκδόσεις του (cache_namespace)
+                deleted = conn.execute(
+                    "DELETE FROM semantic_cache WHERE prompt_key = ? OR substr(prompt_key, 1, ?) = ?",
+                    (prompt_key, len(prompt_key) + 1, f"{prompt_key}@"),
+                ).rowcount
+            conn.commit()
+            self._indexes = None
+        return deleted
+
+    def stats(self) -> dict:
+        with self._lock:
+            count = self._connection().execute("SELECT COUNT(*) FROM semantic_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "model": self.model,
+            "threshold": self.threshold,
+            "entries": count,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "exact_hits": self.exact_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._indexes = None
+
+    async def asearch(self, vector, prompt_key: str, text: str | None = None) -> SemanticHit | None:
+        return await asyncio.to_thread(self.search, vector, prompt_key, text)
+
+    async def aadd(self, vector, prompt_key: str, text: str, result):
+        await asyncio.to_thread(self.add, vector, prompt_key, text, result)
+
+
+semantic_cache = SemanticCache()
@@ -0,0 +1,127 @@
+import asyncio
+import time
+from typing import AsyncIterator, Callable, Dict
+
+from app.logger import get_logger
+
+logger = get_logger()
+
+
+class _Flight:
+    def __init__(self, key: str):
+        self.key = key
+        self.fragments: list[str] = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.waiters = 0
+        self.started_at = time.monotonic()
+        self.changed = asyncio.Condition()
+        self.task: asyncio.Task | None = None
+
+
+class SingleFlight:
+    """
+    Coalescing των ίδιων in-flight LLM generations. Το πρώτο request για ένα key
+    ξεκινά το generation· όσα ακολουθούν όσο τρέχει προσκολλώνται σε αυτό και
+    παίρνουν τα ίδια fragments (replay όσων έχουν ήδη παραχθεί + τα νέα).
+    Αν φύγουν όλοι οι waiters, το upstream generation ακυρώνεται.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.max_waiters = 0
+        self.cancelled = 0
+        self.cancelled_seconds = 0.0  # χρόνος generation που διακόπηκε επειδή δεν τον περίμενε κανείς
+        self.cancelled_fragments = 0
+
+    async def _produce(self, flight: _Flight, factory: Callable[[], AsyncIterator[str]]):
+        try:
+            async for fragment in factory():
+                flight.fragments.append(fragment)
+                async with flight.changed:
+                    flight.changed.notify_all()
+        except asyncio.CancelledError:
+            # Το CancelledError αφορά μόνο αυτό το task· όποιος τυχόν περιμένει παίρνει κανονικό σφάλμα
+            flight.error = RuntimeError("LLM generation was cancelled")
+            raise
+        except BaseException as e:
+            flight.error = e
+        finally:
+            flight.done = True
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+            async with flight.changed:
+                flight.changed.notify_all()
+
+    async def stream(self, key: str, factory: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(key)
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(self._produce(flight, factory))
+            self.leaders += 1
+        else:
+            self.followers += 1
+            logger.info(f"🔗 Coalesced LLM request onto in-flight generation ({key[:12]}, {flight.waiters + 1} waiters)")
+
+        flight.waiters += 1
+        self.max_waiters = max(self.max_waiters, flight.waiters)
+        index = 0
+        try:
+            while True:
+                async with flight.changed:
+                    await flight.changed.wait_for(lambda: len(flight.fragments) > index or flight.done)
+                while index < len(flight.fragments):
+                    yield flight.fragments[index]
+                    index += 1
+                if flight.done:
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.done and flight.task is not None:
+                # Κανείς δεν περιμένει πλέον το αποτέλεσμα: κλείνουμε το upstream stream ώστε το Ollama να σταματήσει.
+                # Το key φεύγει αμέσως, ώστε ένα νέο request να μην προσκολληθεί στο flight που ακυρώνεται
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+                age = time.monotonic() - flight.started_at
+                self.cancelled += 1
+                self.cancelled_seconds += age
+                self.cancelled_fragments += len(flight.fragments)
+                logger.info(
+                    f"🛑 Upstream generation cancelled ({key[:12]}, {age:.1f}s, {len(flight.fragments)} fragments)"
+                )
+
+    async def do(self, key: str, factory: Callable[[], AsyncIterator[str]]) -> str:
+        return "".join([fragment async for fragment in self.stream(key, factory)])
+
+    def stats(self) -> dict:
+        requests = self.leaders + self.followers
+        now = time.monotonic()
+        return {
+            "in_flight": len(self._flights),
+            "waiters": sum(f.waiters for f in self._flights.values()),
+            "max_waiters": self.max_waiters,
+            "generations": self.leaders,
+            "coalesced": self.followers,
+            "coalescing_ratio": round(self.followers / requests, 4) if requests else 0.0,
+            "cancelled": self.cancelled,
+            "cancelled_seconds": round(self.cancelled_seconds, 3),
+            "cancelled_fragments": self.cancelled_fragments,
+            "flights": [
+                {
+                    "key": f.key[:12],
+                    "waiters": f.waiters,
+                    "fragments": len(f.fragments),
+                    "age_seconds": round(now - f.started_at, 2),
+                }
+                for f in self._flights.values()
+            ],
+        }
+
+
+llm_flights = SingleFlight()
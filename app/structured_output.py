@@ -0,0 +1,222 @@
+import json
+import time
+import typing
+from functools import lru_cache
+
+from pydantic import TypeAdapter, ValidationError
+
+from app.config.config import LLM_STRUCTURED_OUTPUT, LLM_REPAIR_RETRIES
+from app.logger import get_logger
+from app.ollama_client import call_ollama
+from app.prompt_templates import prompt_registry
+from app.utils.llm_response_utils import extract_json_array_or_object_from_text
+
+logger = get_logger()
+
+# Στο repair στέλνουμε μόνο το άκυρο κομμάτι (και τα σφάλματα), όχι το αρχικό prompt
+REPAIR_TEMPLATE = prompt_registry.register("json.repair", """You fix JSON produced by another model.
+
+The JSON below does not match the required schema. Return ONLY the corrected JSON value.
+Keep the original content and language (e.g. Greek text stays in Greek). Do not add commentary.
+
+""", "Άκυρο JSON fragment → διορθωμένο JSON")
+
+
+@lru_cache(maxsize=None)
+def _adapter(annotation) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def json_schema(annotation) -> dict:
+    """
+    Το JSON schema για το `format` του Ollama, ή None αν το structured output είναι απενεργοποιημένο.
+    """
+    if not LLM_STRUCTURED_OUTPUT:
+        return None
+    return _adapter(annotation).json_schema()
+
+
+def _item_annotation(annotation):
+    # list[Model] → Model, αλλιώς None
+    if typing.get_origin(annotation) is list:
+        return typing.get_args(annotation)[0]
+    return None
+
+
+def _dump(value):
+    return value.model_dump(mode="json") if hasattr(value, "model_dump") else value
+
+
+class ParseStats:
+    """
+    Ανά prompt_key: πόσες απαντήσεις ήταν έγκυρες με την πρώτη, πόσες χρειάστηκαν
+    repair και πόσες απέτυχαν, μαζί με τα repair calls και τον χρόνο τους.
+    """
+
+    def __init__(self):
+        self._stats: dict[str, dict] = {}
+
+    def record(self, prompt_key: str, outcome: str, repair_calls: int = 0, repair_seconds: float = 0.0,
+               dropped_items: int = 0):
+        stats = self._stats.setdefault(prompt_key, {
+            "total": 0, "first_try": 0, "repaired": 0, "failed": 0,
+            "repair_calls": 0, "repair_seconds": 0.0, "dropped_items": 0,
+        })
+        stats["total"] += 1
+        stats[outcome] += 1
+        stats["repair_calls"] += repair_calls
+        stats["repair_seconds"] += repair_seconds
+        stats["dropped_items"] += dropped_items
+
+    def stats(self) -> dict:
+        return {
+            prompt_key: {
+                **stats,
+                "repair_seconds": round(stats["repair_seconds"], 3),
+                "first_try_rate": round(stats["first_try"] / stats["total"], 4),
+                "success_rate": round((stats["first_try"] + stats["repaired"]) / stats["total"], 4),
+            }
+            for prompt_key, stats in self._stats.items()
+        }
+
+
+parse_stats = ParseStats()
+
+
+def _as_list(parsed) -> list:
+    # Π.χ. {"requirements": [...]} ή ένα μεμονωμένο object
+    if isinstance(parsed, dict):
+        lists = [value for value in parsed.values() if isinstance(value, list)]
+        parsed = lists[0] if len(lists) == 1 else [parsed]
+    if not isinstance(parsed, list):
+        parsed = [parsed]
+    return parsed
+
+
+class _Repairer:
+    """
+    Τα repair calls μιας κλήσης του parse_structured: το `max_repairs` είναι budget
+    για όλη την απάντηση, όχι ανά άκυρο fragment.
+    """
+
+    def __init__(self, prompt_key: str, use_cache: bool, max_repairs: int):
+        self.prompt_key = prompt_key
+        self.use_cache = use_cache
+        self.max_repairs = max_repairs
+        self.calls = 0
+        self.seconds = 0.0
+
+    @property
+    def remaining(self) -> int:
+        return self.max_repairs - self.calls
+
+    async def _call(self, annotation, fragment: str, error: str) -> str | None:
+        self.calls += 1
+        started = time.perf_counter()
+        answer = await call_ollama(
+            REPAIR_TEMPLATE.render(f"### Validation errors:\n{error}\n\n### JSON:\n{fragment}"),
+            template=REPAIR_TEMPLATE,
+            use_cache=self.use_cache,
+            format=json_schema(annotation) or "json",
+        )
+        self.seconds += time.perf_counter() - started
+        return answer
+
+    async def repair(self, annotation, fragment: str, error: str):
+        """
+        Στέλνει το fragment με τα σφάλματα validation πίσω στο μοντέλο (με το schema
+        ως `format`) όσο υπάρχει budget. Επιστρέφει το validated αποτέλεσμα ή None.
+        """
+        adapter = _adapter(annotation)
+        while self.remaining > 0:
+            answer = await self._call(annotation, fragment, error)
+            if answer is None:
+                return None
+            try:
+                return adapter.validate_python(extract_json_array_or_object_from_text(answer))
+            except (ValueError, ValidationError) as e:
+                fragment, error = answer, str(e)
+        return None
+
+    async def repair_items(self, item_annotation, invalid: list[tuple[int, object, str]]) -> dict[int, object]:
+        """
+        Όλα τα άκυρα στοιχεία μιας list, ως (θέση, στοιχείο, σφάλμα), σε ένα repair prompt
+        (JSON array, με τα σφάλματα ανά θέση)· όσα μένουν άκυρα ξαναστέλνονται όσο υπάρχει
+        budget. Επιστρέφει τα διορθωμένα στοιχεία ανά αρχική θέση τους.
+        """
+        item_adapter = _adapter(item_annotation)
+        repaired = {}
+        while invalid and self.remaining > 0:
+            errors = "\n".join(f"[{index}] {error}" for index, (_, _, error) in enumerate(invalid))
+            fragment = json.dumps([element for _, element, _ in invalid], ensure_ascii=False)
+            answer = await self._call(list[item_annotation], fragment, errors)
+            if answer is None:
+                break
+            try:
+                elements = _as_list(extract_json_array_or_object_from_text(answer))
+            except ValueError:
+                continue
+            # Το i-οστό στοιχείο της απάντησης διορθώνει το i-οστό άκυρο· όσα λείπουν μένουν άκυρα
+            still_invalid = invalid[len(elements):]
+            for (position, _, _), element in zip(invalid, elements):
+                try:
+                    repaired[position] = item_adapter.validate_python(element)
+                except ValidationError as e:
+                    still_invalid.append((position, element, str(e)))
+            invalid = sorted(still_invalid, key=lambda entry: entry[0])
+        return repaired
+
+
+async def parse_structured(answer: str | None, annotation, prompt_key: str, use_cache: bool = True,
+                           max_repairs: int = LLM_REPAIR_RETRIES, parsed=None):
+    """
+    Κάνει validate την απάντηση του LLM με το `annotation` (π.χ. list[RequirementItem]
+    ή C4DiagramResult) και επιστρέφει plain JSON δεδομένα. Για lists γίνεται validate
+    κάθε στοιχείο χωριστά και τα άκυρα στέλνονται μαζί σε ένα repair prompt (τα
+    διορθωμένα μπαίνουν στην αρχική τους θέση). Το `max_repairs` είναι το σύνολο των
+    repair calls για όλη την απάντηση. Αν είναι ήδη γνωστή η parsed τιμή (π.χ. από
+    το JsonStreamParser) περνά ως `parsed`.
+    Επιστρέφει None αν η απάντηση δεν διορθώθηκε.
+    """
+    repairer = _Repairer(prompt_key, use_cache, max_repairs)
+    item_annotation = _item_annotation(annotation)
+
+    if parsed is None and answer is not None:
+        try:
+            parsed = extract_json_array_or_object_from_text(answer)
+        except ValueError:
+            parsed = None
+
+    if item_annotation is None or parsed is None:
+        result = None
+        if parsed is not None:
+            try:
+                result = _adapter(annotation).validate_python(parsed)
+            except ValidationError as e:
+                result = await repairer.repair(annotation, json.dumps(parsed, ensure_ascii=False), str(e))
+        elif answer:
+            result = await repairer.repair(annotation, answer, "Response is not valid JSON")
+        outcome = "failed" if result is None else ("repaired" if repairer.calls else "first_try")
+        parse_stats.record(prompt_key, outcome, repairer.calls, repairer.seconds)
+        if result is None:
+            logger.warning(f"⚠️ Structured output for {prompt_key} is invalid after {repairer.calls} repairs")
+            return None
+        return [_dump(item) for item in result] if item_annotation is not None else _dump(result)
+
+    item_adapter = _adapter(item_annotation)
+    results, invalid = {}, []
+    for position, element in enumerate(_as_list(parsed)):
+        try:
+            results[position] = item_adapter.validate_python(element)
+        except ValidationError as e:
+            invalid.append((position, element, str(e)))
+    repaired = await repairer.repair_items(item_annotation, invalid) if invalid else {}
+    # Με τη σειρά της απάντησης, όπως και τα `item` events του streaming
+    results.update(repaired)
+    dropped = len(invalid) - len(repaired)
+
+    outcome = "failed" if dropped else ("repaired" if repairer.calls else "first_try")
+    parse_stats.record(prompt_key, outcome, repairer.calls, repairer.seconds, dropped)
+    if dropped:
+        logger.warning(f"⚠️ {dropped} invalid items dropped from {prompt_key} after repair")
+    return [_dump(results[position]) for position in sorted(results)]
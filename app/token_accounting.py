@@ -0,0 +1,132 @@
+import asyncio
+import math
+from dataclasses import dataclass, asdict
+from functools import lru_cache
+
+import tiktoken
+
+from app.logger import get_logger
+
+logger = get_logger()
+
+DEFAULT_MODEL = "deepseek-coder"
+ENCODER_MODEL = "gpt-4"  # fallback tokenizer, δεν έχουμε τον tokenizer του deepseek
+EXPECTED_RESPONSE_RATIO = 0.5
+CHARS_PER_TOKEN = 4  # εκτίμηση όταν ο tokenizer δεν φορτώνεται (π.χ. offline host)
+
+MODEL_COSTS = {
+    "gpt-3.5-turbo": 0.0015,
+    "gpt-4": 0.03,
+    "gpt-4-turbo": 0.01,
+    "deepseek-coder": 0.002,  # hypothetical — adjust as needed
+}
+
+
+@lru_cache(maxsize=None)
+def get_encoder(model_name: str = ENCODER_MODEL):
+    """
+    Το encoder φορτώνεται μία φορά ανά process και ξαναχρησιμοποιείται. Το tiktoken
+    κατεβάζει το BPE αρχείο την πρώτη φορά· αν αυτό δεν γίνεται (offline host χωρίς
+    TIKTOKEN_CACHE_DIR) επιστρέφει None και τα counts εκτιμώνται από τους χαρακτήρες.
+    """
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except Exception as e:
+        logger.warning(f"⚠️ Tokenizer for '{model_name}' unavailable, estimating tokens from characters: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoder = get_encoder()
+    if encoder is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+@dataclass
+class PromptStats:
+    """
+    Token/cost στατιστικά ενός LLM call. Ξεκινά με εκτιμήσεις (tiktoken) και
+    μετά το generation ενημερώνεται με τις πραγματικές μετρήσεις του Ollama.
+    """
+    prompt_key: str
+    model: str
+    prompt_tokens: int
+    expected_response_tokens: int
+    context_limit: int
+    response_tokens: int | None = None
+    total_duration_ms: float | None = None
+    load_duration_ms: float | None = None
+    prompt_eval_duration_ms: float | None = None
+    eval_duration_ms: float | None = None
+    measured: bool = False
+
+    @property
+    def total_tokens(self) -> int:
+        response = self.response_tokens if self.response_tokens is not None else self.expected_response_tokens
+        return self.prompt_tokens + response
+
+    @property
+    def cost_estimate(self) -> float:
+        return (self.prompt_tokens / 1000) * MODEL_COSTS.get(self.model, 0.002)
+
+    @property
+    def fits(self) -> bool:
+        return self.total_tokens <= self.context_limit
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        if not self.response_tokens or not self.eval_duration_ms:
+            return None
+        return self.response_tokens / (self.eval_duration_ms / 1000)
+
+    def apply_ollama_metrics(self, data: dict):
+        """
+        Αντικαθιστά τις εκτιμήσεις με τα prompt_eval_count / eval_count / *_duration
+        του τελικού Ollama response (οι διάρκειες είναι σε nanoseconds).
+        """
+        if data.get("prompt_eval_count") is not None:
+            self.prompt_tokens = data["prompt_eval_count"]
+        if data.get("eval_count") is not None:
+            self.response_tokens = data["eval_count"]
+        for field in ("total_duration", "load_duration", "prompt_eval_duration", "eval_duration"):
+            if data.get(field) is not None:
+                setattr(self, f"{field}_ms", data[field] / 1_000_000)
+        self.measured = self.response_tokens is not None
+
+    def as_dict(self) -> dict:
+        return {
+            **asdict(self),
+            "total_tokens": self.total_tokens,
+            "cost_estimate": self.cost_estimate,
+            "tokens_per_second": self.tokens_per_second,
+        }
+
+
+def measure_prompt(text: str, prompt_key: str = "", model_name: str = DEFAULT_MODEL,
+                   context_limit: int = 4_096, static_tokens: int = 0, static_chars: int = 0) -> PromptStats:
+    """
+    Κάνει encode το prompt μία φορά και επιστρέφει το PromptStats που θα
+    ακολουθήσει το call μέχρι το analytics log. Για prompts από template, τα
+    `static_tokens` του prefix (πρώτοι `static_chars` χαρακτήρες) είναι ήδη
+    γνωστά και γίνεται encode μόνο το υπόλοιπο.
+    """
+    prompt_tokens = static_tokens + count_tokens(text[static_chars:])
+    stats = PromptStats(
+        prompt_key=prompt_key,
+        model=model_name,
+        prompt_tokens=prompt_tokens,
+        expected_response_tokens=int(prompt_tokens * EXPECTED_RESPONSE_RATIO),
+        context_limit=context_limit,
+    )
+    margin = context_limit - stats.total_tokens
+    if margin < 0:
+        logger.warning(f"⚠️ WARNING: Total tokens exceed context window by {abs(margin)} tokens!")
+    else:
+        logger.info(f"✅ OK: Fits within context window (margin: {margin} tokens)")
+    return stats
+
+
+async def measure_prompt_async(text: str, **kwargs) -> PromptStats:
+    # Το tokenization μεγάλων prompts (π.χ. PDF) είναι CPU-bound, οπότε εκτός event loop
+    return await asyncio.to_thread(measure_prompt, text, **kwargs)
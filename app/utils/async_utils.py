@@ -0,0 +1,57 @@
+import asyncio
+import threading
+from typing import AsyncIterator, Callable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_END = object()
+
+
+async def iterate_in_thread(make_iterator: Callable[[], Iterator[T]], maxsize: int = 8) -> AsyncIterator[T]:
+    """
+    Τρέχει έναν blocking generator σε thread και κάνει yield τα items στο event loop.
+    Η bounded ουρά κρατά backpressure· αν ο consumer σταματήσει, ο generator κλείνει.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            try:
+                future.result(timeout=0.5)
+                return True
+            except TimeoutError:
+                future.cancel()
+        return False
+
+    def produce():
+        iterator = make_iterator()
+        try:
+            for item in iterator:
+                if not put(item):
+                    break
+            put(_END)
+        except BaseException as e:
+            put(e)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    producer = loop.run_in_executor(None, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is _END:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+        # Ξεμπλοκάρισμα του producer αν περιμένει χώρο στην ουρά
+        while not queue.empty():
+            queue.get_nowait()
+        await asyncio.shield(producer)
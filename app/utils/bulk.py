@@ -0,0 +1,92 @@
+import json
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+
+from app.config.config import BULK_MAX_ITEMS, BULK_MAX_BYTES
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines")
+
+
+class InvalidItem:
+    # NDJSON γραμμή που δεν είναι JSON· αναφέρεται ως σφάλμα του item, δεν απορρίπτει το batch
+    def __init__(self, error: str):
+        self.error = error
+
+
+async def read_body_limited(request: Request, max_bytes: int = BULK_MAX_BYTES) -> bytes:
+    """
+    Το body του request με όριο μεγέθους: 413 αμέσως από το Content-Length, αλλιώς
+    μέτρηση των bytes καθώς φτάνουν (chunked requests ή λάθος Content-Length).
+    """
+    detail = f"Request body exceeds the limit of {max_bytes} bytes"
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(413, detail=detail)
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise HTTPException(413, detail=detail)
+    return bytes(body)
+
+
+async def read_bulk_items(request: Request, max_items: int = BULK_MAX_ITEMS, max_bytes: int = BULK_MAX_BYTES) -> list:
+    """
+    Τα items ενός bulk request: JSON array ή NDJSON (ένα object ανά γραμμή, με
+    Content-Type application/x-ndjson), έως `max_bytes`.
+    """
+    body = await read_body_limited(request, max_bytes)
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(400, detail="Bulk body must be UTF-8")
+    if content_type in NDJSON_TYPES:
+        items = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                items.append(InvalidItem(f"Invalid JSON: {e}"))
+    else:
+        try:
+            items = json.loads(text) if text.strip() else []
+        except ValueError as e:
+            raise HTTPException(400, detail=f"Invalid JSON: {e}")
+        if not isinstance(items, list):
+            raise HTTPException(400, detail="Expected a JSON array or NDJSON")
+    if len(items) > max_items:
+        raise HTTPException(413, detail=f"Too many items ({len(items)} > {max_items})")
+    return items
+
+
+def validate_items(items: list, schema: type[BaseModel]) -> tuple[list[tuple[int, BaseModel]], list[dict]]:
+    """
+    Validation ανά item: ([(index, model)], [{"index", "error"}]).
+    """
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        if isinstance(item, InvalidItem):
+            errors.append({"index": index, "error": item.error})
+            continue
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            message = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}" for error in e.errors()
+            )
+            errors.append({"index": index, "error": message})
+    return valid, errors
+
+
+def bulk_result(results: list[dict], errors: list[dict]) -> dict:
+    created = sum(1 for result in results if result["created"])
+    return {
+        "created": created,
+        "merged": len(results) - created,
+        "items": sorted(results, key=lambda result: result["index"]),
+        "errors": sorted(errors, key=lambda error: error["index"]),
+    }
@@ -0,0 +1,187 @@
+import re
+import threading
+import unicodedata
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.config.config import (
+    DEDUP_THRESHOLD,
+    DEDUP_FUZZY_MERGE,
+    DEDUP_FUZZY_MERGE_THRESHOLD,
+    DEDUP_NUM_PERM,
+    DEDUP_BANDS,
+    DEDUP_SHINGLE_SIZE,
+)
+
+# Mersenne prime 2^31 - 1: τα a * x + b χωρούν σε uint64 χωρίς overflow
+_PRIME = np.uint64((1 << 31) - 1)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercase χωρίς τόνους/διαλυτικά και σημεία στίξης, ώστε π.χ. "Ανάληψη" και
+    "ΑΝΑΛΗΨΗ" να δίνουν τα ίδια shingles (το casefold κάνει και το ς → σ).
+    """
+    decomposed = unicodedata.normalize("NFD", str(text or ""))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return re.sub(r"[\W_]+", " ", stripped.casefold()).strip()
+
+
+def shingles(text: str, size: int = DEDUP_SHINGLE_SIZE) -> set[int]:
+    # Character n-grams ανά λέξη (με κενά στα άκρα) και ολόκληρες λέξεις, ως crc32 hashes
+    result = set()
+    for word in normalize_text(text).split():
+        result.add(zlib.crc32(word.encode("utf-8")))
+        padded = f" {word} "
+        for start in range(max(len(padded) - size + 1, 1)):
+            result.add(zlib.crc32(padded[start:start + size].encode("utf-8")))
+    return result
+
+
+def jaccard(left: set, right: set) -> float:
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
+
+
+@dataclass
+class DuplicateMatch:
+    key: object
+    similarity: float
+    exact: bool  # ίδιο κείμενο μετά το normalize_text
+    merge: bool  # αν επιτρέπεται να αφαιρεθεί/συγχωνευθεί αυτόματα
+
+
+class NearDuplicateIndex:
+    """
+    Index για διπλότυπα κείμενα. Ίδιο κείμενο μετά το normalize_text είναι duplicate
+    (merge=True). Τα υπόλοιπα περνούν από MinHash/LSH: η υπογραφή (`num_perm` τιμές,
+    vectorized με NumPy) χωρίζεται σε `bands` bands και μόνο κείμενα που μοιράζονται
+    bucket συγκρίνονται με ακριβές Jaccard. Fuzzy match >= threshold είναι μόνο
+    "possible duplicate": το Jaccard των shingles δεν ξεχωρίζει άρνηση ("δεν μπορεί"),
+    αριθμούς ή αντίθετες έννοιες, οπότε merge γίνεται μόνο αν ενεργοποιηθεί το
+    fuzzy_merge και η ομοιότητα φτάνει το fuzzy_merge_threshold.
+    """
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, num_perm: int = DEDUP_NUM_PERM,
+                 bands: int = DEDUP_BANDS, seed: int = 1, fuzzy_merge: bool = DEDUP_FUZZY_MERGE,
+                 fuzzy_merge_threshold: float = DEDUP_FUZZY_MERGE_THRESHOLD):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.fuzzy_merge = fuzzy_merge
+        self.fuzzy_merge_threshold = fuzzy_merge_threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+        self._buckets: list[dict[bytes, list]] = [defaultdict(list) for _ in range(bands)]
+        self._shingles: dict = {}
+        self._exact: dict[str, object] = {}
+        self._normalized: dict = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._shingles)
+
+    def _signature(self, shingle_set: set[int]) -> np.ndarray:
+        if not shingle_set:
+            return np.full(len(self._a), _PRIME, dtype=np.uint64)
+        values = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set)) % _PRIME
+        return ((self._a[:, None] * values[None, :] + self._b[:, None]) % _PRIME).min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def find(self, text: str) -> tuple[object, float] | None:
+        """
+        Το key του πιο όμοιου κειμένου με Jaccard >= threshold και η ομοιότητα, ή None.
+        """
+        with self._lock:
+            return self._find(shingles(text))
+
+    def _find(self, shingle_set: set[int]):
+        signature = self._signature(shingle_set)
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        best = None
+        for key in candidates:
+            similarity = jaccard(shingle_set, self._shingles[key])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+    def match(self, text: str) -> DuplicateMatch | None:
+        normalized, shingle_set = normalize_text(text), shingles(text)
+        with self._lock:
+            return self._match(normalized, shingle_set)
+
+    def _match(self, normalized: str, shingle_set: set[int]) -> DuplicateMatch | None:
+        key = self._exact.get(normalized)
+        if key is not None:
+            return DuplicateMatch(key, 1.0, exact=True, merge=True)
+        best = self._find(shingle_set)
+        if best is None:
+            return None
+        merge = self.fuzzy_merge and best[1] >= self.fuzzy_merge_threshold
+        return DuplicateMatch(best[0], best[1], exact=False, merge=merge)
+
+    def add(self, key, text: str):
+        normalized, shingle_set = normalize_text(text), shingles(text)
+        with self._lock:
+            self._add(key, normalized, shingle_set)
+
+    def _add(self, key, normalized: str, shingle_set: set[int]):
+        if key in self._shingles:
+            self._remove(key)
+        self._shingles[key] = shingle_set
+        self._normalized[key] = normalized
+        self._exact.setdefault(normalized, key)
+        for band, band_key in self._band_keys(self._signature(shingle_set)):
+            self._buckets[band][band_key].append(key)
+
+    def add_if_new(self, key, text: str) -> DuplicateMatch | None:
+        """
+        Προσθέτει το κείμενο εκτός αν είναι duplicate που επιτρέπεται να συγχωνευθεί
+        (match.merge)· επιστρέφει το match, ώστε ο caller να ξέρει και για τα possible
+        duplicates (που προστίθενται κανονικά).
+        """
+        normalized, shingle_set = normalize_text(text), shingles(text)
+        with self._lock:
+            match = self._match(normalized, shingle_set)
+            if match is None or not match.merge:
+                self._add(key, normalized, shingle_set)
+            return match
+
+    def remove(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        shingle_set = self._shingles.pop(key, None)
+        if shingle_set is None:
+            return
+        normalized = self._normalized.pop(key)
+        if self._exact.get(normalized) == key:
+            del self._exact[normalized]
+            # Άλλο key με το ίδιο κείμενο (αν υπάρχει) γίνεται ο εκπρόσωπος
+            for other, other_normalized in self._normalized.items():
+                if other_normalized == normalized:
+                    self._exact[normalized] = other
+                    break
+        for band, band_key in self._band_keys(self._signature(shingle_set)):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is not None and key in bucket:
+                bucket.remove(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+
+def requirement_text(requirement: dict) -> str:
+    return f"{requirement.get('title') or ''} {requirement.get('description') or ''}"
@@ -0,0 +1,188 @@
+import json
+import re
+
+_DECODER = json.JSONDecoder()
+_OPENERS = {"[": "]", "{": "}"}
+# Μετά το "[" ενός πραγματικού JSON array: objects, arrays ή strings. Αριθμοί και
+# literals μένουν έξω, ώστε π.χ. το "[2]" σε "δες την ενότητα [2]" να μη θεωρηθεί η τιμή.
+_ARRAY_VALUE_START = set('{["')
+_JSON_FENCE = "```json"
+_JSON_FENCE_RE = re.compile(r"```json\s*(.*?)```", re.IGNORECASE | re.DOTALL)
+
+
+def extract_json_value(text: str, start: int = 0):
+    """
+    Βρίσκει την πρώτη έγκυρη JSON τιμή (array ή object) στο κείμενο, αγνοώντας
+    prose και code fences. Για κάθε υποψήφιο "[" / "{" το raw_decode κάνει το
+    bracket matching (με σωστό χειρισμό των strings), οπότε nested JSON δεν κόβεται.
+    """
+    index = start
+    while True:
+        candidates = [position for position in (text.find("[", index), text.find("{", index)) if position != -1]
+        if not candidates:
+            raise ValueError("No valid JSON array or object found in LLM response")
+        index = min(candidates)
+        try:
+            value, _ = _DECODER.raw_decode(text, index)
+            return value
+        except json.JSONDecodeError:
+            index += 1
+
+
+def _fenced_json_value(text: str):
+    """Η JSON τιμή του πρώτου κλειστού ```json fence που περιέχει έγκυρο JSON, αλλιώς None."""
+    for match in _JSON_FENCE_RE.finditer(text):
+        try:
+            return extract_json_value(match.group(1))
+        except ValueError:
+            continue
+    return None
+
+
+class JsonStreamParser:
+    """
+    Incremental parser για LLM output που έρχεται σε fragments. Προσπερνά prose και
+    fences μέχρι την αρχή της πρώτης top-level JSON τιμής και, αν αυτή είναι array,
+    επιστρέφει κάθε στοιχείο του από το `feed` μόλις κλείσει. Ένα "[" μετράει ως αρχή
+    array μόνο αν ακολουθεί "{", "[" ή '"'· μέσα σε ```json fence δεκτή είναι κάθε τιμή.
+
+        parser = JsonStreamParser()
+        for fragment in fragments:
+            for item in parser.feed(fragment):
+                ...
+        value = parser.result()
+    """
+
+    def __init__(self):
+        self.done = False
+        self.items: list = []
+        self.errors = 0  # στοιχεία που έκλεισαν αλλά δεν ήταν έγκυρο JSON
+        self._text: list[str] = []  # όλο το output, για το fallback του result()
+        self._started = False
+        self._prose: list[str] = []  # το κείμενο πριν την τιμή
+        self._fenced = False  # η τιμή ξεκίνησε μέσα σε ```json fence
+        self._pending_array = False  # είδαμε "[" και περιμένουμε τον επόμενο χαρακτήρα
+        self._is_array = False
+        self._value: list[str] = []  # η top-level τιμή μέχρι στιγμής
+        self._element: list[str] = []  # το τρέχον στοιχείο του array
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._text)
+
+    def feed(self, fragment: str) -> list:
+        self._text.append(fragment)
+        completed = []
+        for char in fragment:
+            if self.done:
+                break
+            if not self._started:
+                self._scan(char)
+                continue
+            self._value.append(char)
+            element = self._consume(char)
+            if element is not None:
+                completed.extend(self._finish_element(element))
+        return completed
+
+    def _scan(self, char: str):
+        # Πριν την αρχή της τιμής: prose, fences κ.λπ.
+        self._prose.append(char)
+        if self._pending_array:
+            if char.isspace():
+                return
+            self._pending_array = False
+            if char in _ARRAY_VALUE_START or self._in_fence():
+                self._start("[")
+                self._value.append(char)
+                element = self._consume(char)
+                if element is not None:
+                    self._finish_element(element)
+                return
+        if char == "{":
+            self._start("{")
+        elif char == "[":
+            self._pending_array = True
+
+    def _in_fence(self) -> bool:
+        prose = "".join(self._prose).lower()
+        opened = prose.rfind(_JSON_FENCE)
+        return opened != -1 and opened == prose.rfind("```")
+
+    def _start(self, opener: str):
+        self._started = True
+        self._fenced = self._in_fence()
+        self._is_array = opener == "["
+        self._stack = [_OPENERS[opener]]
+        self._value = [opener]
+
+    def _consume(self, char: str):
+        """
+        Ενημερώνει την κατάσταση για έναν χαρακτήρα της top-level τιμής. Επιστρέφει
+        το κείμενο ενός στοιχείου του array όταν αυτό ολοκληρωθεί.
+        """
+        if self._in_string:
+            self._element.append(char)
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+            return None
+
+        if char == '"':
+            self._in_string = True
+        elif char in _OPENERS:
+            self._stack.append(_OPENERS[char])
+        elif char == self._stack[-1]:
+            self._stack.pop()
+            if not self._stack:
+                # Το "]" του array κλείνει και το τελευταίο scalar στοιχείο (αν υπάρχει)
+                self.done = True
+                return self._take_element()
+            if len(self._stack) == 1:
+                self._element.append(char)
+                return self._take_element()
+        elif char == "," and len(self._stack) == 1:
+            return self._take_element()
+        self._element.append(char)
+        return None
+
+    def _take_element(self):
+        element, self._element = "".join(self._element), []
+        return element if self._is_array else None
+
+    def _finish_element(self, element: str) -> list:
+        element = element.strip()
+        if not element:
+            return []
+        try:
+            item = json.loads(element)
+        except json.JSONDecodeError:
+            self.errors += 1
+            return []
+        self.items.append(item)
+        return [item]
+
+    def result(self):
+        """
+        Η πλήρης τιμή. Αν υπάρχει ```json fence προτιμάται η τιμή του. Αν το stream
+        κόπηκε μέσα σε array, επιστρέφονται τα στοιχεία που είχαν ήδη κλείσει· αλλιώς
+        γίνεται fallback σε extract_json_value πάνω σε όλο το output.
+        """
+        text = self.text
+        fenced = None if self._fenced else _fenced_json_value(text)
+        if self.done and fenced is None:
+            try:
+                return json.loads("".join(self._value))
+            except json.JSONDecodeError:
+                pass
+        if fenced is not None:
+            return fenced
+        if self._started and self._is_array and not self.done and self.items:
+            return list(self.items)
+        return extract_json_value(text)
@@ -1,5 +1,6 @@
 import re
 import json
+from app.utils.json_stream import extract_json_value
 
 def safe_extract_json(response_text):
     try:
@@ -22,25 +23,13 @@ def extract_json_array_or_object_from_text(text):
     Extracts either a JSON array or object from a code block (```json ... ```) or from the text.
     Returns the parsed JSON (list or dict).
     """
-    # Try to extract from code block first
-    matches = re.findall(r"```json\s*([\s\S]*?)\s*```", text)
-    if matches:
-        candidate = matches[0].strip()
-        try:
-            return json.loads(candidate)
-        except Exception:
-            pass
-    # Fallback: search for first array or object in the text
-    array_match = re.search(r'(\[.*?\])', text, re.DOTALL)
-    if array_match:
-        try:
-            return json.loads(array_match.group(1))
-        except Exception:
-            pass
-    object_match = re.search(r'(\{.*?\})', text, re.DOTALL)
-    if object_match:
+    if not text:
+        raise ValueError("No valid JSON array or object found in LLM response")
+    # Πρώτα μέσα στο ```json block (αν υπάρχει), μετά σε όλο το κείμενο
+    fence = text.find("```json")
+    if fence != -1:
         try:
-            return json.loads(object_match.group(1))
-        except Exception:
+            return extract_json_value(text, fence)
+        except ValueError:
             pass
-    raise ValueError("No valid JSON array or object found in LLM response")        
\ No newline at end of file
+    return extract_json_value(text)
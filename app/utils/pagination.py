@@ -0,0 +1,141 @@
+import base64
+import binascii
+import enum
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import List
+
+from fastapi import HTTPException, Query, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import DateTime, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.config.config import PAGE_SIZE_DEFAULT, PAGE_SIZE_MAX
+
+
+@dataclass(frozen=True)
+class ListSpec:
+    """
+    Ένα list endpoint: το model, τα πεδία που επιτρέπονται στο `fields=` (με τη σειρά
+    του response schema) και οι στήλες του keyset (μοναδικός συνδυασμός, π.χ. ("created_at", "id")).
+    """
+    model: type
+    fields: tuple[str, ...]
+    order: tuple[str, ...] = ("id",)
+
+
+@dataclass
+class PageRequest:
+    cursor: str | None = None
+    limit: int = PAGE_SIZE_DEFAULT
+    fields: str | None = None
+
+
+def page_params(
+    cursor: str | None = Query(None, description="X-Next-Cursor της προηγούμενης σελίδας"),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    fields: str | None = Query(None, description="Comma-separated πεδία, π.χ. id,title,type"),
+) -> PageRequest:
+    return PageRequest(cursor=cursor, limit=limit, fields=fields)
+
+
+def parse_fields(spec: ListSpec, fields: str | None) -> list[str]:
+    if not fields:
+        return list(spec.fields)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in spec.fields]
+    if unknown:
+        raise HTTPException(400, detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(spec.fields)}")
+    # Το id επιστρέφεται πάντα, για να μπορεί ο client να αναφερθεί στο row
+    return ["id", *(field for field in requested if field != "id")]
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(spec: ListSpec, cursor: str) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(spec.order):
+            raise ValueError("cursor does not match the list ordering")
+        return [
+            datetime.fromisoformat(value) if isinstance(getattr(spec.model, column).type, DateTime) else value
+            for column, value in zip(spec.order, values)
+        ]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(400, detail="Invalid cursor")
+
+
+def fetch_page(db: Session, spec: ListSpec, page: PageRequest, filters=()) -> tuple[list[dict], str | None]:
+    """
+    Μία σελίδα με keyset pagination: WHERE (order columns) > cursor ORDER BY ... LIMIT n + 1,
+    ώστε το κόστος να μην εξαρτάται από το πόσο βαθιά είναι η σελίδα. Επιλέγονται μόνο
+    οι στήλες του `fields` (και του keyset), άρα μεγάλα κείμενα που δεν ζητήθηκαν δεν
+    διαβάζονται καθόλου. Επιστρέφει (items, next_cursor).
+    """
+    fields = parse_fields(spec, page.fields)
+    order_columns = [getattr(spec.model, column) for column in spec.order]
+    selected = list(dict.fromkeys([*fields, *spec.order]))
+    statement = select(*(getattr(spec.model, column) for column in selected)).where(*filters)
+    if page.cursor:
+        values = decode_cursor(spec, page.cursor)
+        if len(order_columns) == 1:
+            statement = statement.where(order_columns[0] > values[0])
+        else:
+            statement = statement.where(tuple_(*order_columns) > tuple_(*values))
+    rows = db.execute(statement.order_by(*order_columns).limit(page.limit + 1)).mappings().all()
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        next_cursor = encode_cursor([rows[-1][column] for column in spec.order])
+    return [{field: row[field] for field in fields} for row in rows], next_cursor
+
+
+def page_responses(schema: type[BaseModel]) -> dict:
+    """
+    Το `responses` ενός list endpoint για το OpenAPI. Τα list endpoints δηλώνουν
+    response_model=None, γιατί με `fields=` κάθε item έχει μόνο τα ζητούμενα πεδία του schema.
+    """
+    return {
+        200: {
+            "model": List[schema],
+            "description": "Items του schema, μόνο με τα πεδία του `fields=` (και πάντα το id)",
+            "headers": {
+                "X-Next-Cursor": {"description": "Cursor της επόμενης σελίδας (λείπει στην τελευταία)",
+                                  "schema": {"type": "string"}},
+                "Link": {"description": 'URL της επόμενης σελίδας, rel="next"', "schema": {"type": "string"}},
+            },
+        }
+    }
+
+
+@lru_cache(maxsize=None)
+def _field_adapter(schema: type[BaseModel], field: str) -> TypeAdapter:
+    return TypeAdapter(schema.model_fields[field].annotation)
+
+
+def _serialize(schema: type[BaseModel], field: str, value):
+    adapter = _field_adapter(schema, field)
+    # Τα enums των models έχουν τα ίδια values με τα enums των schemas
+    if isinstance(value, enum.Enum):
+        value = value.value
+    return adapter.dump_python(adapter.validate_python(value), mode="json")
+
+
+def page_response(request: Request, schema: type[BaseModel], items: list[dict],
+                  next_cursor: str | None) -> JSONResponse:
+    """
+    Η σελίδα ως JSON: κάθε πεδίο περνά από τον τύπο του στο `schema` (όπως θα έκανε το
+    response_model), χωρίς να απαιτούνται τα πεδία που δεν ζητήθηκαν στο `fields=`.
+    """
+    headers = {}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    content = [{field: _serialize(schema, field, value) for field, value in item.items()} for item in items]
+    return JSONResponse(content, headers=headers)
@@ -1,5 +1,17 @@
 import fitz  # PyMuPDF
+import math
+import multiprocessing
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from app.token_accounting import count_tokens
+from app.utils.async_utils import iterate_in_thread
+from app.config.config import PDF_EXTRACT_WORKERS, PDF_PARALLEL_MIN_PAGES, PDF_PAGES_PER_TASK
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?]) +')
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
 
 def clean_text(text):
     # Αφαιρούμε control chars, null bytes, περίεργα σύμβολα
@@ -9,7 +21,7 @@ def clean_text(text):
     return text.strip()
 
 def split_into_chunks(text, max_length=1000):
-    sentences = re.split(r'(?<=[.!?]) +', text)
+    sentences = SENTENCE_BOUNDARY.split(text)
     chunks, current = [], ""
     for sentence in sentences:
         if len(current) + len(sentence) <= max_length:
@@ -22,14 +34,124 @@ def split_into_chunks(text, max_length=1000):
         chunks.append(current.strip())
     return chunks
 
-def process_pdf(pdf_path, max_chunk_length=1000):
-    doc = fitz.open(pdf_path)
-    full_text = ""
-    for page in doc:
-        full_text += page.get_text()
+def _chunk_sentences(sentences, max_tokens):
+    # Κάθε πρόταση γίνεται encode μία φορά· ένα chunk βγαίνει μόλις γεμίσει
+    current, current_tokens = [], 0
+    for sentence in sentences:
+        sentence_tokens = count_tokens(sentence)
+        if current and current_tokens + sentence_tokens > max_tokens:
+            yield " ".join(current).strip()
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += sentence_tokens
+    if current and " ".join(current).strip():
+        yield " ".join(current).strip()
+
+def split_into_token_chunks(text, max_tokens=1000):
+    """
+    Όπως το split_into_chunks, αλλά το όριο είναι σε tokens (ίδιο encoder με το token accounting).
+    """
+    return [chunk for chunk in _chunk_sentences(SENTENCE_BOUNDARY.split(text), max_tokens) if chunk]
+
+def _iter_sentences(pages):
+    # Η τελευταία (πιθανώς μισή) πρόταση κάθε σελίδας συνεχίζεται στην επόμενη
+    carry = ""
+    for page_text in pages:
+        cleaned = clean_text(page_text)
+        if not cleaned:
+            continue
+        sentences = SENTENCE_BOUNDARY.split(f"{carry} {cleaned}".strip())
+        carry = sentences.pop()
+        yield from (sentence for sentence in sentences if sentence)
+    if carry:
+        yield carry
+
+def iter_text_chunks(pages, max_tokens=1000):
+    """
+    Streaming εκδοχή του clean_text + split_into_token_chunks: καταναλώνει τις σελίδες
+    καθώς εξάγονται και κάνει yield κάθε chunk μόλις συμπληρωθεί.
+    """
+    yield from _chunk_sentences(_iter_sentences(pages), max_tokens)
+
+def _open(source):
+    # source: path ή bytes-like (π.χ. upload στη μνήμη)
+    if isinstance(source, str):
+        return fitz.open(source)
+    return fitz.open(stream=source, filetype="pdf")
+
+def _extract_page_range(source, start, stop):
+    # Τρέχει σε worker process
+    doc = _open(source)
+    try:
+        return [doc[index].get_text() for index in range(start, stop)]
+    finally:
+        doc.close()
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: ασφαλές μέσα σε process που έχει ήδη threads (event loop, analytics sink)
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+def shutdown_pdf_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+def iter_pdf_pages(source, workers=PDF_EXTRACT_WORKERS):
+    """
+    Generator με το κείμενο κάθε σελίδας, με τη σειρά του εγγράφου. Μεγάλα PDF
+    μοιράζονται σε page ranges σε process pool· οι σελίδες βγαίνουν μόλις
+    ολοκληρωθεί το αντίστοιχο range, ώστε το chunking να ξεκινά νωρίτερα.
+    """
+    doc = _open(source)
+    page_count = doc.page_count
+    if workers <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+        try:
+            for page in doc:
+                yield page.get_text()
+        finally:
+            doc.close()
+        return
     doc.close()
 
-    cleaned_text = clean_text(full_text)
+    if isinstance(source, str):
+        pages_per_task = PDF_PAGES_PER_TASK
+    else:
+        # Τα bytes γίνονται pickle σε κάθε task, οπότε ένα range ανά worker
+        pages_per_task = math.ceil(page_count / workers)
+    pool = _get_pool()
+    futures = [
+        pool.submit(_extract_page_range, source, start, min(start + pages_per_task, page_count))
+        for start in range(0, page_count, pages_per_task)
+    ]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+def extract_pdf_text(source):
+    return clean_text(" ".join(iter_pdf_pages(source)))
+
+async def aiter_pdf_chunks(source, max_tokens=1000):
+    """
+    Async iterator με τα token-bounded chunks ενός PDF· η εξαγωγή και το chunking
+    τρέχουν εκτός event loop.
+    """
+    async for chunk in iterate_in_thread(lambda: iter_text_chunks(iter_pdf_pages(source), max_tokens)):
+        yield chunk
+
+def process_pdf(pdf_path, max_chunk_length=1000):
+    cleaned_text = extract_pdf_text(pdf_path)
     if not cleaned_text:
         return []
     chunks = split_into_chunks(cleaned_text, max_chunk_length)
@@ -0,0 +1,75 @@
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Tuple
+
+from fastapi.responses import StreamingResponse
+
+from app.config.config import SSE_HEARTBEAT_INTERVAL, SSE_QUEUE_SIZE
+from app.logger import get_logger
+
+logger = get_logger()
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # nginx: μην κάνεις buffer το stream
+}
+
+_DONE = object()
+
+
+def format_sse(event: str, data: Any) -> str:
+    """
+    Serialize ένα event στο text/event-stream format.
+    """
+    payload = data if isinstance(data, str) else json.dumps(data, ensure_ascii=False)
+    lines = "".join(f"data: {line}\n" for line in payload.split("\n"))
+    return f"event: {event}\n{lines}\n"
+
+
+async def with_heartbeat(
+    events: AsyncIterator[Tuple[str, Any]],
+    interval: float = SSE_HEARTBEAT_INTERVAL,
+) -> AsyncIterator[str]:
+    """
+    Μετατρέπει (event, data) tuples σε SSE frames και στέλνει heartbeat όταν το
+    upstream δεν έχει βγάλει τίποτα για `interval` δευτερόλεπτα.
+    Σφάλματα του upstream γίνονται `error` event αντί να κόψουν το connection.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+
+    async def pump():
+        try:
+            async for item in events:
+                await queue.put(item)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ SSE stream failed: {e}")
+            await queue.put(("error", {"detail": str(e)}))
+        finally:
+            await queue.put(_DONE)
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=interval)
+            except asyncio.TimeoutError:
+                yield format_sse("heartbeat", {"ts": time.time()})
+                continue
+            if item is _DONE:
+                break
+            event, data = item
+            yield format_sse(event, data)
+    finally:
+        task.cancel()
+
+
+def sse_response(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    return StreamingResponse(
+        with_heartbeat(events),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
@@ -0,0 +1,138 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+
+from app.config.config import UPLOAD_CHUNK_SIZE, UPLOAD_MAX_BYTES, UPLOAD_SPOOL_THRESHOLD, UPLOAD_REQUEST_MAX_BYTES
+from app.exceptions.custom_exceptions import UploadTooLargeError
+from app.logger import get_logger
+
+logger = get_logger()
+
+
+@dataclass
+class IngestedUpload:
+    """
+    Ένα upload έτοιμο για επεξεργασία: `source` είναι είτε τα bytes στη μνήμη
+    είτε το path ενός spooled αρχείου (μόνο για μεγάλα uploads).
+    """
+    filename: str
+    sha256: str
+    size: int
+    source: bytearray | str
+
+    @property
+    def spooled(self) -> bool:
+        return isinstance(self.source, str)
+
+    def cleanup(self):
+        if self.spooled and os.path.exists(self.source):
+            os.remove(self.source)
+        self.source = bytearray()
+
+
+async def ingest_upload(upload_file: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES,
+                        spool_threshold: int = UPLOAD_SPOOL_THRESHOLD,
+                        chunk_size: int = UPLOAD_CHUNK_SIZE) -> IngestedUpload:
+    """
+    Διαβάζει το upload σε chunks σταθερού μεγέθους και υπολογίζει το sha256 καθώς
+    διαβάζεται. Μέχρι το `spool_threshold` τα bytes μένουν στη μνήμη· πάνω από αυτό
+    γράφονται σε temp αρχείο. Uploads πάνω από `max_bytes` απορρίπτονται χωρίς να
+    διαβαστούν ολόκληρα.
+    """
+    filename = upload_file.filename or "upload.pdf"
+    if upload_file.size is not None and upload_file.size > max_bytes:
+        raise UploadTooLargeError(f"{filename} exceeds the upload limit of {max_bytes} bytes")
+
+    digest = hashlib.sha256()
+    buffer = bytearray()
+    spool = None
+    size = 0
+    try:
+        while chunk := await upload_file.read(chunk_size):
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(f"{filename} exceeds the upload limit of {max_bytes} bytes")
+            digest.update(chunk)
+            if spool is None and size > spool_threshold:
+                spool = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
+                spool.write(buffer)
+                buffer = bytearray()
+            if spool is not None:
+                spool.write(chunk)
+            else:
+                buffer += chunk
+    except BaseException:
+        if spool is not None:
+            spool.close()
+            os.remove(spool.name)
+        raise
+
+    if spool is not None:
+        spool.close()
+        logger.info(f"📄 Upload {filename} ({size} bytes) spooled to disk")
+        return IngestedUpload(filename, digest.hexdigest(), size, spool.name)
+    return IngestedUpload(filename, digest.hexdigest(), size, buffer)
+
+
+async def ingest_uploads(files: list[UploadFile], **kwargs):
+    """
+    Ingest όλων των uploads ενός request. Επιστρέφει (uploads, cleanup)· αν κάποιο
+    απορριφθεί, όσα έχουν ήδη γίνει ingest καθαρίζονται.
+    """
+    uploads: list[IngestedUpload] = []
+
+    def cleanup():
+        for upload in uploads:
+            upload.cleanup()
+
+    try:
+        for upload_file in files:
+            uploads.append(await ingest_upload(upload_file, **kwargs))
+    except BaseException:
+        cleanup()
+        raise
+    return uploads, cleanup
+
+
+class UploadLimitMiddleware:
+    """
+    Όριο για multipart uploads πριν το Starlette κάνει parse (και spool) το body:
+    413 αμέσως από το Content-Length, και μέτρηση των bytes καθώς φτάνουν για
+    chunked requests ή λάθος Content-Length. Το όριο ανά αρχείο (UPLOAD_MAX_BYTES)
+    ελέγχεται μετά, στο ingest_upload.
+    """
+
+    def __init__(self, app, max_bytes: int = UPLOAD_REQUEST_MAX_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").lower().startswith("multipart/"):
+            return await self.app(scope, receive, send)
+        detail = f"Upload exceeds the request limit of {self.max_bytes} bytes"
+        content_length = headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > self.max_bytes:
+            logger.warning(f"⚠️ Upload rejected before reading the body ({content_length} bytes)")
+            return await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+
+        received = 0
+
+        async def receive_limited():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Το HTTPException περνά αυτούσιο από το body parsing του FastAPI
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, receive_limited, send)
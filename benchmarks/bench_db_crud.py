@@ -0,0 +1,175 @@
+"""
+Benchmark concurrent CRUD throughput: το παλιό database setup (sync engine με
+echo=True, χωρίς pragmas, sync sessions στο threadpool όπως τα sync endpoints)
+απέναντι στο νέο (async engine από το create_async_db_engine, WAL/pragmas και
+single-writer lock).
+
+Κάθε operation μιμείται ένα endpoint: με πιθανότητα --write-ratio ένα insert
+task (όπως το POST /tasks/create), αλλιώς ένα read (project + tasks του).
+Κάθε setup τρέχει σε δικό του προσωρινό SQLite αρχείο.
+
+Εκτέλεση από το root του repo:
+    python -m benchmarks.bench_db_crud --concurrency 1 8 32 --operations 2000 --write-ratio 0.3
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+from anyio import to_thread
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import models  # noqa: E402
+from app.database import create_db_engine, create_async_db_engine, write_transaction  # noqa: E402
+
+PROJECTS = 20
+SETUPS = ("legacy", "async")
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def seed(engine):
+    models.Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add_all(models.Project(id=f"p{n}", name=f"Project {n}") for n in range(PROJECTS))
+        db.commit()
+
+
+class LegacySetup:
+    # Όπως το app/database.py πριν: echo=True και ένα sync Session ανά request στο threadpool
+    def __init__(self, path: str):
+        self.engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False}, echo=True)
+        self.sessions = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        # Το echo γράφει στο stdout· εδώ πάει σε αρχείο για να μένουν καθαρά τα αποτελέσματα
+        self.echo_log = open(f"{path}.echo.log", "w")
+        for handler in logging.getLogger("sqlalchemy.engine.Engine").handlers:
+            if isinstance(handler, logging.StreamHandler):
+                handler.setStream(self.echo_log)
+        seed(self.engine)
+
+    def _write(self, project_id: str, n: int):
+        with self.sessions() as db:
+            if db.query(models.Project).filter(models.Project.id == project_id).first() is None:
+                raise LookupError(project_id)
+            db.add(models.Task(project_id=project_id, description=f"task {n}"))
+            db.commit()
+
+    def _read(self, project_id: str):
+        with self.sessions() as db:
+            db.query(models.Project).filter(models.Project.id == project_id).first()
+            return db.query(models.Task).filter(models.Task.project_id == project_id).limit(50).all()
+
+    async def write(self, project_id: str, n: int):
+        await to_thread.run_sync(self._write, project_id, n)
+
+    async def read(self, project_id: str):
+        await to_thread.run_sync(self._read, project_id)
+
+    async def close(self):
+        self.engine.dispose()
+        self.echo_log.close()
+
+
+class AsyncSetup:
+    def __init__(self, path: str):
+        url = f"sqlite:///{path}"
+        seed(create_db_engine(url, echo=False))
+        self.engine = create_async_db_engine(url, echo=False)
+        self.sessions = async_sessionmaker(self.engine, autoflush=False, expire_on_commit=False)
+
+    async def write(self, project_id: str, n: int):
+        async with self.sessions() as db:
+            if await db.get(models.Project, project_id) is None:
+                raise LookupError(project_id)
+            async with write_transaction(db):
+                db.add(models.Task(project_id=project_id, description=f"task {n}"))
+
+    async def read(self, project_id: str):
+        async with self.sessions() as db:
+            await db.get(models.Project, project_id)
+            await db.scalars(select(models.Task).where(models.Task.project_id == project_id).limit(50))
+
+    async def close(self):
+        await self.engine.dispose()
+
+
+async def run_level(setup, concurrency: int, operations: int, write_ratio: float, rng: random.Random) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    reads, writes, errors = [], [], 0
+    plan = [(rng.random() < write_ratio, f"p{rng.randrange(PROJECTS)}") for _ in range(operations)]
+
+    async def one(n, is_write, project_id):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if is_write:
+                    await setup.write(project_id, n)
+                else:
+                    await setup.read(project_id)
+            except Exception:
+                errors += 1
+                return
+            (writes if is_write else reads).append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(n, is_write, project_id) for n, (is_write, project_id) in enumerate(plan)))
+    elapsed = time.perf_counter() - started
+    done = len(reads) + len(writes)
+    return {
+        "concurrency": concurrency,
+        "operations": operations,
+        "errors": errors,
+        "ops_per_second": round(done / elapsed, 1) if elapsed else 0.0,
+        "read_p50_ms": round(percentile(reads, 0.50) * 1000, 2),
+        "read_p95_ms": round(percentile(reads, 0.95) * 1000, 2),
+        "write_p50_ms": round(percentile(writes, 0.50) * 1000, 2),
+        "write_p95_ms": round(percentile(writes, 0.95) * 1000, 2),
+    }
+
+
+async def run(args):
+    for name in args.setups:
+        with tempfile.TemporaryDirectory() as workdir:
+            setup = (LegacySetup if name == "legacy" else AsyncSetup)(os.path.join(workdir, "bench.db"))
+            try:
+                for concurrency in args.concurrency:
+                    result = await run_level(setup, concurrency, args.operations, args.write_ratio,
+                                             random.Random(args.seed))
+                    print(
+                        f"{name:>7}  c={concurrency:<3} {result['ops_per_second']:>9.1f} ops/s  "
+                        f"read p50 {result['read_p50_ms']:>7.2f} p95 {result['read_p95_ms']:>7.2f} ms  "
+                        f"write p50 {result['write_p50_ms']:>7.2f} p95 {result['write_p95_ms']:>7.2f} ms  "
+                        f"errors {result['errors']}"
+                    )
+            finally:
+                await setup.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent CRUD benchmark: legacy sync setup vs async engine")
+    parser.add_argument("--setups", nargs="+", choices=SETUPS, default=list(SETUPS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--operations", type=int, default=2000, help="operations ανά επίπεδο concurrency")
+    parser.add_argument("--write-ratio", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Benchmark του LLM path (endpoints → job queue → call_ollama → JSON parsing)
+πάνω στο fake Ollama server, χωρίς GPU.
+
+Ξεκινά το benchmarks.fake_ollama και την εφαρμογή (uvicorn) σε subprocesses,
+στέλνει requests σε κάθε επίπεδο concurrency και τυπώνει throughput και
+p50/p95/p99 latency ανά scenario:
+- c4:           POST /assistant/c4diagram
+- requirements: POST /projects/{id}/requirements/
+- upload:       POST /projects/{id}/requirements/upload-and-process (μικρό PDF)
+
+Κάθε request έχει μοναδικό περιεχόμενο και use_cache=false, ώστε να μην
+μετρώνται cache hits ή single-flight coalescing. Με --json τα αποτελέσματα
+γράφονται σε αρχείο για σύγκριση μεταξύ commits.
+
+Εκτέλεση από το root του repo:
+    python -m benchmarks.bench_llm_path --concurrency 1 4 16 --requests 32 --ttft 0.2 --tps 80
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SCENARIOS = ("c4", "requirements", "upload")
+PROJECT_ID = "bench"
+
+SEQUENCE_DIAGRAM = """sequenceDiagram
+    Customer->>ATM: Scan QR code ({n})
+    ATM->>Bank: Authorize withdrawal
+    Bank-->>ATM: Approved
+    ATM-->>Customer: Dispense cash"""
+
+DOCUMENT = (
+    "Σήμερα (as-is) ο πελάτης χρειάζεται κάρτα για ανάληψη μετρητών από το ATM. "
+    "Στο to-be ο πελάτης θα μπορεί να κάνει ανάληψη με QR code από την εφαρμογή ({n}). "
+    "Κάθε συναλλαγή πρέπει να καταγράφεται για έλεγχο."
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def make_pdf(n: int) -> bytes:
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_textbox(fitz.Rect(50, 50, 550, 800), DOCUMENT.format(n=n), fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def wait_until_up(url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.time() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not start within {timeout}s")
+
+
+def start_processes(args, workdir):
+    ollama_port, app_port = free_port(), free_port()
+    # Τα logs της εφαρμογής (DEBUG, με τα prompts) πάνε σε αρχείο για να μην αλλοιώνουν τη μέτρηση
+    log = open(os.path.join(workdir, "server.log"), "w")
+    fake = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.fake_ollama", "--port", str(ollama_port), "--ttft", str(args.ttft),
+         "--tps", str(args.tps), "--error-rate", str(args.error_rate), "--seed", "1"],
+        cwd=ROOT, stdout=log, stderr=subprocess.STDOUT,
+    )
+    env = {
+        **os.environ,
+        "OLLAMA_HOST": f"http://127.0.0.1:{ollama_port}",
+        "OLLAMA_BACKENDS": "",
+        "LLM_CACHE_PATH": os.path.join(workdir, "llm_cache.db"),
+        "SEMANTIC_CACHE_ENABLED": "false",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(app_port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    return fake, server, log, f"http://127.0.0.1:{ollama_port}", f"http://127.0.0.1:{app_port}"
+
+
+async def send(client: httpx.AsyncClient, scenario: str, n: int):
+    if scenario == "c4":
+        return await client.post("/assistant/c4diagram", params={"use_cache": "false"},
+                                 json={"content": SEQUENCE_DIAGRAM.format(n=n), "c4_type": 1 + n % 3})
+    if scenario == "requirements":
+        return await client.post(f"/projects/{PROJECT_ID}/requirements/", params={"use_cache": "false"},
+                                 json={"content": DOCUMENT.format(n=n)})
+    return await client.post(
+        f"/projects/{PROJECT_ID}/requirements/upload-and-process", params={"use_cache": "false"},
+        files=[("files", (f"doc-{n}.pdf", make_pdf(n), "application/pdf"))],
+    )
+
+
+async def run_level(base_url: str, scenario: str, concurrency: int, total: int, offset: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one(n):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await send(client, scenario, n)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=600, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(offset + n) for n in range(total)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> list[dict]:
+    with tempfile.TemporaryDirectory() as workdir:
+        fake, server, log, ollama_url, app_url = start_processes(args, workdir)
+        try:
+            try:
+                await wait_until_up(f"{ollama_url}/api/version")
+                await wait_until_up(f"{app_url}/")
+            except RuntimeError:
+                with open(os.path.join(workdir, "server.log")) as f:
+                    print(f.read()[-4000:], file=sys.stderr)
+                raise
+            results, offset = [], 0
+            for scenario in args.scenarios:
+                for concurrency in args.concurrency:
+                    result = await run_level(app_url, scenario, concurrency, args.requests, offset)
+                    offset += args.requests
+                    results.append(result)
+                    print(
+                        f"{scenario:>12}  c={concurrency:<3} {result['throughput_rps']:>8.2f} req/s  "
+                        f"p50 {result['p50_ms']:>8.1f} ms  p95 {result['p95_ms']:>8.1f} ms  "
+                        f"p99 {result['p99_ms']:>8.1f} ms  errors {result['errors']}"
+                    )
+            async with httpx.AsyncClient(base_url=app_url) as client:
+                jobs = (await client.get("/jobs/stats")).json()
+            print(f"job queue: {jobs['concurrency']} workers, completed {jobs['completed']}")
+            return results
+        finally:
+            for process in (server, fake):
+                process.terminate()
+                process.wait(timeout=10)
+            log.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM path benchmark πάνω στο fake Ollama")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=32, help="requests ανά scenario και επίπεδο concurrency")
+    parser.add_argument("--ttft", type=float, default=0.2)
+    parser.add_argument("--tps", type=float, default=80.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--json", help="αρχείο για τα αποτελέσματα (σύγκριση μεταξύ commits)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "revision": git_revision(),
+                "settings": {"ttft": args.ttft, "tps": args.tps, "error_rate": args.error_rate},
+                "results": results,
+            }, f, indent=2)
+        print(f"results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Regression benchmark για το project outline: μεγαλώνει κάθε collection
+(requirements, diagrams, teams, tasks) κατά --scales και μετρά
+
+- joinedload: το παλιό outline (τέσσερα joinedload, cartesian product)
+- full:       projects_repository.get_project_outline (ένα query ανά collection)
+- light:      το ίδιο με light=True (diagrams χωρίς mermaid_code)
+
+Το κόστος των full/light πρέπει να μεγαλώνει γραμμικά με το σύνολο των rows
+(σταθερό "us/row"), ενώ του joinedload με το γινόμενό τους. Το joinedload
+παραλείπεται όταν το cartesian product ξεπερνά το --joinedload-max-rows.
+
+Εκτέλεση από το root του repo:
+    python -m benchmarks.bench_outline --scales 1 2 4 8 --repeat 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy.orm import joinedload, sessionmaker
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import models  # noqa: E402
+from app.database import create_db_engine  # noqa: E402
+from app.repositories.projects_repository import get_project_outline  # noqa: E402
+
+# Μέγεθος κάθε collection στο scale 1 (στο scale 8: 200 requirements, 32 diagrams, 8 teams, 320 tasks)
+BASE = {"requirements": 25, "diagrams": 4, "teams": 1, "tasks": 40}
+
+
+def seed(db, project_id: str, scale: int, mermaid_bytes: int):
+    db.add(models.Project(id=project_id, name=f"Project x{scale}", description="benchmark"))
+    code = ("graph TD\n" + "  A-->B\n" * (mermaid_bytes // 8))[:mermaid_bytes]
+    db.add_all(
+        models.Requirement(project_id=project_id, description=f"Requirement {n} " * 8,
+                           category=models.RequirementCategory.functional)
+        for n in range(BASE["requirements"] * scale)
+    )
+    db.add_all(
+        models.Diagram(project_id=project_id, title=f"Diagram {n}", mermaid_code=code, type="Flowchart")
+        for n in range(BASE["diagrams"] * scale)
+    )
+    db.add_all(
+        models.Team(project_id=project_id, name=f"Team {n}", members="a,b,c")
+        for n in range(BASE["teams"] * scale)
+    )
+    db.add_all(
+        models.Task(project_id=project_id, description=f"Task {n}")
+        for n in range(BASE["tasks"] * scale)
+    )
+    db.commit()
+
+
+def joinedload_outline(project_id: str, db):
+    # Το outline πριν: ένα query με το cartesian product των τεσσάρων collections
+    return db.query(models.Project).options(
+        joinedload(models.Project.requirements),
+        joinedload(models.Project.diagrams),
+        joinedload(models.Project.teams),
+        joinedload(models.Project.tasks),
+    ).filter(models.Project.id == project_id).first()
+
+
+def measure(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Project outline benchmark ανά μέγεθος collections")
+    parser.add_argument("--scales", nargs="+", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--mermaid-bytes", type=int, default=4096, help="μέγεθος κάθε mermaid_code")
+    parser.add_argument("--joinedload-max-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = create_db_engine(f"sqlite:///{os.path.join(workdir, 'outline.db')}", echo=False)
+        models.Base.metadata.create_all(bind=engine)
+        sessions = sessionmaker(bind=engine, expire_on_commit=False)
+        with sessions() as db:
+            for scale in args.scales:
+                seed(db, f"p{scale}", scale, args.mermaid_bytes)
+
+        print(f"{'scale':>5} {'rows':>6} {'product':>12}  {'joinedload':>12}  {'full':>9} {'us/row':>7}  "
+              f"{'light':>9} {'us/row':>7}")
+        for scale in args.scales:
+            project_id = f"p{scale}"
+            counts = {name: size * scale for name, size in BASE.items()}
+            rows = sum(counts.values())
+            product = 1
+            for count in counts.values():
+                product *= count
+
+            def timed(fn):
+                def run():
+                    # Νέο session κάθε φορά: χωρίς identity map από το προηγούμενο run
+                    with sessions() as db:
+                        fn(db)
+                return measure(run, args.repeat)
+
+            full = timed(lambda db: get_project_outline(project_id, db))
+            light = timed(lambda db: get_project_outline(project_id, db, light=True))
+            if product <= args.joinedload_max_rows:
+                joined = f"{timed(lambda db: joinedload_outline(project_id, db)) * 1000:>9.1f} ms"
+            else:
+                joined = f"{'skipped':>12}"
+            print(f"{scale:>5} {rows:>6} {product:>12,}  {joined}  {full * 1000:>6.1f} ms {full / rows * 1e6:>7.1f}  "
+                  f"{light * 1000:>6.1f} ms {light / rows * 1e6:>7.1f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark της εξαγωγής κειμένου PDF (10, 100 και 1000 σελίδες).
+
+Συγκρίνει:
+- legacy: το παλιό `full_text += page.get_text()` σε ένα core
+- serial: iter_pdf_pages χωρίς process pool ("".join των σελίδων)
+- pool:   iter_pdf_pages με page ranges στο process pool
+και μετρά τον χρόνο μέχρι το πρώτο token-bounded chunk (streaming) σε σχέση
+με την πλήρη εξαγωγή + chunking.
+
+Εκτέλεση από το root του repo:
+    python -m benchmarks.bench_pdf_extraction --pages 10 100 1000 --workers 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+
+from app.utils import pdf_processor
+from app.utils.pdf_processor import (
+    clean_text,
+    iter_pdf_pages,
+    iter_text_chunks,
+    shutdown_pdf_pool,
+    split_into_token_chunks,
+)
+
+PARAGRAPH = (
+    "The system shall allow the customer to withdraw cash using a QR code. "
+    "Each transaction must be logged for audit purposes and retained for five years. "
+    "Notifications are sent to the customer within two seconds of completion. "
+)
+
+
+def make_pdf(path, pages):
+    doc = fitz.open()
+    for index in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), f"Page {index}. " + PARAGRAPH * 12, fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def legacy_extract(path):
+    doc = fitz.open(path)
+    full_text = ""
+    for page in doc:
+        full_text += page.get_text()
+    doc.close()
+    return clean_text(full_text)
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def first_chunk_time(path, workers, max_tokens):
+    started = time.perf_counter()
+    chunks = iter_text_chunks(iter_pdf_pages(path, workers=workers), max_tokens)
+    next(chunks, None)
+    elapsed = time.perf_counter() - started
+    chunks.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--workers", type=int, default=pdf_processor.PDF_EXTRACT_WORKERS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chunk-tokens", type=int, default=3000)
+    args = parser.parse_args()
+
+    print(f"cpu_count={os.cpu_count()} workers={args.workers} "
+          f"parallel_min_pages={pdf_processor.PDF_PARALLEL_MIN_PAGES} pages_per_task={pdf_processor.PDF_PAGES_PER_TASK}")
+    header = f"{'pages':>6} {'legacy s':>10} {'serial s':>10} {'pool s':>10} {'speedup':>8} {'1st chunk s':>12} {'all chunks s':>13}"
+    print(header)
+    print("-" * len(header))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Ζέσταμα του pool ώστε το spawn των processes να μη μετρά στο πρώτο μέγεθος
+        warmup = os.path.join(tmp_dir, "warmup.pdf")
+        make_pdf(warmup, pdf_processor.PDF_PARALLEL_MIN_PAGES)
+        "".join(iter_pdf_pages(warmup, workers=args.workers))
+
+        for pages in args.pages:
+            path = os.path.join(tmp_dir, f"doc_{pages}.pdf")
+            make_pdf(path, pages)
+
+            legacy = timed(lambda: legacy_extract(path), args.repeat)
+            serial = timed(lambda: "".join(iter_pdf_pages(path, workers=1)), args.repeat)
+            pool = timed(lambda: "".join(iter_pdf_pages(path, workers=args.workers)), args.repeat)
+            first = min(first_chunk_time(path, args.workers, args.chunk_tokens) for _ in range(args.repeat))
+            full = timed(
+                lambda: split_into_token_chunks(clean_text(" ".join(iter_pdf_pages(path, workers=args.workers))),
+                                                args.chunk_tokens),
+                args.repeat,
+            )
+            print(f"{pages:>6} {legacy:>10.3f} {serial:>10.3f} {pool:>10.3f} {legacy / pool:>7.2f}x "
+                  f"{first:>12.3f} {full:>13.3f}")
+
+    shutdown_pdf_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Fake Ollama HTTP server για benchmarks και τοπικές δοκιμές χωρίς GPU.
+
+Υλοποιεί τα endpoints που χρησιμοποιεί η εφαρμογή:
+- POST /api/generate (streaming NDJSON και non-streaming)
+- POST /api/embeddings (legacy, ένα prompt) και POST /api/embed (batch input)
+- GET  /api/version, /api/tags, /api/ps
+
+με ρυθμιζόμενο time-to-first-token, tokens/second, error rate και canned
+απαντήσεις (JSON αρχείο {"substring του prompt": "απάντηση"}).
+
+Εκτέλεση από το root του repo:
+    python -m benchmarks.fake_ollama --port 11500 --ttft 0.2 --tps 40 --error-rate 0.01
+και στην εφαρμογή OLLAMA_HOST=http://127.0.0.1:11500
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DEFAULT_RESPONSES = {
+    # Το πρώτο substring που περιέχεται στο prompt διαλέγει την απάντηση
+    "business analyst": json.dumps([
+        {
+            "title": "Cardless ανάληψη με QR",
+            "description": "Ο πελάτης μπορεί να κάνει ανάληψη μετρητών στο ATM χρησιμοποιώντας QR code χωρίς κάρτα.",
+            "functional": True,
+        },
+        {
+            "title": "Καταγραφή συναλλαγών",
+            "description": "Κάθε συναλλαγή καταγράφεται για σκοπούς ελέγχου και διατηρείται για πέντε έτη.",
+            "functional": False,
+        },
+    ], ensure_ascii=False, indent=2),
+    "C4": json.dumps({
+        "diagram": "C4Context\n  title System Context\n  Person(customer, \"Customer\")\n"
+                   "  System(atm, \"ATM\")\n  Rel(customer, atm, \"Withdraws cash\")",
+        "explanation": "Ο πελάτης αλληλεπιδρά με το ATM.",
+    }, ensure_ascii=False),
+    "fix JSON": "[]",
+}
+
+
+class FakeOllamaSettings:
+    def __init__(self, ttft=0.2, tps=40.0, error_rate=0.0, chars_per_token=4, embedding_dim=768,
+                 responses=None, model="deepseek-coder-v2:latest", seed=None):
+        self.ttft = ttft
+        self.tps = tps
+        self.error_rate = error_rate
+        self.chars_per_token = chars_per_token
+        self.embedding_dim = embedding_dim
+        self.responses = responses or DEFAULT_RESPONSES
+        self.model = model
+        self.random = random.Random(seed)
+
+
+def _answer_for(settings: FakeOllamaSettings, prompt: str) -> str:
+    for needle, answer in settings.responses.items():
+        if needle in prompt:
+            return answer
+    return "{}"
+
+
+def _tokens(settings: FakeOllamaSettings, text: str) -> list[str]:
+    size = settings.chars_per_token
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+
+def _embedding(settings: FakeOllamaSettings, text: str) -> list[float]:
+    # Ντετερμινιστικό bag-of-words vector: ίδια/παρόμοια κείμενα → όμοια embeddings
+    vector = [0.0] * settings.embedding_dim
+    for word in text.split():
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+        vector[int.from_bytes(digest, "little") % settings.embedding_dim] += 1.0
+    return vector
+
+
+def create_app(settings: FakeOllamaSettings) -> FastAPI:
+    app = FastAPI(title="Fake Ollama")
+    app.state.settings = settings
+    app.state.requests = 0
+
+    def failed() -> bool:
+        return settings.error_rate > 0 and settings.random.random() < settings.error_rate
+
+    @app.get("/api/version")
+    async def version():
+        return {"version": "0.0.0-fake"}
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": settings.model, "model": settings.model}]}
+
+    @app.get("/api/ps")
+    async def ps():
+        return {"models": [{"name": settings.model, "model": settings.model, "expires_at": None, "size_vram": 0}]}
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        if failed():
+            return JSONResponse({"error": "fake ollama: injected failure"}, status_code=500)
+        prompt = body.get("prompt", "")
+        if not prompt:
+            # Warm-up (κενό prompt): μόνο φόρτωμα μοντέλου
+            return {"model": body.get("model"), "response": "", "done": True, "load_duration": 0}
+        answer = _answer_for(settings, prompt)
+        tokens = _tokens(settings, answer)
+        prompt_tokens = max(len(prompt) // settings.chars_per_token, 1)
+        started = time.perf_counter()
+
+        def final(extra=None):
+            elapsed_ns = int((time.perf_counter() - started) * 1_000_000_000)
+            return {
+                "model": body.get("model"), "done": True, "response": "",
+                "prompt_eval_count": prompt_tokens, "eval_count": len(tokens),
+                "total_duration": elapsed_ns, "load_duration": 0,
+                "prompt_eval_duration": int(settings.ttft * 1_000_000_000),
+                "eval_duration": max(elapsed_ns - int(settings.ttft * 1_000_000_000), 0),
+                **(extra or {}),
+            }
+
+        if not body.get("stream", True):
+            await asyncio.sleep(settings.ttft + len(tokens) / settings.tps)
+            return final({"response": answer})
+
+        async def stream():
+            await asyncio.sleep(settings.ttft)
+            for token in tokens:
+                yield json.dumps({"model": body.get("model"), "response": token, "done": False},
+                                 ensure_ascii=False) + "\n"
+                await asyncio.sleep(1 / settings.tps)
+            yield json.dumps(final()) + "\n"
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    @app.post("/api/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        if failed():
+            return JSONResponse({"error": "fake ollama: injected failure"}, status_code=500)
+        return {"embedding": _embedding(settings, body.get("prompt", ""))}
+
+    @app.post("/api/embed")
+    async def embed(request: Request):
+        body = await request.json()
+        if failed():
+            return JSONResponse({"error": "fake ollama: injected failure"}, status_code=500)
+        texts = body.get("input", [])
+        texts = [texts] if isinstance(texts, str) else texts
+        return {"model": body.get("model"), "embeddings": [_embedding(settings, text) for text in texts]}
+
+    return app
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fake Ollama server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--ttft", type=float, default=0.2, help="time to first token (seconds)")
+    parser.add_argument("--tps", type=float, default=40.0, help="tokens per second ανά generation")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="ποσοστό requests που απαντούν 500")
+    parser.add_argument("--responses", help="JSON αρχείο {substring του prompt: απάντηση}")
+    parser.add_argument("--seed", type=int)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    responses = None
+    if args.responses:
+        with open(args.responses, encoding="utf-8") as f:
+            responses = json.load(f)
+    settings = FakeOllamaSettings(ttft=args.ttft, tps=args.tps, error_rate=args.error_rate,
+                                  responses=responses, seed=args.seed)
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Η βάση και τα caches διαβάζονται από το config στο import, άρα ορίζονται πριν από κάθε import του app
+_workdir = tempfile.mkdtemp(prefix="so-assistant-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ["OUTLINE_CACHE_PATH"] = ""
+os.environ["SEMANTIC_CACHE_ENABLED"] = "false"
+os.environ["LLM_CACHE_PATH"] = os.path.join(_workdir, "llm_cache.db")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, init_db  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    init_db()
+    yield
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
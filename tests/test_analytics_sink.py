@@ -0,0 +1,45 @@
+import csv
+import sqlite3
+from types import SimpleNamespace
+
+from app.analytics_sink import CSV_HEADER, AnalyticsSink
+
+
+def _row(index):
+    return {
+        "timestamp": f"2026-01-01T00:00:{index:02d}", "prompt_key": "requirements.extract", "model": "m",
+        "prompt_tokens": 100, "response_tokens": 50, "total_tokens": 150, "cost_estimate": 0.0002,
+        "measured": True, "total_duration_ms": 1200.0, "eval_duration_ms": 900.0, "tokens_per_second": 55.5,
+    }
+
+
+def _sink(tmp_path, **kwargs):
+    return AnalyticsSink(backend="csv,sqlite", csv_path=str(tmp_path / "analytics.csv"),
+                         db_path=str(tmp_path / "analytics.db"), **kwargs)
+
+
+def test_stop_flushes_the_queued_rows(tmp_path):
+    # Ούτε batch_size ούτε flush_interval φτάνουν πριν το stop
+    sink = _sink(tmp_path, batch_size=1_000, flush_interval=3_600)
+    for index in range(5):
+        sink.submit(_row(index))
+
+    sink.stop()
+
+    assert not sink.running
+    assert sink.written == 5
+    with open(tmp_path / "analytics.csv", encoding="utf-8") as csvfile:
+        rows = list(csv.reader(csvfile))
+    assert rows[0] == CSV_HEADER and len(rows) == 6
+    with sqlite3.connect(tmp_path / "analytics.db") as conn:
+        assert conn.execute("SELECT COUNT(*) FROM prompt_runs").fetchone()[0] == 5
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    sink = _sink(tmp_path, queue_size=2, batch_size=1_000, flush_interval=3_600)
+    sink._thread = SimpleNamespace(is_alive=lambda: True)  # writer που δεν αδειάζει την ουρά
+
+    for index in range(5):
+        sink.submit(_row(index))
+
+    assert sink.dropped == 3
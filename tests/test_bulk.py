@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from api import requirements, teams
+from app import models
+from app.utils.bulk import read_body_limited
+
+
+@pytest.fixture
+def client(db):
+    db.merge(models.Project(id="bulk-1", name="Bulk"))
+    db.commit()
+    app = FastAPI()
+    app.include_router(teams.router)
+    app.include_router(requirements.router)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_json_array_with_invalid_items(client):
+    response = client.post("/projects/bulk-1/teams/bulk", json=[{"name": "A"}, {"members": "x"}, {"name": "B"}])
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["created"] == 2
+    assert [item["index"] for item in body["items"]] == [0, 2]
+    assert [error["index"] for error in body["errors"]] == [1]
+
+
+def test_ndjson_reports_unparsable_lines(client):
+    lines = "\n".join([json.dumps({"name": "C"}), "{not json", json.dumps({"name": "D"})])
+
+    response = client.post("/projects/bulk-1/teams/bulk", content=lines,
+                           headers={"Content-Type": "application/x-ndjson"})
+
+    body = response.json()
+    assert body["created"] == 2
+    assert body["errors"][0]["index"] == 1
+
+
+def test_duplicate_requirements_are_merged(client):
+    item = {"description": "Ο χρήστης συνδέεται με OTP", "category": "Functional"}
+
+    body = client.post("/projects/bulk-1/requirements/bulk", json=[item, item]).json()
+
+    assert (body["created"], body["merged"]) == (1, 1)
+    assert body["items"][1]["duplicate_of"] == body["items"][0]["id"]
+
+
+def test_unknown_project_is_404(client):
+    assert client.post("/projects/missing/teams/bulk", json=[{"name": "A"}]).status_code == 404
+
+
+def _request(chunks, content_length=None):
+    headers = [(b"content-length", str(content_length).encode())] if content_length is not None else []
+    messages = [{"type": "http.request", "body": chunk, "more_body": True} for chunk in chunks]
+    messages.append({"type": "http.request", "body": b"", "more_body": False})
+
+    async def receive():
+        return messages.pop(0)
+
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": headers}, receive)
+
+
+def test_body_over_the_limit_is_rejected_from_content_length():
+    request = _request([b"x" * 10], content_length=10_000)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(read_body_limited(request, max_bytes=100))
+
+    assert error.value.status_code == 413
+
+
+def test_body_over_the_limit_is_rejected_while_streaming():
+    request = _request([b"x" * 60, b"x" * 60, b"x" * 60])
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(read_body_limited(request, max_bytes=100))
+
+    assert error.value.status_code == 413
+
+
+def test_body_within_the_limit():
+    assert asyncio.run(read_body_limited(_request([b"[1,", b"2]"]), max_bytes=100)) == b"[1,2]"
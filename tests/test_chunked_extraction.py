@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from app.requirements import analyze_requirements as extraction
+
+
+@pytest.fixture
+def extract(monkeypatch):
+    async def extract_requirements(chunk, use_cache=True, embedding=None):
+        if chunk.startswith("bad"):
+            raise RuntimeError(f"LLM call failed for {chunk}")
+        return [{"title": chunk, "description": chunk, "functional": True}], None
+
+    monkeypatch.setattr(extraction, "extract_requirements", extract_requirements)
+
+
+def _events(chunks):
+    async def main():
+        return [event async for event in extraction.stream_requirements_chunked(chunks, use_cache=False)]
+    return asyncio.run(main())
+
+
+def test_failed_chunks_make_the_result_partial(extract):
+    events = _events(["good 1", "bad 2", "good 3"])
+
+    [partial] = [data for event, data in events if event == "partial"]
+    [result] = [data for event, data in events if event == "result"]
+    assert partial["partial"] is True
+    assert [failure["chunk"] for failure in partial["failed_chunks"]] == [1]
+    assert [requirement["title"] for requirement in result] == ["good 1", "good 3"]
+
+
+def test_complete_result_has_no_partial_event(extract):
+    assert "partial" not in {event for event, _ in _events(["good 1", "good 2"])}
+
+
+def test_all_chunks_failing_fails_the_extraction(extract):
+    with pytest.raises(RuntimeError, match="all 2 chunks"):
+        _events(["bad 1", "bad 2"])
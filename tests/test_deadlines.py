@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from api.jobs import request_deadline, run_job
+from app.config.config import REQUEST_DEADLINE_HEADER
+from app.exceptions.custom_exceptions import JobCancelledError
+from app.jobs import CancelReason, JobManager, JobPriority
+
+
+def _request(deadline: str | None = None, disconnect_after: float | None = None) -> Request:
+    headers = [(REQUEST_DEADLINE_HEADER.lower().encode(), deadline.encode())] if deadline else []
+
+    async def receive():
+        if disconnect_after is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": headers}, receive)
+
+
+def _slow_runner(started: list):
+    async def runner():
+        started.append(True)
+        await asyncio.sleep(30)
+        yield "result", None
+    return runner
+
+
+def _run(request, monkeypatch):
+    manager = JobManager(concurrency=1)
+    monkeypatch.setattr("api.jobs.job_manager", manager)
+    started = []
+
+    async def main():
+        try:
+            with pytest.raises(HTTPException) as error:
+                await run_job("slow", _slow_runner(started), JobPriority.normal, request=request)
+            [job] = manager._jobs.values()
+            with pytest.raises(JobCancelledError):
+                await asyncio.wait_for(manager.wait(job), 5)
+            return error.value.status_code, job.cancel_reason, job.finished
+        finally:
+            await manager.stop()
+
+    return (*asyncio.run(main()), started)
+
+
+def test_deadline_cancels_the_job_with_504(monkeypatch):
+    status, reason, finished, started = _run(_request(deadline="0.2"), monkeypatch)
+
+    assert (status, reason, finished) == (504, CancelReason.deadline, True)
+    assert started
+
+
+def test_client_disconnect_cancels_the_job_with_499(monkeypatch):
+    status, reason, finished, _ = _run(_request(disconnect_after=0.1), monkeypatch)
+
+    assert (status, reason, finished) == (499, CancelReason.client_disconnected, True)
+
+
+def test_past_deadline_is_rejected_before_submit():
+    with pytest.raises(HTTPException) as error:
+        request_deadline(_request(deadline="2000-01-01T00:00:00"))
+
+    assert error.value.status_code == 504
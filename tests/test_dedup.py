@@ -0,0 +1,70 @@
+import pytest
+
+from app.requirements.analyze_requirements import merge_requirements
+from app.utils.dedup import NearDuplicateIndex
+
+# Ζεύγη με υψηλό Jaccard των shingles που είναι διαφορετικά (ή αντίθετα) requirements
+DIFFERENT = [
+    ("Ο πελάτης μπορεί να κάνει ανάληψη μετρητών με QR code",
+     "Ο πελάτης δεν μπορεί να κάνει ανάληψη μετρητών με QR code"),
+    ("Η απόκριση του συστήματος πρέπει να είναι κάτω από 2 δευτερόλεπτα",
+     "Η απόκριση του συστήματος πρέπει να είναι κάτω από 5 δευτερόλεπτα"),
+    ("Ο πελάτης κάνει ανάληψη μετρητών από το ATM",
+     "Ο πελάτης κάνει κατάθεση μετρητών από το ATM"),
+]
+
+
+@pytest.mark.parametrize("first, second", DIFFERENT)
+def test_similar_requirements_are_not_merged(first, second):
+    index = NearDuplicateIndex(threshold=0.5)
+    index.add(0, first)
+
+    match = index.add_if_new(1, second)
+
+    assert match is None or not match.merge
+    assert len(index) == 2
+
+
+@pytest.mark.parametrize("first, second", DIFFERENT[:2])
+def test_similar_requirements_are_reported(first, second):
+    index = NearDuplicateIndex()
+    index.add(0, first)
+
+    match = index.match(second)
+
+    assert match is not None and match.key == 0
+    assert not match.exact and not match.merge
+
+
+def test_fuzzy_merge_is_opt_in():
+    first, second = DIFFERENT[0]
+    index = NearDuplicateIndex(fuzzy_merge=True, fuzzy_merge_threshold=0.9)
+    index.add(0, first)
+
+    assert index.match(second).merge
+
+
+def test_exact_duplicate_after_normalization_is_merged():
+    index = NearDuplicateIndex()
+    index.add(0, "Ανάληψη ΜΕΤΡΗΤΩΝ με QR code!")
+
+    match = index.add_if_new(1, "αναληψη μετρητων με qr code")
+
+    assert match.exact and match.merge and match.key == 0
+    assert len(index) == 1
+
+
+def test_merge_requirements_keeps_possible_duplicates():
+    first, second = DIFFERENT[0]
+    requirements = [
+        {"title": "Ανάληψη", "description": first, "functional": True},
+        {"title": "Ανάληψη", "description": second, "functional": True},
+        {"title": "ανάληψη", "description": first.upper(), "functional": True},
+    ]
+
+    merged = merge_requirements([requirements])
+
+    assert [item["description"] for item in merged] == [first, second]
+    assert "possible_duplicate_of" not in merged[0]
+    assert merged[1]["possible_duplicate_of"] == 0
+    assert merged[1]["similarity"] < 1
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+from app import jobs
+from app.jobs import JobManager, JobPriority, JobStatus
+
+
+def _runner(name, order, release=None, tokens=()):
+    async def runner():
+        if release is not None:
+            await release.wait()
+        order.append(name)
+        for token in tokens:
+            yield "token", {"text": token}
+        yield "result", name
+    return runner
+
+
+def test_higher_priority_runs_first():
+    async def main():
+        manager, order, release = JobManager(concurrency=1), [], asyncio.Event()
+        blocker = await manager.submit("blocker", _runner("blocker", order, release))
+        await asyncio.sleep(0)
+        bulk = await manager.submit("bulk", _runner("bulk", order), JobPriority.bulk)
+        interactive = await manager.submit("ui", _runner("ui", order), JobPriority.interactive)
+        release.set()
+        for job in (blocker, bulk, interactive):
+            await manager.wait(job)
+        await manager.stop()
+        return order
+
+    assert asyncio.run(main()) == ["blocker", "ui", "bulk"]
+
+
+def test_cancelled_queued_job_never_runs():
+    async def main():
+        manager, order, release = JobManager(concurrency=1), [], asyncio.Event()
+        blocker = await manager.submit("blocker", _runner("blocker", order, release))
+        queued = await manager.submit("queued", _runner("queued", order))
+        await manager.cancel(queued)
+        release.set()
+        await manager.wait(blocker)
+        await manager.stop()
+        return order, queued.status
+
+    assert asyncio.run(main()) == (["blocker"], JobStatus.cancelled)
+
+
+def test_tokens_reach_live_subscribers_but_are_not_replayed():
+    async def main():
+        manager, release = JobManager(concurrency=1), asyncio.Event()
+        job = await manager.submit("tokens", _runner("tokens", [], release, tokens=["a", "b"]))
+        live = asyncio.create_task(_collect(manager, job))
+        await asyncio.sleep(0)
+        release.set()
+        await manager.wait(job)
+        replay = await _collect(manager, job)
+        await manager.stop()
+        return await live, replay, job.events
+
+    live, replay, stored = asyncio.run(main())
+    assert [data["text"] for event, data in live if event == "token"] == ["a", "b"]
+    assert "token" not in {event for event, _ in replay}
+    assert ("result", "tokens") in replay
+    assert "token" not in {event for event, _ in stored}
+
+
+async def _collect(manager, job):
+    return [event async for event in manager.events(job)]
+
+
+def test_finished_jobs_are_purged_without_new_submits(monkeypatch):
+    monkeypatch.setattr(jobs, "PURGE_INTERVAL", 0.01)
+
+    async def main():
+        manager = JobManager(concurrency=1, retention=0.01)
+        job = await manager.submit("done", _runner("done", []))
+        await manager.wait(job)
+        deadline = time.time() + 5
+        while manager.get(job.id) is not None and time.time() < deadline:
+            await asyncio.sleep(0.05)
+        await manager.stop()
+        return manager.get(job.id)
+
+    assert asyncio.run(main()) is None
+
+
+def test_stop_while_a_job_is_running():
+    async def main():
+        manager, started = JobManager(concurrency=1), asyncio.Event()
+
+        async def runner():
+            started.set()
+            await asyncio.sleep(30)
+            yield "result", None
+
+        job = await manager.submit("slow", runner)
+        await started.wait()
+        await asyncio.wait_for(manager.stop(), 5)
+        return job.status, job.cancel_reason
+
+    assert asyncio.run(main()) == (JobStatus.cancelled, jobs.CancelReason.shutdown)
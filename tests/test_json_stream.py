@@ -0,0 +1,80 @@
+import pytest
+
+from app.utils.json_stream import JsonStreamParser, extract_json_value
+
+ARRAY = '[{"id": 1, "title": "Login"}, {"id": 2, "title": "Logout [v2]"}]'
+
+
+def _feed(parser, text, size=1):
+    items = []
+    for start in range(0, len(text), size):
+        items.extend(parser.feed(text[start:start + size]))
+    return items
+
+
+@pytest.mark.parametrize("size", [1, 3, len(ARRAY)])
+def test_items_are_emitted_as_they_close(size):
+    parser = JsonStreamParser()
+
+    items = _feed(parser, ARRAY, size)
+
+    assert items == [{"id": 1, "title": "Login"}, {"id": 2, "title": "Logout [v2]"}]
+    assert parser.done
+    assert parser.result() == items
+
+
+def test_value_inside_a_fence():
+    parser = JsonStreamParser()
+
+    items = _feed(parser, f"Ορίστε τα requirements:\n```json\n{ARRAY}\n```\n")
+
+    assert [item["id"] for item in items] == [1, 2]
+    assert parser.result() == items
+
+
+def test_bracketed_prose_is_not_an_array():
+    parser = JsonStreamParser()
+
+    items = _feed(parser, f"See section [2] for details, [true] or [ -1 ].\n```json\n{ARRAY}\n```")
+
+    assert [item["id"] for item in items] == [1, 2]
+    assert parser.result() == items
+
+
+def test_fence_is_preferred_over_an_earlier_value():
+    parser = JsonStreamParser()
+
+    _feed(parser, f'Π.χ. ["example"] και μετά:\n```json\n{ARRAY}\n```')
+
+    assert [item["id"] for item in parser.result()] == [1, 2]
+
+
+def test_truncated_array_keeps_the_completed_items():
+    parser = JsonStreamParser()
+
+    items = _feed(parser, '[{"a":1},{"a":2},{"a":')
+
+    assert items == [{"a": 1}, {"a": 2}]
+    assert not parser.done
+    assert parser.result() == [{"a": 1}, {"a": 2}]
+
+
+def test_truncated_before_any_item_raises():
+    parser = JsonStreamParser()
+    _feed(parser, '[{"a":')
+
+    with pytest.raises(ValueError):
+        parser.result()
+
+
+def test_top_level_object_emits_no_items():
+    parser = JsonStreamParser()
+
+    items = _feed(parser, 'Απάντηση: {"items": [1, 2]} τέλος')
+
+    assert items == []
+    assert parser.result() == {"items": [1, 2]}
+
+
+def test_extract_json_value_skips_invalid_candidates():
+    assert extract_json_value('τίτλος [χωρίς json] και μετά {"a": [1, 2]}') == {"a": [1, 2]}
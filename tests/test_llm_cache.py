@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app import llm_cache as llm_cache_module
+from app.llm_cache import LLMResponseCache, make_cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1_000.0)
+    monkeypatch.setattr(llm_cache_module, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def make_cache(tmp_path):
+    caches = []
+
+    def make(**kwargs):
+        cache = LLMResponseCache(path=str(tmp_path / f"cache-{len(caches)}.db"), enabled=True, **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def test_key_depends_on_prompt_options_and_format():
+    key = make_cache_key("m", "prompt", {"temperature": 0})
+
+    assert key == make_cache_key("m", "prompt", {"temperature": 0})
+    assert key != make_cache_key("m", "prompt", {"temperature": 0.7})
+    assert key != make_cache_key("m", "prompt", {"temperature": 0}, format="json")
+    assert key != make_cache_key("other", "prompt", {"temperature": 0})
+
+
+def test_entries_expire_after_the_ttl(make_cache, clock):
+    cache = make_cache(ttl=60)
+    cache.set("k", "answer", "m")
+
+    clock.now += 59
+    assert cache.get("k") == "answer"
+    clock.now += 2
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(make_cache, clock):
+    cache = make_cache(max_entries=2)
+    cache.set("a", "A", "m")
+    clock.now += 1
+    cache.set("b", "B", "m")
+    clock.now += 1
+    cache.get("a")  # το "b" γίνεται το λιγότερο πρόσφατο
+    clock.now += 1
+    cache.set("c", "C", "m")
+
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("A", None, "C")
+    assert cache.stats()["evictions"] == 1
+
+
+def test_size_limit_evicts_until_the_cache_fits(make_cache, clock):
+    cache = make_cache(max_bytes=10)
+    for key in ("a", "b", "c"):
+        cache.set(key, "x" * 4, "m")
+        clock.now += 1
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 10
+    assert cache.get("a") is None and cache.get("c") == "xxxx"
+
+
+def test_clear_by_prompt_key(make_cache, clock):
+    cache = make_cache()
+    cache.set("a", "A", "m", prompt_key="requirements")
+    cache.set("b", "B", "m", prompt_key="c4")
+
+    assert cache.clear("requirements") == 1
+    assert (cache.get("a"), cache.get("b")) == (None, "B")
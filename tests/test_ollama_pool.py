@@ -0,0 +1,111 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app import ollama_client, ollama_pool as pool_module
+from app.config.config import OLLAMA_EJECT_AFTER, OLLAMA_EJECT_COOLDOWN, OLLAMA_READMIT_AFTER
+from app.ollama_pool import OllamaPool
+
+
+def _pool(*urls, health_interval=0):
+    return OllamaPool([{"url": url} for url in urls], health_interval=health_interval, max_inflight=4)
+
+
+def _client(handler):
+    return httpx.AsyncClient(base_url="http://backend", transport=httpx.MockTransport(handler))
+
+
+async def _fail(pool, backend, error):
+    with pytest.raises(type(error)):
+        async with pool.track(backend):
+            raise error
+
+
+def _status_error(status):
+    request = httpx.Request("POST", "http://backend/api/generate")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(status, request=request))
+
+
+def test_connect_error_ejects_immediately():
+    pool = _pool("http://a", "http://b")
+    a, b = pool.backends
+
+    asyncio.run(_fail(pool, a, httpx.ConnectError("refused")))
+
+    assert not a.healthy
+    assert pool.pick() is b
+
+
+def test_only_backend_faults_count_towards_eject():
+    pool = _pool("http://a")
+    [backend] = pool.backends
+
+    async def main():
+        for _ in range(OLLAMA_EJECT_AFTER + 1):
+            await _fail(pool, backend, RuntimeError("model produced invalid output"))
+            await _fail(pool, backend, _status_error(400))
+        healthy = backend.healthy
+        for _ in range(OLLAMA_EJECT_AFTER):
+            await _fail(pool, backend, _status_error(503))
+        return healthy
+
+    assert asyncio.run(main()) is True
+    assert not backend.healthy
+
+
+def test_ejected_backend_is_readmitted_after_the_cooldown(monkeypatch):
+    clock = SimpleNamespace(now=1_000.0)
+    monkeypatch.setattr(pool_module, "time", SimpleNamespace(time=lambda: clock.now, perf_counter=lambda: clock.now))
+    pool = _pool("http://a", "http://b")
+    a, b = pool.backends
+    asyncio.run(_fail(pool, a, httpx.ConnectError("refused")))
+
+    b.in_flight = 5  # αλλιώς το pick προτιμά το b ούτως ή άλλως
+    assert pool.pick() is b
+    clock.now += OLLAMA_EJECT_COOLDOWN + 1
+    assert pool.pick() is a
+    assert a.healthy
+
+
+def test_health_checks_readmit_a_recovered_backend():
+    pool = _pool("http://a")
+    [backend] = pool.backends
+    up = {"value": False}
+    backend.client = _client(lambda request: httpx.Response(200 if up["value"] else 500, json={}))
+
+    async def main():
+        for _ in range(OLLAMA_EJECT_AFTER):
+            await pool.check(backend)
+        ejected = not backend.healthy
+        up["value"] = True
+        for _ in range(OLLAMA_READMIT_AFTER):
+            await pool.check(backend)
+        await pool.close()
+        return ejected
+
+    assert asyncio.run(main()) is True
+    assert backend.healthy
+
+
+def test_embeddings_fail_over_to_the_next_backend(monkeypatch):
+    pool = _pool("http://a", "http://b")
+    a, b = pool.backends
+
+    def refuse(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    a.client = _client(refuse)
+    b.client = _client(lambda request: httpx.Response(200, json={"embeddings": [[1.0, 0.0]]}))
+    b.in_flight = 1  # το a επιλέγεται πρώτο
+    monkeypatch.setattr(ollama_client, "ollama_pool", pool)
+
+    async def main():
+        try:
+            return await ollama_client.embed_texts(["κείμενο"])
+        finally:
+            await pool.close()
+
+    assert asyncio.run(main()) == [[1.0, 0.0]]
+    assert not a.healthy and b.requests == 1
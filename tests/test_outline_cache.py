@@ -0,0 +1,32 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import projects
+from app import models
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(projects.router)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_outline_etag_changes_after_a_write(client, db):
+    db.add(models.Project(id="outline-1", name="Outline"))
+    db.commit()
+
+    first = client.get("/projects/outline-1/outline")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert client.get("/projects/outline-1/outline", headers={"If-None-Match": etag}).status_code == 304
+
+    db.add(models.Team(project_id="outline-1", name="Team A"))
+    db.commit()
+
+    after = client.get("/projects/outline-1/outline", headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.headers["etag"] != etag
+    assert [team["name"] for team in after.json()["teams"]] == ["Team A"]
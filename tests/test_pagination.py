@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app import models
+from app.repositories.projects_repository import PROJECT_LIST, list_projects
+from app.utils.pagination import PageRequest, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 18, 12, 30, 15, 123456)
+
+    cursor = encode_cursor([created_at, "p-1"])
+
+    assert decode_cursor(PROJECT_LIST, cursor) == [created_at, "p-1"]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor(["only-one-value"])])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(PROJECT_LIST, cursor)
+    assert error.value.status_code == 400
+
+
+def test_pages_follow_the_cursor_without_gaps(db):
+    started = datetime(2020, 1, 1)
+    # Ίδιο created_at σε ζεύγη: το id ξεχωρίζει τις θέσεις στο keyset
+    ids = [f"page-{n:02d}" for n in range(7)]
+    db.add_all(
+        models.Project(id=project_id, name=project_id, created_at=started + timedelta(seconds=n // 2))
+        for n, project_id in enumerate(ids)
+    )
+    db.commit()
+    window = {"created_after": started, "created_before": started + timedelta(days=1)}
+
+    seen, cursor = [], None
+    while True:
+        items, cursor = list_projects(db, PageRequest(cursor=cursor, limit=3, fields="name"), **window)
+        assert all(set(item) == {"id", "name"} for item in items)
+        seen.extend(item["id"] for item in items)
+        if cursor is None:
+            break
+
+    assert seen == ids
@@ -0,0 +1,26 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import projects
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(projects.router)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_create_list_and_delete_through_the_async_session(client):
+    created = client.post("/projects/create", json={"id": "async-1", "name": "Async", "description": "d"})
+    assert created.status_code == 201
+    assert created.json()["id"] == "async-1"
+
+    listed = client.get("/projects/list", params={"limit": 100})
+    assert "async-1" in [project["id"] for project in listed.json()]
+
+    assert client.delete("/projects/async-1/delete").json() == {"deleted": "async-1"}
+    assert client.delete("/projects/async-1/delete").status_code == 404
+    assert client.get("/projects/async-1/outline").status_code == 404
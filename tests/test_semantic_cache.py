@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from app.requirements import analyze_requirements as extraction
+from app.semantic_cache import SemanticCache
+
+ORIGINAL = "Τα δεδομένα διατηρούνται για πέντε έτη."
+EDITED = "Τα δεδομένα διατηρούνται για επτά έτη."
+VECTOR = [1.0, 0.0, 0.0]
+NEAR_VECTOR = [0.99, 0.01, 0.0]  # cosine ~0.9999, πάνω από το threshold
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = SemanticCache(path=str(tmp_path / "semantic.db"), threshold=0.97, enabled=True)
+    monkeypatch.setattr(extraction, "semantic_cache", cache)
+    yield cache
+    cache.close()
+
+
+def test_search_prefers_the_exact_text(cache):
+    cache.add(NEAR_VECTOR, "ns", EDITED, ["edited"])
+    cache.add(VECTOR, "ns", ORIGINAL, ["original"])
+
+    hit = cache.search(NEAR_VECTOR, "ns", ORIGINAL)
+
+    assert hit.exact and hit.result == ["original"]
+
+
+def test_search_reports_a_near_match_as_not_exact(cache):
+    cache.add(VECTOR, "ns", ORIGINAL, ["original"])
+
+    hit = cache.search(NEAR_VECTOR, "ns", EDITED)
+
+    assert hit is not None and not hit.exact
+
+
+def _extract(monkeypatch, content, embedding):
+    calls = []
+
+    async def analyze(text, use_cache=True):
+        calls.append(text)
+        return [{"title": text, "description": text, "functional": True}]
+
+    monkeypatch.setattr(extraction, "analyze_requirements", analyze)
+    result = asyncio.run(extraction.extract_requirements(content, embedding=embedding))
+    return result, calls
+
+
+def test_exact_hit_reuses_the_result(cache, monkeypatch):
+    cache.add(VECTOR, extraction.SEMANTIC_NAMESPACE, ORIGINAL, ["cached"])
+
+    (requirements, hit), calls = _extract(monkeypatch, ORIGINAL, VECTOR)
+
+    assert requirements == ["cached"] and hit.exact
+    assert calls == []
+
+
+def test_near_hit_is_extracted_again(cache, monkeypatch):
+    cache.add(VECTOR, extraction.SEMANTIC_NAMESPACE, ORIGINAL, ["cached"])
+
+    (requirements, hit), calls = _extract(monkeypatch, EDITED, NEAR_VECTOR)
+
+    assert hit is None
+    assert calls == [EDITED]
+    assert requirements[0]["title"] == EDITED
@@ -0,0 +1,63 @@
+import asyncio
+
+from app.singleflight import SingleFlight
+
+
+def _generation(fragments, started, delay=0.02):
+    def factory():
+        async def generate():
+            started.append(True)
+            for fragment in fragments:
+                await asyncio.sleep(delay)
+                yield fragment
+        return generate()
+    return factory
+
+
+def test_followers_share_one_generation():
+    async def scenario():
+        flights, started = SingleFlight(), []
+        factory = _generation(["a", "b"], started)
+        return await asyncio.gather(flights.do("k", factory), flights.do("k", factory)), started
+
+    results, started = asyncio.run(scenario())
+
+    assert results == ["ab", "ab"]
+    assert len(started) == 1
+
+
+def test_request_after_cancel_gets_a_fresh_generation():
+    async def scenario():
+        flights, started = SingleFlight(), []
+        factory = _generation(["a", "b", "c"], started)
+        waiter = asyncio.create_task(flights.do("k", factory))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        # Ο producer δεν έχει προλάβει να τερματίσει· το νέο request δεν πρέπει να πάρει το CancelledError του
+        await asyncio.sleep(0)
+        result = await flights.do("k", factory)
+        return result, started, flights
+
+    result, started, flights = asyncio.run(scenario())
+
+    assert result == "abc"
+    assert len(started) == 2
+    assert flights.cancelled == 1
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_cancelled_producer_is_not_a_shared_result():
+    async def scenario():
+        flights, started = SingleFlight(), []
+        waiter = asyncio.create_task(flights.do("k", _generation(["a", "b"], started)))
+        await asyncio.sleep(0.01)
+        # Ακύρωση του ίδιου του producer (π.χ. shutdown) ενώ υπάρχει waiter
+        next(iter(flights._flights.values())).task.cancel()
+        try:
+            await waiter
+        except Exception as e:
+            return e
+
+    error = asyncio.run(scenario())
+
+    assert isinstance(error, RuntimeError)
@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils.sse import format_sse, sse_response, with_heartbeat
+
+
+def _frames(events, interval=5.0):
+    async def main():
+        return [frame async for frame in with_heartbeat(events, interval=interval)]
+    return asyncio.run(main())
+
+
+def _parse(frame):
+    lines = frame.rstrip("\n").split("\n")
+    event = lines[0].removeprefix("event: ")
+    data = "\n".join(line.removeprefix("data: ") for line in lines[1:])
+    return event, data
+
+
+def test_frame_is_an_event_with_json_data():
+    frame = format_sse("item", {"title": "Είσοδος"})
+
+    assert frame == 'event: item\ndata: {"title": "Είσοδος"}\n\n'
+
+
+def test_multiline_text_becomes_one_data_line_each():
+    frame = format_sse("token", "first\nsecond")
+
+    assert frame == "event: token\ndata: first\ndata: second\n\n"
+    assert _parse(frame) == ("token", "first\nsecond")
+
+
+async def _events(*items, delay=0.0, error=None):
+    for item in items:
+        await asyncio.sleep(delay)
+        yield item
+    if error is not None:
+        raise error
+
+
+def test_events_are_framed_in_order():
+    frames = _frames(_events(("progress", {"stage": "map"}), ("result", [1, 2])))
+
+    assert [_parse(frame) for frame in frames] == [("progress", '{"stage": "map"}'), ("result", "[1, 2]")]
+
+
+def test_heartbeat_while_the_upstream_is_silent():
+    frames = _frames(_events(("result", []), delay=0.15), interval=0.05)
+
+    events = [_parse(frame)[0] for frame in frames]
+    assert events[-1] == "result"
+    assert "heartbeat" in events[:-1]
+
+
+def test_upstream_error_becomes_an_error_event():
+    frames = _frames(_events(("progress", {}), error=RuntimeError("LLM call failed")))
+
+    event, data = _parse(frames[-1])
+    assert event == "error" and json.loads(data) == {"detail": "LLM call failed"}
+
+
+def test_response_headers_disable_buffering():
+    app = FastAPI()
+
+    @app.get("/stream")
+    async def stream():
+        return sse_response(_events(("result", "ok")))
+
+    with TestClient(app) as client:
+        response = client.get("/stream")
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["x-accel-buffering"] == "no"
+    assert response.text == "event: result\ndata: ok\n\n"
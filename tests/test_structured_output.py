@@ -0,0 +1,64 @@
+import asyncio
+import json
+from typing import List
+
+from app import structured_output
+from app.schemas import RequirementItem
+from app.structured_output import parse_structured
+
+SCHEMA = List[RequirementItem]
+
+
+def _item(title):
+    return {"title": title, "description": f"{title} περιγραφή", "functional": True}
+
+
+def _fake_llm(monkeypatch, answers):
+    calls = []
+
+    async def call_ollama(prompt, **kwargs):
+        calls.append(prompt)
+        return json.dumps(answers[min(len(calls), len(answers)) - 1], ensure_ascii=False)
+
+    monkeypatch.setattr(structured_output, "call_ollama", call_ollama)
+    return calls
+
+
+def _parse(items, max_repairs=2):
+    return asyncio.run(parse_structured(json.dumps(items), SCHEMA, "test.repair", use_cache=False,
+                                        max_repairs=max_repairs))
+
+
+def test_repaired_items_keep_their_position(monkeypatch):
+    calls = _fake_llm(monkeypatch, [[_item("B"), _item("D")]])
+
+    result = _parse([_item("A"), {"title": "B"}, _item("C"), {"title": "D"}])
+
+    assert [item["title"] for item in result] == ["A", "B", "C", "D"]
+    assert len(calls) == 1  # όλα τα άκυρα σε ένα repair prompt
+
+
+def test_only_the_still_invalid_items_are_retried(monkeypatch):
+    calls = _fake_llm(monkeypatch, [[{"title": "B"}, _item("D")], [_item("B")]])
+
+    result = _parse([{"title": "B"}, _item("C"), {"title": "D"}])
+
+    assert [item["title"] for item in result] == ["B", "C", "D"]
+    assert len(calls) == 2
+    assert '"D"' not in calls[1].split("### JSON:")[-1]
+
+
+def test_repair_budget_is_per_response(monkeypatch):
+    calls = _fake_llm(monkeypatch, [[{"title": "still invalid"}]])
+
+    result = _parse([_item("A"), {"title": "B"}, {"title": "C"}], max_repairs=2)
+
+    assert [item["title"] for item in result] == ["A"]
+    assert len(calls) == 2
+
+
+def test_valid_response_needs_no_repair(monkeypatch):
+    calls = _fake_llm(monkeypatch, [])
+
+    assert _parse([_item("A")]) == [_item("A")]
+    assert calls == []
@@ -0,0 +1,29 @@
+import pytest
+
+from app import token_accounting
+from app.prompt_templates import PromptRegistry
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    def encoding_for_model(model_name):
+        raise OSError("network is unreachable")
+
+    monkeypatch.setattr(token_accounting.tiktoken, "encoding_for_model", encoding_for_model)
+    token_accounting.get_encoder.cache_clear()
+    yield
+    token_accounting.get_encoder.cache_clear()
+
+
+def test_tokens_are_estimated_without_the_encoder(offline):
+    assert token_accounting.count_tokens("x" * 10) == 3
+    assert token_accounting.measure_prompt("x" * 40, static_tokens=5, static_chars=20).prompt_tokens == 10
+
+
+def test_warm_does_not_fail_without_the_encoder(offline):
+    registry = PromptRegistry()
+    template = registry.register("offline", "Οδηγίες " * 10)
+
+    registry.warm()
+
+    assert template.static_tokens == 20
@@ -0,0 +1,83 @@
+import asyncio
+import io
+
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from starlette.datastructures import UploadFile as StarletteUploadFile
+
+from app.exceptions.custom_exceptions import UploadTooLargeError
+from app.utils.uploads import UploadLimitMiddleware, ingest_upload
+
+LIMIT = 1_000
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def client(calls):
+    app = FastAPI()
+    app.add_middleware(UploadLimitMiddleware, max_bytes=LIMIT)
+
+    @app.post("/upload")
+    async def upload(files: list[UploadFile] = File(...)):
+        calls.append([file.filename for file in files])
+        return {"files": len(files)}
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _multipart(size: int):
+    yield b'--B\r\nContent-Disposition: form-data; name="files"; filename="a.pdf"\r\nContent-Type: application/pdf\r\n\r\n'
+    for _ in range(size // 100):
+        yield b"x" * 100
+    yield b"\r\n--B--\r\n"
+
+
+def test_small_upload_is_accepted(client, calls):
+    response = client.post("/upload", files=[("files", ("a.pdf", b"%PDF", "application/pdf"))])
+
+    assert response.status_code == 200
+    assert calls == [["a.pdf"]]
+
+
+def test_content_length_over_the_limit_is_rejected_before_parsing(client, calls):
+    response = client.post("/upload", files=[("files", ("a.pdf", b"x" * (2 * LIMIT), "application/pdf"))])
+
+    assert response.status_code == 413
+    assert calls == []
+
+
+def test_chunked_body_over_the_limit_is_rejected_while_reading(client, calls):
+    response = client.post("/upload", content=_multipart(2 * LIMIT),
+                           headers={"Content-Type": "multipart/form-data; boundary=B"})
+
+    assert response.status_code == 413
+    assert calls == []
+
+
+def test_json_bodies_are_not_limited_by_the_upload_middleware(client):
+    assert client.post("/upload", json={"x": "y" * (2 * LIMIT)}).status_code == 422
+
+
+def test_single_file_over_the_per_file_limit():
+    upload = StarletteUploadFile(io.BytesIO(b"x" * 300), filename="big.pdf")
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(ingest_upload(upload, max_bytes=200, chunk_size=64))
+
+
+def test_large_upload_is_spooled_with_its_hash():
+    upload = StarletteUploadFile(io.BytesIO(b"x" * 300), filename="big.pdf")
+
+    ingested = asyncio.run(ingest_upload(upload, max_bytes=1_000, spool_threshold=100, chunk_size=64))
+    try:
+        assert ingested.spooled and ingested.size == 300
+        with open(ingested.source, "rb") as spooled:
+            assert spooled.read() == b"x" * 300
+    finally:
+        ingested.cleanup()